@@ -2,9 +2,14 @@
 Main Flask application for ATS Resume Generator
 With Payment System Integration
 """
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
+import queue
+import signal
+import time
+from itertools import islice
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -14,6 +19,11 @@ from services.data_service import DataService
 from services.ats_matcher import ATSMatcher
 from services.pdf_generator import PDFGenerator
 from services.content_generator import ContentGenerator
+from services.batch_analyzer import BatchAnalyzer
+from services.match_scorer import MatchScorer
+from services.pdf_downloads import PDFDownloads
+from services.async_runtime import get_runtime
+from services.job_queue import JobQueue, FINISHED, DONE
 from datetime import datetime
 
 app = Flask(__name__)
@@ -23,7 +33,8 @@ CORS(app, resources={
     r"/api/*": {
         "origins": "*",
         "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "allow_headers": ["Content-Type"],
+        "expose_headers": ["X-Degraded-Sections"]
     }
 })
 
@@ -33,6 +44,7 @@ init_db(app)
 
 # Register blueprints (routes)
 from routes import payment_bp, user_bp, analytics_bp
+from routes.analytics_routes import ADMIN_KEY
 app.register_blueprint(payment_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(analytics_bp)
@@ -42,6 +54,30 @@ data_service = DataService()
 ats_matcher = ATSMatcher()
 pdf_generator = PDFGenerator()
 content_generator = ContentGenerator(ats_matcher, use_ai=True)
+batch_analyzer = BatchAnalyzer(ats_matcher)
+match_scorer = MatchScorer(ats_matcher)
+pdf_downloads = PDFDownloads(os.path.join(pdf_generator.output_dir, 'downloads'))
+# Free generations reserved by failed or cancelled jobs are given back
+job_queue = JobQueue(on_failed=lambda payload: refund_job_generation(payload))
+
+# Hot-reload the skills index in this worker on SIGUSR2 (swap happens on the next request)
+if hasattr(signal, 'SIGUSR2'):
+    signal.signal(signal.SIGUSR2, ats_matcher.request_reload)
+
+# Upper bound on job descriptions accepted by one /api/analyze-jobs request
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 1000))
+
+# Longest resume or job description text (characters) accepted by /api/match-scores
+MAX_SCORED_TEXT_LENGTH = int(os.getenv('MAX_SCORED_TEXT_LENGTH', 100_000))
+
+# Bytes read from the request stream at a time by the streaming /api/analyze-job
+STREAM_READ_SIZE = 64 * 1024
+
+# Seconds between SSE keep-alive comments (also how quickly a vanished client is noticed)
+SSE_HEARTBEAT_INTERVAL = 10
+
+# Seconds between queue checks while a client is subscribed to a job
+JOB_STATUS_POLL_INTERVAL = float(os.getenv('JOB_STATUS_POLL_INTERVAL', 0.5))
 
 print("=" * 60)
 print("🤖 AI-POWERED RESUME GENERATOR")
@@ -54,7 +90,22 @@ print("=" * 60)
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'message': 'Resume Generator API is running'})
+    return jsonify({
+        'status': 'healthy',
+        'message': 'Resume Generator API is running',
+        'skills_index': ats_matcher.index_id,
+        'analysis_cache': ats_matcher.analysis_cache.stats(),
+        'completion_cache': (content_generator.ai_generator.completion_cache.stats()
+                             if content_generator.use_ai and content_generator.ai_generator.completion_cache
+                             else None),
+        'ai_governor': content_generator.ai_generator.governor.stats() if content_generator.use_ai else None,
+        'ai_singleflight': content_generator.ai_generator.singleflight.stats() if content_generator.use_ai else None,
+        'ai_hedging': content_generator.ai_generator.hedger.stats() if content_generator.use_ai else None,
+        'ai_circuit': content_generator.ai_generator.breaker.stats() if content_generator.use_ai else None,
+        'generation_strategy': content_generator.strategy.stats() if content_generator.use_ai else None,
+        'job_queue': job_queue.stats(),
+        'drafts': content_generator.drafts.stats() if content_generator.use_ai else None
+    })
 
 @app.route('/api/save-data', methods=['POST'])
 def save_data():
@@ -77,19 +128,143 @@ def load_data():
 
 @app.route('/api/analyze-job', methods=['POST'])
 def analyze_job():
-    """Analyze job description and extract keywords"""
+    """
+    Analyze job description and extract keywords
+    
+    Accepts {"job_description": ...} as JSON, or the raw JD as a text/plain
+    body, which is read and analyzed chunk by chunk with bounded memory.
+    
+    With "prepare": true (JSON only) and the "email" of a user who may generate,
+    the JD-only part of the resume generation (JD compaction, skills and, given
+    "work_experience", the title) starts in the background; pass the returned
+    draft_token to /api/generate-resume.
+    """
     try:
+        if request.mimetype == 'text/plain':
+            chunks = iter(lambda: request.stream.read(STREAM_READ_SIZE), b'')
+            analysis = ats_matcher.analyze_stream(chunks)
+            return jsonify({
+                'success': True,
+                'keywords': ats_matcher.keywords_from_analysis(analysis),
+                'suggested_skills': ats_matcher.skills_from_analysis(analysis),
+                'truncated': analysis['truncated']
+            })
+        
         data = request.json
         job_description = data.get('job_description', '')
         
         # Extract keywords and skills from job description
-        keywords = ats_matcher.extract_keywords(job_description)
-        suggested_skills = ats_matcher.get_relevant_skills(job_description)
+        keywords, suggested_skills = ats_matcher.keywords_and_skills(job_description)
+        
+        # The user still has the rest of the form to fill in: use that time for the AI work
+        draft_token = None
+        if data.get('prepare'):
+            try:
+                # Drafts cost AI calls: only for users who could generate the resume
+                user, error = _check_generation_access(data.get('email', '').strip().lower())
+                if user:
+                    draft_token = content_generator.prepare_draft(job_description, data.get('work_experience'))
+            except Exception as e:
+                # Only a head start: the analysis itself still succeeds
+                print(f"[WARN] Could not start a draft: {e}")
         
         return jsonify({
             'success': True,
             'keywords': keywords,
-            'suggested_skills': suggested_skills
+            'suggested_skills': suggested_skills,
+            'draft_token': draft_token
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _iter_ndjson(stream):
+    """Yield one parsed JSON value per non-empty line of a request stream"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+@app.route('/api/analyze-jobs', methods=['POST'])
+def analyze_jobs():
+    """
+    Analyze many job descriptions at once
+    
+    Accepts {"job_descriptions": [...]} or an application/x-ndjson body (one JD
+    string or {"id", "job_description"} object per line). Results are streamed
+    back as NDJSON in completion order, each tagged with its input index.
+    """
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            job_descriptions = _iter_ndjson(request.stream)
+        else:
+            data = request.json or {}
+            job_descriptions = data.get('job_descriptions', [])
+            if not isinstance(job_descriptions, list):
+                return jsonify({'success': False, 'error': 'job_descriptions must be a list'}), 400
+            if len(job_descriptions) > MAX_BATCH_SIZE:
+                return jsonify({'success': False, 'error': f'At most {MAX_BATCH_SIZE} job descriptions per request'}), 413
+        
+        def generate():
+            try:
+                for result in batch_analyzer.analyze(islice(job_descriptions, MAX_BATCH_SIZE)):
+                    yield json.dumps(result) + '\n'
+            except ValueError as e:
+                # Malformed NDJSON line: report it and stop the stream
+                yield json.dumps({'success': False, 'error': f'Invalid NDJSON: {e}'}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _scored_texts(items: list, field: str, allow_resume_data: bool):
+    """Return (texts, None), or (None, 400 response naming the first invalid item)"""
+    texts = []
+    for index, item in enumerate(items):
+        text = None
+        if isinstance(item, str):
+            text = item
+        elif allow_resume_data and isinstance(item, dict):
+            try:
+                text = match_scorer.resume_text(item)
+            except (AttributeError, TypeError):
+                pass
+        if text is None:
+            expected = 'a string or resume data object' if allow_resume_data else 'a string'
+            error = f'{field}[{index}] must be {expected}'
+        elif len(text) > MAX_SCORED_TEXT_LENGTH:
+            error = f'{field}[{index}] is longer than {MAX_SCORED_TEXT_LENGTH} characters'
+        else:
+            texts.append(text)
+            continue
+        return None, (jsonify({'success': False, 'error': error, 'field': field, 'index': index}), 400)
+    return texts, None
+
+@app.route('/api/match-scores', methods=['POST'])
+def match_scores():
+    """Score every resume against every job description (TF-IDF skill vectors)"""
+    try:
+        data = request.json or {}
+        resumes = data.get('resumes', [])
+        job_descriptions = data.get('job_descriptions', [])
+        
+        if not isinstance(resumes, list) or not isinstance(job_descriptions, list):
+            return jsonify({'success': False, 'error': 'resumes and job_descriptions must be lists'}), 400
+        if len(resumes) > MAX_BATCH_SIZE or len(job_descriptions) > MAX_BATCH_SIZE:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_SIZE} resumes and job descriptions per request'}), 413
+        
+        resume_texts, error = _scored_texts(resumes, 'resumes', allow_resume_data=True)
+        if error:
+            return error
+        job_texts, error = _scored_texts(job_descriptions, 'job_descriptions', allow_resume_data=False)
+        if error:
+            return error
+        
+        scores = match_scorer.score_matrix(resume_texts, job_texts)
+        
+        return jsonify({
+            'success': True,
+            'cosine': scores['cosine'].round(4).tolist(),
+            'coverage': scores['coverage'].round(4).tolist()
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -107,87 +282,390 @@ def get_all_keywords():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/admin/reload-skills', methods=['POST'])
+def reload_skills():
+    """
+    Recompile the skills database and swap the new index in (requires admin key)
+    
+    Other workers notice the replaced artifact within SKILLS_RELOAD_CHECK_INTERVAL
+    seconds and swap it in themselves.
+    """
+    auth_key = request.headers.get('X-Admin-Key')
+    if auth_key != ADMIN_KEY:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        info = ats_matcher.reload_skills(recompile=True)
+        return jsonify({'success': True, **info})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _check_generation_access(user_email: str):
+    """Return (user, None) if the user may generate a resume, else (None, error response)"""
+    if not user_email:
+        return None, (jsonify({
+            'success': False,
+            'error': 'Email is required',
+            'needs_email': True
+        }), 400)
+    
+    # Get or create user
+    user = User.get_or_create(user_email)
+    
+    # Check if user can generate
+    if not user.can_generate():
+        return None, _payment_required()
+    
+    return user, None
+
+def _payment_required():
+    return jsonify({
+        'success': False,
+        'error': 'Payment required for unlimited access',
+        'needs_payment': True,
+        'price': 25.00
+    }), 402  # 402 Payment Required
+
+def _record_generation(user, user_email: str, free_reserved: bool = False):
+    """Count a successful generation against the user's quota and log it"""
+    if free_reserved:
+        # The free generation was already taken when the job was queued
+        user.increment_generations()
+        remaining = user.get_remaining_free_tries()
+        print(f"📝 Free generation used for {user_email} ({remaining} remaining)")
+    elif not user.is_paid:
+        # This is one of their free generations
+        user.mark_free_used()
+        remaining = user.get_remaining_free_tries()
+        print(f"📝 Free generation used for {user_email} ({remaining} remaining)")
+    else:
+        # Increment generation count for paid users
+        user.increment_generations()
+    
+    # Track event for analytics
+    from models.analytics import UsageEvent
+    UsageEvent.log_event('resume_generated', user_email=user_email)
+
+def record_job_generation(user_email: str, free_reserved: bool):
+    """Count a generation finished by a job worker"""
+    with app.app_context():
+        _record_generation(User.get_or_create(user_email), user_email, free_reserved)
+
+def refund_job_generation(payload: dict):
+    """Give back the free generation reserved by a job that failed or was cancelled"""
+    if payload.get('free_reserved'):
+        _refund_free_generation(payload['email'])
+
+def _refund_free_generation(user_email: str):
+    """Give back a reserved free generation whose resume was not delivered"""
+    try:
+        with app.app_context():
+            user = User.get_by_email(user_email)
+            if user:
+                user.refund_free_generation()
+                print(f"↩️  Free generation given back to {user_email} ({user.get_remaining_free_tries()} remaining)")
+    except Exception as e:
+        print(f"[WARN] Could not give back the free generation of {user_email}: {e}")
+
+def _download_name(resume_data):
+    return f"Resume_{resume_data['personal_info']['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+def _job_status(job) -> dict:
+    """JSON body describing a queued job"""
+    def when(timestamp):
+        return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+    
+    status = {
+        'success': True,
+        'job_id': job['id'],
+        'status': job['status'],
+        'position': job['position'],
+        'attempts': job['attempts'],
+        'created_at': when(job['created']),
+        'started_at': when(job['started']),
+        'finished_at': when(job['finished']),
+        'status_url': f"/api/jobs/{job['id']}",
+        'events_url': f"/api/jobs/{job['id']}/events"
+    }
+    if job['status'] == DONE:
+        status.update({
+            'download_url': f"/api/jobs/{job['id']}/download",
+            'filename': job['result']['filename'],
+            'generation_report': job['result']['generation_report']
+        })
+    elif job['error']:
+        status['error'] = job['error']
+    return status
+
 @app.route('/api/generate-resume', methods=['POST'])
 def generate_resume():
-    """Generate ATS-optimized PDF resume with auto-generated content"""
+    """
+    Queue an ATS-optimized resume for generation
+    
+    Returns 202 with a job id right away; a worker process generates the
+    content and the PDF. Poll GET /api/jobs/<id> (or subscribe to
+    /api/jobs/<id>/events) and fetch the PDF from /api/jobs/<id>/download.
+    """
     try:
-        data = request.json
+        data = request.json or {}
         job_description = data.get('job_description', '')
         user_data = data.get('user_data', {})
         user_email = data.get('email', '').strip().lower()
         
         # Check user access
-        if not user_email:
-            return jsonify({
-                'success': False,
-                'error': 'Email is required',
-                'needs_email': True
-            }), 400
+        user, error = _check_generation_access(user_email)
+        if error:
+            return error
         
-        # Get or create user
-        user = User.get_or_create(user_email)
+        # Free generations are taken now, not when the job finishes, so queueing several
+        # jobs at once cannot go past the limit (given back if the job fails or is cancelled)
+        free_reserved = not user.is_paid
+        if free_reserved and not user.reserve_free_generation():
+            return _payment_required()
         
-        # Check if user can generate
-        if not user.can_generate():
-            return jsonify({
-                'success': False,
-                'error': 'Payment required for unlimited access',
-                'needs_payment': True,
-                'price': 25.00
-            }), 402  # 402 Payment Required
-        
-        print("\n" + "=" * 60)
-        print("🔄 GENERATING RESUME WITH AI")
-        print("=" * 60)
-        print(f"User: {user_email} (Paid: {user.is_paid}, Free Used: {user.free_generations_used}/3)")
-        print(f"Job Description Length: {len(job_description)} characters")
-        print(f"Job Description Preview: {job_description[:200]}...")
-        print(f"Companies: {[exp.get('company') for exp in user_data.get('work_experience', [])]}")
-        
-        # Auto-generate all professional content
-        print("\n🤖 Calling AI to generate content...")
-        complete_resume_data = content_generator.generate_full_resume_data(user_data, job_description)
-        
-        print(f"\n✅ AI Generated:")
-        print(f"   Title: {complete_resume_data['personal_info'].get('title', '')[:80]}...")
-        print(f"   Summary: {complete_resume_data.get('professional_summary', '')[:80]}...")
-        print(f"   Work Experiences: {len(complete_resume_data.get('work_experience', []))}")
-        for i, exp in enumerate(complete_resume_data.get('work_experience', [])):
-            print(f"     {i+1}. {exp.get('title')} at {exp.get('company')}")
-        
-        # Generate PDF
-        print("\n📄 Generating PDF...")
-        pdf_path = pdf_generator.generate_pdf(complete_resume_data)
-        print(f"✅ PDF created: {pdf_path}")
-        print("=" * 60 + "\n")
-        
-        # Mark usage AFTER successful generation
-        if not user.is_paid:
-            # This is one of their free generations
-            user.mark_free_used()
-            remaining = user.get_remaining_free_tries()
-            print(f"📝 Free generation used for {user_email} ({remaining} remaining)")
-        else:
-            # Increment generation count for paid users
-            user.increment_generations()
-        
-        # Track event for analytics
-        from models.analytics import UsageEvent
-        UsageEvent.log_event('resume_generated', user_email=user_email)
-        
-        # Return the PDF file
-        return send_file(
-            pdf_path,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f"Resume_{complete_resume_data['personal_info']['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        )
+        try:
+            job_id = job_queue.enqueue({
+                'email': user_email,
+                'user_data': user_data,
+                'job_description': job_description,
+                # Regenerating asks the AI for new wording instead of cached completions
+                'fresh': bool(data.get('regenerate', False)),
+                # From /api/analyze-job with "prepare": true
+                'draft_token': data.get('draft_token'),
+                'free_reserved': free_reserved
+            })
+        except Exception:
+            if free_reserved:
+                user.refund_free_generation()
+            raise
+        job = job_queue.get(job_id)
+        print(f"📥 Queued resume job {job_id} for {user_email} ({job['position']} ahead, "
+              f"{len(job_description)} chars of JD)")
+        
+        response = jsonify(_job_status(job))
+        response.headers['Location'] = f'/api/jobs/{job_id}'
+        return response, 202
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status of a queued resume job (poll this, or subscribe to /events)"""
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+        return jsonify(_job_status(job))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Follow a resume job as Server-Sent Events
+    
+    'queued' (with the queue position) while waiting, then the section events of
+    /api/generate-resume/stream ('started', 'skills', 'title_delta'/'title', ...),
+    then 'done' with the download link or 'error'. Each section event carries its
+    sequence number as the SSE id; reconnect with ?after=<id> (or Last-Event-ID)
+    to continue where the stream stopped.
+    """
+    try:
+        if job_queue.get(job_id) is None:
+            return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+        after = int(request.args.get('after') or request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'after must be an event id'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    def generate():
+        nonlocal after
+        position = None
+        last_sent = time.time()
+        while True:
+            job = job_queue.get(job_id)
+            # Events are written before the job finishes, so this read has them all
+            for seq, event, data in job_queue.events(job_id, after):
+                after = seq
+                last_sent = time.time()
+                yield f"id: {seq}\n" + _sse(event, data)
+            
+            if job is None:
+                yield _sse('error', {'success': False, 'error': 'Job not found or expired'})
+                return
+            if job['status'] == DONE:
+                yield _sse('done', job['result'])
+                return
+            if job['status'] in FINISHED:
+                yield _sse('error', {'success': False, 'status': job['status'], 'error': job['error']})
+                return
+            if job['position'] != position:
+                position = job['position']
+                if position is not None:
+                    last_sent = time.time()
+                    yield _sse('queued', {'position': position})
+            if time.time() - last_sent >= SSE_HEARTBEAT_INTERVAL:
+                last_sent = time.time()
+                yield ': keep-alive\n\n'
+            time.sleep(JOB_STATUS_POLL_INTERVAL)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def job_download(job_id):
+    """Download the PDF of a finished resume job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    if job['status'] != DONE:
+        return jsonify({'success': False, 'status': job['status'], 'error': 'Resume is not ready'}), 409
+    pdf_path = pdf_downloads.resolve(job['result']['token'])
+    if pdf_path is None:
+        return jsonify({'success': False, 'error': 'Download link is invalid or has expired'}), 404
+    response = send_file(
+        pdf_path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=job['result']['filename']
+    )
+    # Sections written from templates because the AI ran out of time
+    degraded = (job['result'].get('generation_report') or {}).get('degraded_sections')
+    if degraded:
+        response.headers['X-Degraded-Sections'] = ','.join(degraded)
+    return response
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running resume job (it is not counted against the user)"""
+    try:
+        if not job_queue.cancel(job_id):
+            return jsonify({'success': False, 'error': 'Job not found or already finished'}), 404
+        print(f"🛑 Resume job {job_id} cancelled")
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'cancelled'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/generate-resume/stream', methods=['POST'])
+def generate_resume_stream():
+    """
+    Generate a resume in this request, streaming each section as Server-Sent Events
+    
+    Takes the same body as /api/generate-resume but does not go through the job
+    queue. Events: 'started', 'skills',
+    'title_delta'/'title', 'summary_delta'/'summary', 'job_title', 'job_delta'/'job'
+    (each with the position index), then 'done' with a download URL for the PDF and
+    the per-section timings, or 'error'. If the client disconnects, the outstanding
+    AI calls are cancelled and the generation is not counted.
+    
+    A free user's generation is reserved before the stream starts (403 when none
+    are left) and given back if the resume is not delivered.
+    """
+    free_reserved = False
+    try:
+        data = request.json or {}
+        job_description = data.get('job_description', '')
+        user_data = data.get('user_data', {})
+        user_email = data.get('email', '').strip().lower()
+        fresh = bool(data.get('regenerate', False))
+        draft_token = data.get('draft_token')
+        
+        user, error = _check_generation_access(user_email)
+        if error:
+            return error
+        
+        # Taken up front as for queued jobs, so parallel or abandoned streams cannot go
+        # past the free limit (given back if the resume is not delivered)
+        free_reserved = not user.is_paid
+        if free_reserved and not user.reserve_free_generation():
+            response, _ = _payment_required()
+            return response, 403
+        
+        print(f"\n🔄 STREAMING RESUME GENERATION for {user_email} ({len(job_description)} chars of JD)")
+        
+        # Sections arrive on the AI event loop thread; this request's thread relays them
+        events = queue.Queue()
+        future = get_runtime().submit(content_generator.agenerate_full_resume_data(
+            user_data, job_description, fresh=fresh, draft_token=draft_token,
+            emit=lambda event, payload: events.put((event, payload))
+        ))
+        future.add_done_callback(lambda _: events.put(None))
+        
+        # Set once the generation is counted; anything else gives the reservation back
+        outcome = {'delivered': False}
+        
+        def generate():
+            try:
+                yield _sse('started', {'positions': len(user_data.get('work_experience', []))})
+                while True:
+                    try:
+                        item = events.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                    except queue.Empty:
+                        yield ': keep-alive\n\n'
+                        continue
+                    if item is None:
+                        break
+                    yield _sse(*item)
+                
+                complete_resume_data = future.result()
+                pdf_path = pdf_generator.generate_pdf(complete_resume_data)
+                # Loaded again: the request's user object does not belong to this context's session
+                _record_generation(User.get_or_create(user_email), user_email, free_reserved)
+                outcome['delivered'] = True
+                token = pdf_downloads.issue(pdf_path)
+                print(f"✅ Streamed resume ready: {pdf_path}")
+                yield _sse('done', {
+                    'token': token,
+                    'download_url': f'/api/download/{token}',
+                    'filename': _download_name(complete_resume_data),
+                    'generation_report': complete_resume_data.get('generation_report')
+                })
+            except Exception as e:
+                print(f"\n❌ ERROR: {str(e)}")
+                yield _sse('error', {'success': False, 'error': str(e)})
+            finally:
+                # Runs on completion and when the client goes away mid-stream;
+                # in the latter case this stops the in-flight API calls
+                if future.cancel():
+                    print("[AI] Client disconnected, cancelled resume generation")
+        
+        def give_back():
+            if free_reserved and not outcome['delivered']:
+                _refund_free_generation(user_email)
+        
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        # Runs when the stream ends for any reason, even if the client left before it started
+        response.call_on_close(give_back)
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    except Exception as e:
+        if free_reserved:
+            _refund_free_generation(user_email)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/download/<token>', methods=['GET'])
+def download_resume(token):
+    """Download a PDF produced by /api/generate-resume/stream or a resume job"""
+    pdf_path = pdf_downloads.resolve(token)
+    if pdf_path is None:
+        return jsonify({'success': False, 'error': 'Download link is invalid or has expired'}), 404
+    return send_file(
+        pdf_path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=request.args.get('filename') or os.path.basename(pdf_path)
+    )
+
 if __name__ == '__main__':
     # Create necessary directories
     os.makedirs('data', exist_ok=True)
@@ -204,5 +682,12 @@ if __name__ == '__main__':
     print(f"🔧 Debug Mode: {debug_mode}")
     print(f"🔧 Host: {host}:{port}")
     
+    # Without separate worker processes (python app.py), run queued jobs in this process
+    if os.getenv('RUN_JOB_WORKER', 'true').lower() == 'true':
+        from worker import JobWorker
+        JobWorker(job_queue, content_generator, pdf_generator, pdf_downloads,
+                  record_usage=record_job_generation,
+                  download_name=_download_name).start()
+    
     # use_reloader=False to fix Windows socket issue and for production stability
     app.run(debug=debug_mode, host=host, port=port, use_reloader=False)
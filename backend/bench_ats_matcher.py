@@ -0,0 +1,306 @@
+"""
+ATSMatcher Benchmark - throughput, latency and memory of the keyword engine
+
+Runs entirely offline against a synthetic, seeded job description corpus.
+
+Usage:
+    python bench_ats_matcher.py [--quick] [--output report.json] [--compare baseline.json]
+
+Dimensions:
+    --sizes        JD sizes in bytes (default: 1KB, 10KB, 100KB, 1MB)
+    --densities    Fraction of JD words that are skills (default: 0.02, 0.1, 0.3)
+    --vocab-sizes  Skills database sizes; 0 means the real database (default: 100, 0, 5000)
+
+Every combination is measured cold (analysis cache cleared before each call)
+and warm (cached analysis). With --compare the run exits non-zero if any
+cold p50 latency regressed by more than --max-regression.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.ats_matcher import ATSMatcher
+from services.skill_index import SKILLS_SOURCE
+
+DEFAULT_SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024]
+QUICK_SIZES = [1024, 10 * 1024, 100 * 1024]
+DEFAULT_DENSITIES = [0.02, 0.1, 0.3]
+DEFAULT_VOCAB_SIZES = [100, 0, 5000]
+
+FILLER_WORDS = (
+    'we are looking for a motivated engineer to join our growing team and help build '
+    'reliable products that customers love you will work closely with design product and '
+    'operations to deliver features ship improvements and maintain high quality standards '
+    'across the platform while mentoring others and sharing knowledge'
+).split()
+FILLER_PHRASES = ['Acme Corp', 'Customer Success', 'Northwind Labs', 'Quarterly Planning',
+                  'Platform Team', 'Growth Squad', 'Remote First']
+HEADINGS = ['Responsibilities:', 'Requirements:', 'Nice to have:', 'Benefits:', 'About us:']
+SYLLABLES = ['zen', 'tro', 'vak', 'lum', 'qor', 'dex', 'pli', 'nar', 'sto', 'gral', 'fyn', 'bex']
+
+OPERATIONS = ['extract_keywords', 'get_relevant_skills', 'optimize_resume_content', '_generate_summary']
+
+
+def build_skills_database(vocab_size: int, workdir: str, seed: int) -> str:
+    """
+    Write a skills database with vocab_size skills and return its path
+
+    The real database is used as-is for vocab_size 0, truncated for smaller
+    sizes and padded with generated skill names for larger ones.
+    """
+    with open(SKILLS_SOURCE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if vocab_size <= 0:
+        return SKILLS_SOURCE
+
+    skills = [skill for category in data['skills'].values() for skill in category]
+    rng = random.Random(seed)
+    known = {skill.lower() for skill in skills}
+    while len(skills) < vocab_size:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.3:
+            name += ' ' + rng.choice(['DB', 'JS', 'Cloud', 'Studio', 'Engine'])
+        if name.lower() not in known:
+            known.add(name.lower())
+            skills.append(name)
+
+    data['skills'] = {'Benchmark': skills[:vocab_size]}
+    path = os.path.join(workdir, f'skills_{vocab_size}.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+def generate_job_description(size: int, density: float, vocabulary: list, seed: int) -> str:
+    """Generate a sectioned JD of roughly size bytes where density of the words are skills"""
+    rng = random.Random(seed)
+    lines = [f'Senior {rng.choice(vocabulary)} Engineer']
+    length = len(lines[0]) + 1
+    words_in_line = []
+
+    while length < size:
+        if not words_in_line and rng.random() < 0.08:
+            line = rng.choice(HEADINGS)
+        else:
+            roll = rng.random()
+            if roll < density:
+                word = rng.choice(vocabulary)
+            elif roll < density + 0.03:
+                word = rng.choice(FILLER_PHRASES)
+            else:
+                word = rng.choice(FILLER_WORDS)
+            words_in_line.append(word)
+            if len(words_in_line) < rng.randint(8, 16):
+                continue
+            line = '- ' + ' '.join(words_in_line) + '.'
+            words_in_line = []
+        lines.append(line)
+        length += len(line.encode('utf-8')) + 1
+
+    return '\n'.join(lines)[:size]
+
+
+def sample_user_data(vocabulary: list, seed: int) -> dict:
+    """A representative resume payload for optimize_resume_content/_generate_summary"""
+    rng = random.Random(seed)
+    return {
+        'personal_info': {'full_name': 'Bench Mark', 'email': 'bench@example.com'},
+        'skills': rng.sample(vocabulary, min(20, len(vocabulary))),
+        'work_experience': [
+            {'company': f'Company {i}', 'position': 'Software Engineer',
+             'start_date': 'January 2018', 'end_date': 'Present'}
+            for i in range(4)
+        ],
+        'education': [{'institution': 'State University', 'degree': 'BSc Computer Science'}],
+    }
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def run_operation(matcher: ATSMatcher, operation: str, job_description: str, user_data: dict):
+    if operation == 'extract_keywords':
+        return matcher.extract_keywords(job_description)
+    if operation == 'get_relevant_skills':
+        return matcher.get_relevant_skills(job_description)
+    if operation == 'optimize_resume_content':
+        return matcher.optimize_resume_content(user_data, job_description)
+    return matcher._generate_summary(user_data, job_description)
+
+
+def measure(matcher: ATSMatcher, operation: str, job_description: str, user_data: dict,
+            cold: bool, min_time: float, min_runs: int, max_runs: int) -> dict:
+    """Time one operation repeatedly and measure its peak memory in a separate run"""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_runs and (len(timings) < min_runs or time.perf_counter() - started < min_time):
+        if cold:
+            matcher.analysis_cache.clear()
+        t0 = time.perf_counter()
+        run_operation(matcher, operation, job_description, user_data)
+        timings.append(time.perf_counter() - t0)
+
+    # tracemalloc slows execution down, so memory is measured outside the timed runs
+    if cold:
+        matcher.analysis_cache.clear()
+    tracemalloc.start()
+    run_operation(matcher, operation, job_description, user_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        'runs': len(timings),
+        'ops_per_sec': round(len(timings) / total, 2) if total else 0.0,
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(args) -> dict:
+    results = []
+    workdir = tempfile.mkdtemp(prefix='ats_bench_')
+    try:
+        for vocab_size in args.vocab_sizes:
+            skills_path = build_skills_database(vocab_size, workdir, args.seed)
+            matcher = ATSMatcher(skills_path=skills_path)
+            vocabulary = sorted(matcher.tech_skills_database)
+            user_data = sample_user_data(vocabulary, args.seed)
+            print(f"\n📚 Vocabulary: {len(vocabulary)} skills ({matcher.index_id})")
+
+            for size in args.sizes:
+                for density in args.densities:
+                    job_description = generate_job_description(size, density, vocabulary, args.seed)
+                    for operation in args.operations:
+                        for cold in (True, False):
+                            stats = measure(matcher, operation, job_description, user_data, cold,
+                                            args.min_time, args.min_runs, args.max_runs)
+                            result = {
+                                'operation': operation,
+                                'vocab_size': len(vocabulary),
+                                'jd_bytes': size,
+                                'density': density,
+                                'cache': 'cold' if cold else 'warm',
+                                **stats,
+                            }
+                            results.append(result)
+                            print(f"  {operation:<24} {size // 1024:>5}KB  density={density:<5} "
+                                  f"{result['cache']:<4}  p50={stats['p50_ms']:>9.3f}ms  "
+                                  f"p99={stats['p99_ms']:>9.3f}ms  {stats['ops_per_sec']:>10.1f} ops/s  "
+                                  f"peak={stats['peak_memory_kb']:>9.1f}KB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'benchmark': 'ats_matcher',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'seed': args.seed,
+            'sizes': args.sizes,
+            'densities': args.densities,
+            'vocab_sizes': args.vocab_sizes,
+            'operations': args.operations,
+            'min_time': args.min_time,
+        },
+        'results': results,
+    }
+
+
+def result_key(result: dict) -> tuple:
+    return (result['operation'], result['vocab_size'], result['jd_bytes'], result['density'], result['cache'])
+
+
+def compare_reports(report: dict, baseline: dict, max_regression: float) -> list:
+    """Return descriptions of cold-cache p50 regressions beyond max_regression"""
+    baseline_results = {result_key(r): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        previous = baseline_results.get(result_key(result))
+        if result['cache'] != 'cold' or not previous or not previous['p50_ms']:
+            continue
+        change = result['p50_ms'] / previous['p50_ms'] - 1
+        if change > max_regression:
+            regressions.append(f"{result['operation']} vocab={result['vocab_size']} "
+                               f"{result['jd_bytes']}B density={result['density']}: "
+                               f"p50 {previous['p50_ms']}ms -> {result['p50_ms']}ms (+{change:.0%})")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the ATSMatcher keyword engine')
+    parser.add_argument('--sizes', type=int, nargs='+', help='JD sizes in bytes')
+    parser.add_argument('--densities', type=float, nargs='+', default=DEFAULT_DENSITIES)
+    parser.add_argument('--vocab-sizes', type=int, nargs='+', default=DEFAULT_VOCAB_SIZES,
+                        help='Skills database sizes (0 = the real database)')
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument('--min-time', type=float, default=1.0, help='Seconds spent per measurement')
+    parser.add_argument('--min-runs', type=int, default=5)
+    parser.add_argument('--max-runs', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--quick', action='store_true', help='Smaller corpus and shorter runs (for CI)')
+    parser.add_argument('--output', default='ats_matcher_benchmark.json', help='Path of the JSON report')
+    parser.add_argument('--compare', help='Baseline report to check for regressions')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Allowed relative p50 slowdown against the baseline')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes = args.sizes or QUICK_SIZES
+        args.min_time = min(args.min_time, 0.2)
+        args.min_runs = min(args.min_runs, 3)
+    args.sizes = args.sizes or DEFAULT_SIZES
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print("=" * 80)
+    print("⏱️  ATS MATCHER BENCHMARK")
+    print("=" * 80)
+
+    report = run_benchmarks(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] Report with {len(report['results'])} measurements written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.max_regression)
+        if regressions:
+            print(f"\n[FAIL] {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"[OK] No regressions against {args.compare}")
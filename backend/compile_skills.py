@@ -0,0 +1,30 @@
+"""
+Compile the skills database into the index artifact loaded by ATSMatcher
+
+Usage:
+    python compile_skills.py [skills.json] [skills.idx]
+
+Running workers pick up the new artifact automatically within
+SKILLS_RELOAD_CHECK_INTERVAL seconds (or immediately on SIGUSR2).
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.skill_index import SKILLS_SOURCE, compile_skill_index, default_index_path
+
+if __name__ == '__main__':
+    source_path = sys.argv[1] if len(sys.argv) > 1 else SKILLS_SOURCE
+    index_path = sys.argv[2] if len(sys.argv) > 2 else default_index_path(source_path)
+
+    try:
+        index = compile_skill_index(source_path, index_path)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Could not compile {source_path}: {e}")
+        sys.exit(1)
+
+    print(f"[OK] Compiled {len(index.vocabulary)} skills "
+          f"({len(index.taxonomy)} canonical, {len(index.automaton)} spellings)")
+    print(f"[OK] Index {index.index_id} written to {index_path}")
@@ -2,6 +2,7 @@
 User model for tracking users and their payment status
 """
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from .database import db
 
 class User(db.Model):
@@ -66,6 +67,27 @@ class User(db.Model):
         self.total_generations += 1
         db.session.commit()
     
+    def reserve_free_generation(self):
+        """
+        Take one of the free generations before the resume is made (for queued jobs)
+        
+        A single conditional UPDATE, so parallel requests cannot take more than
+        FREE_GENERATION_LIMIT between them. Returns False if none are left.
+        """
+        reserved = User.query.filter(
+            User.id == self.id, User.free_generations_used < self.FREE_GENERATION_LIMIT
+        ).update({User.free_generations_used: User.free_generations_used + 1}, synchronize_session=False)
+        db.session.commit()
+        db.session.refresh(self)
+        return reserved == 1
+    
+    def refund_free_generation(self):
+        """Give back a reserved free generation whose resume was never delivered"""
+        User.query.filter(User.id == self.id, User.free_generations_used > 0).update(
+            {User.free_generations_used: User.free_generations_used - 1}, synchronize_session=False)
+        db.session.commit()
+        db.session.refresh(self)
+    
     def mark_paid(self):
         """Mark user as paid (lifetime access)"""
         self.is_paid = True
@@ -85,7 +107,12 @@ class User(db.Model):
         if not user:
             user = cls(email=email)
             db.session.add(user)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Created by a parallel request in the meantime
+                db.session.rollback()
+                user = cls.query.filter_by(email=email).first()
         return user
     
     @classmethod
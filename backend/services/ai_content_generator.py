@@ -2,26 +2,526 @@
 AI-Powered Content Generator using DeepSeek API
 Generates contextually relevant resume content based on job descriptions
 """
-from openai import OpenAI
-from typing import List, Dict, Any
+from openai import (AsyncOpenAI, DefaultAsyncHttpxClient, APIConnectionError, InternalServerError,
+                    RateLimitError)
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import os
 import json
 import re
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import httpx
 import time
+import uuid
+from contextvars import ContextVar
+from services.async_runtime import get_runtime
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from services.completion_cache import CompletionCache, completion_key
+from services.hedging import Hedger
+from services.rate_governor import RateGovernor, get_governor
+from services.singleflight import Singleflight
+
+MODEL = "deepseek-chat"
+
+# Reuse completions for identical prompts across requests and workers
+COMPLETION_CACHE_ENABLED = os.getenv('COMPLETION_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Upper bound on in-flight API calls (and pooled connections) per worker process
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 100))
+
+# Retries after 429s, connection errors and 5xx responses (the governor paces them)
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', 2))
+
+# Identical concurrent prompts share one API call. A caller gives up after
+# AI_SINGLEFLIGHT_WAIT seconds; a worker's claim on a prompt lapses after the lease TTL.
+SINGLEFLIGHT_WAIT = float(os.getenv('AI_SINGLEFLIGHT_WAIT', 90))
+SINGLEFLIGHT_LEASE_TTL = float(os.getenv('AI_SINGLEFLIGHT_LEASE_TTL', 120))
+SINGLEFLIGHT_POLL_INTERVAL = 0.2
+
+# One-call (batch) generation: completion budget and what each section needs of it
+BATCH_MAX_TOKENS = 8000
+BATCH_BASE_TOKENS = 500
+BATCH_RECENT_JOB_TOKENS = 1200
+BATCH_OLDER_JOB_TOKENS = 900
+BATCH_JOB_TITLE_TOKENS = 40
+MIN_DESCRIPTION_WORDS = 120
+
+# Every prompt starts with SYSTEM_PROMPT and the request's shared context (see
+# prompt_context), so DeepSeek's prefix cache can serve the calls of one resume.
+# With AI_PREFIX_WARMUP one short call sends that prefix before the fan-out.
+PREFIX_WARMUP = os.getenv('AI_PREFIX_WARMUP', 'false').lower() == 'true'
+
+SYSTEM_PROMPT = """You are a professional resume writer. You write ATS-optimized resume content that presents the candidate as a strong match for the target job, using the skills and terminology of its job description.
+Follow the output format of each task exactly: return only the requested content, with no introductions, explanations or labels."""
+
+def _retry_after(error: RateLimitError):
+    """Seconds the provider asked us to wait, if it said"""
+    try:
+        return float(error.response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+# Counters of the current request's AI calls (see track_request_usage); tasks inherit them
+_request_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar('ai_request_usage', default=None)
+
+def track_request_usage() -> Dict[str, int]:
+    """
+    Start counting the API calls and cache hits made from the current context
+    
+    Call at the top of a coroutine (it runs in its own task); the returned dict
+    is updated by every AI call made by it and the tasks it creates afterwards.
+    Besides the call counts it sums the prompt tokens the API reported (and
+    how many of them DeepSeek served from its prefix cache), the attempts that
+    raised (failed_calls, retried or not) and, for streamed calls, the
+    milliseconds until the first text arrived.
+    """
+    usage = {'api_calls': 0, 'cache_hits': 0, 'hedges': 0, 'failed_calls': 0, 'prompt_tokens': 0,
+             'prompt_cache_hit_tokens': 0, 'streamed_calls': 0, 'first_token_ms': 0}
+    _request_usage.set(usage)
+    return usage
+
+class LatencyBudgetExceeded(asyncio.TimeoutError):
+    """Raised by an AI call when the request's latency budget has run out"""
+
+# Monotonic deadline of the current request's AI calls (see set_request_budget)
+_request_deadline: ContextVar[Optional[float]] = ContextVar('ai_request_deadline', default=None)
+
+def set_request_budget(seconds: Optional[float]) -> Optional[float]:
+    """
+    Give the AI calls made from the current context (and the tasks it creates) seconds to finish
+    
+    Call at the top of the request's coroutine, like track_request_usage().
+    Calls are cut short at the deadline with LatencyBudgetExceeded, which the
+    section methods let through so the caller can fill the section another way.
+    
+    Returns:
+        The deadline on the time.monotonic() clock (None for no budget)
+    """
+    deadline = time.monotonic() + seconds if seconds else None
+    _request_deadline.set(deadline)
+    return deadline
+
+def request_time_left() -> Optional[float]:
+    """Seconds left of the current request's latency budget (None if it has none)"""
+    deadline = _request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def _count_usage(counter: str, amount: int = 1):
+    usage = _request_usage.get()
+    if usage is not None:
+        usage[counter] += amount
+
+def _section_text(value: Any, min_words: int = 1, max_chars: int = None) -> Optional[str]:
+    """Return value stripped if it is usable text for a resume section, else None"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if len(value.split()) < min_words:
+        return None
+    if max_chars is not None and (len(value) > max_chars or '\n' in value):
+        return None
+    return value
+
+def years_at_position(exp: Dict) -> int:
+    """Approximate years spent in a work history entry (3 if the dates can't be read)"""
+    start_date = exp.get('start_date', '')
+    end_date = exp.get('end_date', '')
+    try:
+        start_year = int(start_date.split()[-1]) if start_date else 2020
+        end_year = int(end_date.split()[-1]) if end_date and end_date.lower() != 'present' else 2024
+        return max(1, end_year - start_year)
+    except:
+        return 3
 
 class AIContentGenerator:
-    """Uses DeepSeek API to generate highly relevant resume content"""
+    """
+    Uses DeepSeek API to generate highly relevant resume content
+    
+    Every generation method has an async variant (prefixed with 'a') that can
+    be awaited from the worker's event loop; the synchronous methods run that
+    variant on the shared loop (see services/async_runtime.py).
+    """
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, completion_cache: CompletionCache = None,
+                 governor: RateGovernor = None, breaker: CircuitBreaker = None):
         self.api_key = api_key or os.getenv('DEEPSEEK_API_KEY', 'sk-7169c5b77a904b539902f117a55abf01')
-        # DeepSeek API is OpenAI-compatible, just needs a different base URL
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.deepseek.com/v1"
+        if completion_cache is None and COMPLETION_CACHE_ENABLED:
+            completion_cache = CompletionCache()
+        self.completion_cache = completion_cache
+        self.governor = governor or get_governor()
+        self.breaker = breaker or get_breaker()
+        self.singleflight = Singleflight()
+        self.hedger = Hedger()
+        self._client = None
+        self._client_pid = None
+    
+    def run(self, coro):
+        """Run one of the async methods from synchronous code (e.g. a Flask route)"""
+        return get_runtime().run(coro)
+    
+    def _async_client(self) -> AsyncOpenAI:
+        """Per-process async client; its connection pool is bound to this process's event loop"""
+        if self._client is None or self._client_pid != os.getpid():
+            limits = httpx.Limits(max_connections=AI_MAX_CONCURRENCY, max_keepalive_connections=AI_MAX_CONCURRENCY)
+            # DeepSeek API is OpenAI-compatible, just needs a different base URL
+            # Retries are done in _achat so the governor sees every attempt
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url="https://api.deepseek.com/v1",
+                http_client=DefaultAsyncHttpxClient(limits=limits),
+                max_retries=0
+            )
+            self._client_pid = os.getpid()
+        return self._client
+    
+    def prompt_context(self, job_description: str, years_experience: int = None,
+                       work_history: List[Dict] = None) -> str:
+        """
+        Shared start of the prompts for one resume: the job description and the candidate
+        
+        DeepSeek reuses the prefill of a prompt prefix it has seen recently, so
+        build this once per request and pass it to every generation method;
+        the calls then differ only in the short task that follows it.
+        """
+        lines = ["TARGET JOB DESCRIPTION:", job_description.strip(), ""]
+        if years_experience is not None or work_history:
+            lines.append("CANDIDATE PROFILE:")
+            if years_experience is not None:
+                lines.append(f"- Years of Experience: {years_experience}+ years")
+            if work_history:
+                lines.append("- Work history (most recent first):")
+                for idx, exp in enumerate(work_history):
+                    location = f" ({exp['location']})" if exp.get('location') else ""
+                    lines.append(f"  Position {idx + 1}: {exp.get('company', '')}{location}, "
+                                 f"{exp.get('start_date', '')} - {exp.get('end_date', 'Present')}")
+            lines.append("")
+        return "\n".join(lines)
+    
+    def _messages(self, context: str, task: str) -> List[Dict[str, str]]:
+        """Chat messages for a task: the fixed system prompt and shared context first, the task last"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{context}\nTASK:\n{task}"}
+        ]
+    
+    async def awarm_prefix(self, context: str):
+        """
+        Send the shared prompt prefix once, so the fan-out that follows hits DeepSeek's prefix cache
+        
+        The call asks for a single token and bypasses the completion cache; a
+        failure only means the fan-out starts cold.
+        """
+        params = {'model': MODEL, 'messages': self._messages(context, "Reply with OK."),
+                  'max_tokens': 1, 'temperature': 0}
+        try:
+            await self._governed_completion(params)
+        except Exception as e:
+            print(f"[WARN] Prompt prefix warm-up failed: {e}")
+    
+    async def _achat(self, prompt: str, max_tokens: int, temperature: float, fresh: bool = False,
+                     on_delta: Callable[[str], None] = None, json_mode: bool = False,
+                     context: str = "") -> str:
+        """
+        Send a chat completion, served from the completion cache when possible
+        
+        Args:
+            prompt: The task, appended to the shared context
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            fresh: Skip the cache lookup (the new completion still replaces the cached one)
+            on_delta: Streams the completion; called with each text fragment as it arrives
+                      (a cached completion arrives as one fragment)
+            json_mode: Ask for a JSON object response (the prompt must mention JSON)
+            context: Shared prompt prefix from prompt_context()
+            
+        Returns:
+            The raw completion text
+        """
+        messages = self._messages(context, prompt)
+        params = {'model': MODEL, 'messages': messages, 'max_tokens': max_tokens, 'temperature': temperature}
+        if json_mode:
+            params['response_format'] = {'type': 'json_object'}
+        key = completion_key(MODEL, messages, temperature, max_tokens, params.get('response_format'))
+        cache = self.completion_cache
+        
+        # SQLite calls are short but blocking, so they run off the event loop
+        if cache is not None and not fresh:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                print(f"[CACHE] Completion cache hit ({key[:12]})")
+                _count_usage('cache_hits')
+                if on_delta is not None:
+                    on_delta(cached)
+                return cached
+        
+        if fresh:
+            return await self._fetch(key, params, on_delta)
+        
+        # Identical prompts already in flight (here or in another worker) are shared, not repeated
+        return await self.singleflight.do(
+            key,
+            lambda deltas: self._fetch_shared(key, params, deltas),
+            on_delta=on_delta,
+            timeout=SINGLEFLIGHT_WAIT
         )
     
+    async def _fetch(self, key: str, params: Dict[str, Any], on_delta: Optional[Callable[[str], None]]) -> str:
+        """Call the API and store the completion in the cache"""
+        _count_usage('api_calls')
+        content, total_tokens = await self._governed_completion(params, on_delta)
+        
+        cache = self.completion_cache
+        if cache is not None and content:
+            await asyncio.to_thread(cache.put, key, MODEL, content, total_tokens or 0)
+        return content
+    
+    async def _fetch_shared(self, key: str, params: Dict[str, Any],
+                            on_delta: Optional[Callable[[str], None]]) -> str:
+        """
+        _fetch() under a cross-worker lease on the cache key
+        
+        If another worker holds the lease, wait for it to finish and read its
+        completion from the cache; if it failed, take the lease and call the API.
+        """
+        cache = self.completion_cache
+        if cache is None:
+            return await self._fetch(key, params, on_delta)
+        
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        while True:
+            if await asyncio.to_thread(cache.try_lease, key, owner, SINGLEFLIGHT_LEASE_TTL):
+                try:
+                    # The previous holder may have stored its result just before releasing
+                    cached = await asyncio.to_thread(cache.get, key, False)
+                    if cached is None:
+                        return await self._fetch(key, params, on_delta)
+                finally:
+                    await asyncio.to_thread(cache.release_lease, key, owner)
+            else:
+                print(f"[AI] Identical request in flight in another worker, waiting ({key[:12]})")
+                while await asyncio.to_thread(cache.lease_held, key):
+                    await asyncio.sleep(SINGLEFLIGHT_POLL_INTERVAL)
+                cached = await asyncio.to_thread(cache.get, key)
+            
+            if cached is not None:
+                _count_usage('cache_hits')
+                if on_delta is not None:
+                    on_delta(cached)
+                return cached
+    
+    async def _complete(self, params: Dict[str, Any],
+                        on_delta: Optional[Callable[[str], None]]) -> Tuple[str, Optional[int]]:
+        """One API call with the given request parameters; returns the completion text and total tokens used"""
+        client = self._async_client()
+        if on_delta is None:
+            response = await client.chat.completions.create(**params)
+            usage = getattr(response, 'usage', None)
+            self._count_prompt_tokens(usage)
+            return response.choices[0].message.content, getattr(usage, 'total_tokens', None)
+        
+        started = time.perf_counter()
+        stream = await client.chat.completions.create(**params, stream=True, stream_options={'include_usage': True})
+        parts = []
+        total_tokens = None
+        # Leaving the block (including on cancellation) closes the HTTP response,
+        # which stops generation upstream
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    total_tokens = chunk.usage.total_tokens
+                    self._count_prompt_tokens(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text = chunk.choices[0].delta.content
+                    if not parts:
+                        _count_usage('streamed_calls')
+                        _count_usage('first_token_ms', round((time.perf_counter() - started) * 1000))
+                    parts.append(text)
+                    on_delta(text)
+        return ''.join(parts), total_tokens
+    
+    def _count_prompt_tokens(self, usage: Any):
+        """Record a call's prompt tokens and the part DeepSeek served from its prefix cache"""
+        prompt_tokens = getattr(usage, 'prompt_tokens', None) or 0
+        cache_hit_tokens = getattr(usage, 'prompt_cache_hit_tokens', None) or 0
+        _count_usage('prompt_tokens', prompt_tokens)
+        _count_usage('prompt_cache_hit_tokens', cache_hit_tokens)
+        if prompt_tokens:
+            print(f"[AI] Prompt cache: {cache_hit_tokens}/{prompt_tokens} prompt tokens hit")
+    
+    async def _governed_completion(self, params: Dict[str, Any],
+                                   on_delta: Callable[[str], None] = None) -> Tuple[str, Optional[int]]:
+        """
+        Call the API through the rate governor, retrying rate limits, timeouts and transient failures
+        
+        Raises:
+            CircuitOpenError: instead of calling (or retrying) the API, while the circuit breaker is open
+        """
+        # Rough prompt size (~4 characters per token) plus the worst-case completion
+        estimated_tokens = sum(len(m['content']) for m in params['messages']) // 4 + params['max_tokens']
+        streamed = []
+        
+        def track_delta(text):
+            streamed.append(text)
+            on_delta(text)
+        
+        for attempt in range(AI_MAX_RETRIES + 1):
+            # Checked before every attempt, so retries stop as soon as an outage opens the breaker
+            if await asyncio.to_thread(self.breaker.is_open):
+                _count_usage('failed_calls')
+                raise CircuitOpenError("DeepSeek circuit breaker is open")
+            try:
+                return await self._hedged_completion(params, track_delta if on_delta else None, estimated_tokens)
+            except RateLimitError as e:
+                _count_usage('failed_calls')
+                # The governor holds back the retry until the provider's retry-after has passed
+                if attempt == AI_MAX_RETRIES:
+                    raise
+                print(f"[AI] Rate limited by DeepSeek, retrying in {_retry_after(e) or 1.0:.1f}s...")
+            except LatencyBudgetExceeded:
+                _count_usage('failed_calls')
+                raise
+            except (APIConnectionError, InternalServerError, asyncio.TimeoutError) as e:
+                _count_usage('failed_calls')
+                # A retry after part of the answer was streamed would repeat it
+                time_left = request_time_left()
+                if attempt == AI_MAX_RETRIES or streamed or (time_left is not None and time_left <= 0):
+                    raise
+                print(f"[AI] DeepSeek call failed ({e or 'timed out'}), retrying...")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+            except Exception:
+                _count_usage('failed_calls')
+                raise
+    
+    async def _hedged_completion(self, params: Dict[str, Any], on_delta: Optional[Callable[[str], None]],
+                                 estimated_tokens: int) -> Tuple[str, Optional[int]]:
+        """
+        One completion under a deadline, hedged with a duplicate call if it is slow to answer
+        
+        If no answer (first streamed text, or the whole response) has arrived
+        by the p95 of comparable calls, and the hedge budget allows, the same
+        request is sent again; the first call to answer is used and the other
+        cancelled. Streamed text is only relayed from the call that answered
+        first. Raises asyncio.TimeoutError past the deadline (2x p99), or
+        LatencyBudgetExceeded if the request's budget runs out first.
+        """
+        key = ('stream' if on_delta else 'call', params['max_tokens'])
+        hedger = self.hedger
+        hedger.start_call()
+        calls: List[asyncio.Task] = []
+        answering: List[int] = []
+        answered = asyncio.Event()
+        
+        def relay(index):
+            def deltas(text):
+                if not answering:
+                    answering.append(index)
+                    answered.set()
+                if answering[0] == index:
+                    on_delta(text)
+            return deltas
+        
+        def launch():
+            index = len(calls)
+            calls.append(asyncio.ensure_future(
+                self._leased_complete(params, relay(index) if on_delta else None, estimated_tokens, key)))
+        
+        timeout = hedger.deadline(key)
+        time_left = request_time_left()
+        budget_bound = time_left is not None and time_left < timeout
+        if budget_bound:
+            if time_left <= 0:
+                raise LatencyBudgetExceeded("request latency budget used up")
+            timeout = time_left
+        deadline = time.monotonic() + timeout
+        hedge_delay = hedger.hedge_delay(key)
+        hedge_at = time.monotonic() + hedge_delay if hedge_delay is not None else None
+        answered_wait = asyncio.ensure_future(answered.wait())
+        launch()
+        try:
+            while True:
+                if answering:
+                    # Streaming has started: only that call can supply the rest of the text
+                    winner = calls[answering[0]]
+                    for call in calls:
+                        if call is not winner:
+                            call.cancel()
+                    if answering[0] > 0:
+                        hedger.hedge_wins += 1
+                    try:
+                        return await asyncio.wait_for(winner, max(0.0, deadline - time.monotonic()))
+                    except asyncio.TimeoutError:
+                        if budget_bound:
+                            raise LatencyBudgetExceeded("request latency budget used up") from None
+                        raise
+                
+                for index, call in enumerate(calls):
+                    if call.done() and not call.cancelled() and call.exception() is None:
+                        if index > 0:
+                            hedger.hedge_wins += 1
+                        return call.result()
+                if all(call.done() for call in calls):
+                    # Every call failed; report the first call's error
+                    return calls[0].result()
+                
+                now = time.monotonic()
+                if now >= deadline:
+                    if budget_bound:
+                        raise LatencyBudgetExceeded("request latency budget used up")
+                    raise asyncio.TimeoutError(f"no answer within {timeout:.0f}s")
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if hedger.try_hedge():
+                        _count_usage('hedges')
+                        print(f"[AI] No answer after {hedge_delay:.1f}s (p95), sending a hedge request")
+                        launch()
+                    continue
+                wake = min(deadline, hedge_at) if hedge_at is not None else deadline
+                await asyncio.wait([call for call in calls if not call.done()] + [answered_wait],
+                                   timeout=wake - now, return_when=asyncio.FIRST_COMPLETED)
+        except LatencyBudgetExceeded:
+            raise
+        except asyncio.TimeoutError:
+            hedger.timeouts += 1
+            await asyncio.to_thread(self.breaker.record, True)
+            raise
+        finally:
+            answered_wait.cancel()
+            for call in calls:
+                call.cancel()
+            # Let the losers release their governor leases; also retrieves their exceptions
+            await asyncio.gather(*calls, return_exceptions=True)
+    
+    async def _leased_complete(self, params: Dict[str, Any], on_delta: Optional[Callable[[str], None]],
+                               estimated_tokens: int, key: Tuple) -> Tuple[str, Optional[int]]:
+        """_complete() under a rate governor lease; feeds its outcome to the hedger and circuit breaker"""
+        lease = await self.governor.acquire(estimated_tokens)
+        started = time.monotonic()
+        first = []
+        
+        def track_first(text):
+            if not first:
+                first.append(time.monotonic() - started)
+            on_delta(text)
+        
+        release = {}
+        try:
+            content, total_tokens = await self._complete(params, track_first if on_delta else None)
+            elapsed = time.monotonic() - started
+            release = {'tokens_used': total_tokens, 'latency_key': params['max_tokens']}
+            # Only finished calls: a cancelled one (e.g. a hedge's loser) ends whenever the
+            # other call wins, which would pull the hedge delay down
+            self.hedger.record(key, first[0] if first else elapsed, elapsed)
+            await asyncio.to_thread(self.breaker.record, False, elapsed)
+        except RateLimitError as e:
+            release = {'rate_limited': True, 'retry_after': _retry_after(e)}
+            raise
+        except (APIConnectionError, InternalServerError):
+            await asyncio.to_thread(self.breaker.record, True)
+            raise
+        finally:
+            # Also when cancelled; shielded, so a second cancel cannot leave the slot taken
+            await asyncio.shield(self.governor.release(lease, **release))
+        return content, total_tokens
+    
     def _clean_preamble(self, text: str) -> str:
         """Remove conversational preamble from AI responses"""
         # Common phrases to remove
@@ -62,20 +562,24 @@ class AIContentGenerator:
         
         return text.strip()
     
-    def extract_skills_from_jd(self, job_description: str) -> List[str]:
+    def extract_skills_from_jd(self, job_description: str, fresh: bool = False) -> List[str]:
         """
         Use AI to intelligently extract comprehensive list of technical skills from job description
         
         Args:
             job_description: The job description text
+            fresh: Bypass the completion cache (for a new, different answer)
             
         Returns:
             List of 100+ clean technical skills
         """
-        prompt = f"""Analyze this job description and generate a COMPREHENSIVE list of 100-150 technical skills that would be relevant for this role.
-
-Job Description:
-{job_description}
+        return self.run(self.aextract_skills_from_jd(job_description, fresh=fresh))
+    
+    async def aextract_skills_from_jd(self, job_description: str, fresh: bool = False,
+                                      context: str = None) -> List[str]:
+        """Async version of extract_skills_from_jd() (context: shared prompt prefix, see prompt_context())"""
+        context = context or self.prompt_context(job_description)
+        prompt = f"""Analyze the target job description above and generate a COMPREHENSIVE list of 100-150 technical skills that would be relevant for this role.
 
 CRITICAL INSTRUCTIONS:
 1. Extract ALL skills explicitly mentioned in the JD
@@ -125,14 +629,9 @@ Return the comma-separated list of up to 200 skills:"""
 
         try:
             print("[AI] Extracting skills list from JD (targeting ~200 skills max)...")
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2000,  # Enough for up to 200 skills
-                temperature=0.4  # Lower temperature for more focused matching
-            )
-            
-            skills_text = response.choices[0].message.content.strip()
+            # 2000 tokens is enough for up to 200 skills; lower temperature for more focused matching
+            skills_text = (await self._achat(prompt, max_tokens=2000, temperature=0.4, fresh=fresh,
+                                             context=context)).strip()
             
             # Clean up the response
             skills_text = self._clean_preamble(skills_text)
@@ -167,10 +666,16 @@ Return the comma-separated list of up to 200 skills:"""
             
             return skills
             
+        except (LatencyBudgetExceeded, CircuitOpenError):
+            # Out of time, or DeepSeek cut off: the caller fills this section without AI
+            raise
         except Exception as e:
             print(f"[ERROR] Error extracting skills with AI: {e}")
-            # Fallback to common skills (capped at 200)
-            return self._get_common_tech_skills()[:200]
+            return self.fallback_skills()
+    
+    def fallback_skills(self) -> List[str]:
+        """Skills returned when the AI call fails: common skills (capped at 200)"""
+        return self._get_common_tech_skills()[:200]
     
     def _get_common_tech_skills(self) -> List[str]:
         """Return a comprehensive list of common technical skills"""
@@ -236,12 +741,17 @@ Return the comma-separated list of up to 200 skills:"""
             'Confluence', 'Slack', 'VS Code', 'IntelliJ IDEA', 'Visual Studio'
         ]
     
-    def generate_professional_title(self, job_description: str, years_experience: int) -> str:
+    def generate_professional_title(self, job_description: str, years_experience: int,
+                                    fresh: bool = False) -> str:
         """Generate professional title matching the job description"""
-        prompt = f"""Generate a professional resume title for this job description. The candidate has {years_experience}+ years of experience.
-
-Job Description:
-{job_description}
+        return self.run(self.agenerate_professional_title(job_description, years_experience, fresh=fresh))
+    
+    async def agenerate_professional_title(self, job_description: str, years_experience: int,
+                                          fresh: bool = False, on_delta: Callable[[str], None] = None,
+                                          context: str = None) -> str:
+        """Async version of generate_professional_title() (on_delta receives raw streamed text)"""
+        context = context or self.prompt_context(job_description)
+        prompt = f"""Generate a professional resume title for the target job description above. The candidate has {years_experience}+ years of experience.
 
 CRITICAL INSTRUCTIONS:
 - Return ONLY the professional title itself, nothing else
@@ -253,32 +763,39 @@ CRITICAL INSTRUCTIONS:
 Return the title directly:"""
         
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=100,
-                temperature=0.7
-            )
-            title = response.choices[0].message.content.strip().strip('"')
+            title = (await self._achat(prompt, max_tokens=100, temperature=0.7, fresh=fresh, on_delta=on_delta,
+                                       context=context)).strip().strip('"')
             
             # Clean up any conversational preamble
             title = self._clean_preamble(title)
             
             print(f"AI Generated Title (DeepSeek): {title}")  # Debug
             return title
+        except (LatencyBudgetExceeded, CircuitOpenError):
+            raise
         except Exception as e:
             print(f"Error generating title with DeepSeek: {e}")
-            return f"Senior Professional with {years_experience}+ Years Experience"
+            return self.fallback_title(years_experience)
+    
+    @staticmethod
+    def fallback_title(years_experience: int) -> str:
+        """Title returned when the AI call fails"""
+        return f"Senior Professional with {years_experience}+ Years Experience"
     
     def generate_professional_summary(self, job_description: str, years_experience: int, 
-                                     company_history: List[Dict]) -> str:
+                                     company_history: List[Dict], fresh: bool = False) -> str:
         """Generate professional summary matching the job description"""
+        return self.run(self.agenerate_professional_summary(job_description, years_experience, company_history,
+                                                            fresh=fresh))
+    
+    async def agenerate_professional_summary(self, job_description: str, years_experience: int, 
+                                           company_history: List[Dict], fresh: bool = False,
+                                           on_delta: Callable[[str], None] = None, context: str = None) -> str:
+        """Async version of generate_professional_summary() (on_delta receives raw streamed text)"""
         companies = ", ".join([c.get('company', '') for c in company_history[:4] if c.get('company')])
+        context = context or self.prompt_context(job_description)
         
-        prompt = f"""Generate a professional summary for this job description. The candidate has {years_experience}+ years of experience and previously worked at: {companies}
-
-Job Description:
-{job_description}
+        prompt = f"""Generate a professional summary for the target job description above. The candidate has {years_experience}+ years of experience and previously worked at: {companies}
 
 CRITICAL INSTRUCTIONS:
 - Return ONLY the professional summary itself, nothing else
@@ -290,37 +807,50 @@ CRITICAL INSTRUCTIONS:
 Return the summary directly:"""
         
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=250,
-                temperature=0.7
-            )
-            summary = response.choices[0].message.content.strip()
+            summary = (await self._achat(prompt, max_tokens=250, temperature=0.7, fresh=fresh, on_delta=on_delta,
+                                         context=context)).strip()
             
             # Clean up any conversational preamble
             summary = self._clean_preamble(summary)
             
             print(f"AI Generated Summary (DeepSeek): {summary[:100]}...")  # Debug
             return summary
+        except (LatencyBudgetExceeded, CircuitOpenError):
+            raise
         except Exception as e:
             print(f"Error generating summary with DeepSeek: {e}")
             return f"Experienced professional with {years_experience}+ years in the industry, bringing expertise across various domains and technologies."
     
-    def generate_job_description(self, job_posting: str, company_name: str, job_title: str,
-                                 start_date: str, end_date: str, position_index: int) -> str:
-        """Generate detailed job description that matches the target role"""
+    def generate_job_description(self, job_posting: str, company_name: str, job_title: Optional[str],
+                                 start_date: str, end_date: str, position_index: int,
+                                 fresh: bool = False) -> str:
+        """
+        Generate detailed job description that matches the target role
+        
+        job_title may be None: the prompt then gives the position's seniority
+        level instead, so the description need not wait for the title call.
+        """
+        return self.run(self.agenerate_job_description(job_posting, company_name, job_title, start_date, end_date,
+                                                        position_index, fresh=fresh))
+    
+    async def agenerate_job_description(self, job_posting: str, company_name: str, job_title: Optional[str],
+                                       start_date: str, end_date: str, position_index: int,
+                                       fresh: bool = False, on_delta: Callable[[str], None] = None,
+                                       context: str = None) -> str:
+        """Async version of generate_job_description() (on_delta receives raw streamed text)"""
+        context = context or self.prompt_context(job_posting)
         
         word_count = "600-800 words" if position_index < 2 else "400-600 words"
+        if job_title:
+            role_line = f"Job Title: {job_title}"
+        else:
+            role_line = f"Level: {self._seniority(position_index)[0]}"
         
-        prompt = f"""Generate a professional job summary for this company position that matches the target job description.
-
-TARGET JOB DESCRIPTION:
-{job_posting}
+        prompt = f"""Generate a professional job summary for this company position that matches the target job description above.
 
 MY POSITION:
 Company: {company_name}
-Job Title: {job_title}
+{role_line}
 Dates: {start_date} - {end_date}
 
 CRITICAL INSTRUCTIONS:
@@ -335,13 +865,8 @@ CRITICAL INSTRUCTIONS:
 Return the description directly, starting with "At {company_name},":"""
         
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1200,
-                temperature=0.7
-            )
-            description = response.choices[0].message.content.strip()
+            description = (await self._achat(prompt, max_tokens=1200, temperature=0.7, fresh=fresh,
+                                             on_delta=on_delta, context=context)).strip()
             
             # Clean up any conversational preamble
             description = self._clean_preamble(description)
@@ -354,38 +879,42 @@ Return the description directly, starting with "At {company_name},":"""
             
             print(f"AI Generated Job Desc (DeepSeek) for {company_name}: {description[:100]}...")  # Debug
             return description
+        except (LatencyBudgetExceeded, CircuitOpenError):
+            raise
         except Exception as e:
             print(f"Error generating job description with DeepSeek for {company_name}: {e}")
             return f"At {company_name}, I contributed to various projects and initiatives, applying technical and professional skills to deliver results."
     
-    def generate_job_title_for_position(self, job_posting: str, company_name: str, 
-                                       position_index: int, years_at_company: int) -> str:
-        """Generate appropriate job title for this position"""
-        
-        # IMPORTANT: Earlier positions (higher index) should be MORE JUNIOR
+    def _seniority(self, position_index: int):
+        """Return (level, title instruction) for a position; earlier positions are more junior"""
         # position_index 0 = Most Recent (Current) = Senior
         # position_index 1, 2 = Mid-career = Mid-level  
         # position_index 3+ = Earliest/Oldest = Junior (entry level)
-        
         if position_index == 0:
-            seniority = "Senior"
-            seniority_instruction = "This is the MOST RECENT position. Use SENIOR level title (Senior, Lead, Principal, Staff)"
-        elif position_index == 1:
-            seniority = "Mid-level"
-            seniority_instruction = "This is a MID-CAREER position. Use MID-LEVEL title (no Senior prefix, no Junior prefix)"
-        elif position_index == 2:
-            seniority = "Mid-level"
-            seniority_instruction = "This is a MID-CAREER position. Use MID-LEVEL title (no Senior prefix, no Junior prefix)"
+            return "Senior", "This is the MOST RECENT position. Use SENIOR level title (Senior, Lead, Principal, Staff)"
+        elif position_index in (1, 2):
+            return "Mid-level", "This is a MID-CAREER position. Use MID-LEVEL title (no Senior prefix, no Junior prefix)"
         else:
-            seniority = "Junior"
-            seniority_instruction = "This is the EARLIEST/OLDEST position (career start). MUST use JUNIOR level title (Junior, Associate, Software Engineer I/II, or just the role without Senior/Lead)"
+            return "Junior", "This is the EARLIEST/OLDEST position (career start). MUST use JUNIOR level title (Junior, Associate, Software Engineer I/II, or just the role without Senior/Lead)"
+    
+    def generate_job_title_for_position(self, job_posting: str, company_name: str, 
+                                       position_index: int, years_at_company: int,
+                                       fresh: bool = False) -> str:
+        """Generate appropriate job title for this position"""
+        return self.run(self.agenerate_job_title_for_position(job_posting, company_name, position_index,
+                                                                years_at_company, fresh=fresh))
+    
+    async def agenerate_job_title_for_position(self, job_posting: str, company_name: str, 
+                                             position_index: int, years_at_company: int,
+                                             fresh: bool = False, context: str = None) -> str:
+        """Async version of generate_job_title_for_position()"""
+        context = context or self.prompt_context(job_posting)
+        
+        seniority, seniority_instruction = self._seniority(position_index)
         
         recency = "most recent position" if position_index == 0 else f"position {position_index + 1} (older/earlier role)"
         
-        prompt = f"""Generate a job title for this position that matches this job description.
-
-Target Job Description:
-{job_posting}
+        prompt = f"""Generate a job title for this position that matches the target job description above.
 
 Position Details:
 - Company: {company_name}
@@ -409,68 +938,97 @@ CRITICAL INSTRUCTIONS:
 Return the job title directly:"""
         
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=0.7
-            )
-            title = response.choices[0].message.content.strip().strip('"\'')
+            title = (await self._achat(prompt, max_tokens=50, temperature=0.7, fresh=fresh,
+                                       context=context)).strip().strip('"\'')
             
             # Clean up any conversational preamble
             title = self._clean_preamble(title)
             
             print(f"AI Generated Job Title (DeepSeek) for {company_name}: {title}")  # Debug
             return title
+        except (LatencyBudgetExceeded, CircuitOpenError):
+            raise
         except Exception as e:
             print(f"Error generating job title with DeepSeek for {company_name}: {e}")
             return f"{seniority} Professional"
     
     def generate_complete_resume_content(self, job_description: str, years_experience: int, 
-                                         work_history: List[Dict]) -> Dict[str, Any]:
+                                         work_history: List[Dict], fresh: bool = False,
+                                         descriptions: bool = True) -> Dict[str, Any]:
         """
-        🚀 OPTIMIZED: Generate ALL resume content in ONE API call (2-3 seconds instead of 20-30 seconds)
+        🚀 OPTIMIZED: Generate ALL resume content in ONE API call (JSON mode)
+        
+        The JSON is validated section by section; only sections that come back
+        missing or malformed are requested again (individually). With
+        descriptions=False only the short sections (title, summary, job titles)
+        are generated, and work experiences carry no 'description'.
+        
         Returns: {
             'professional_title': str,
             'professional_summary': str,
             'work_experiences': [
                 {'job_title': str, 'company': str, 'description': str},
                 ...
-            ]
+            ],
+            'repaired': [names of the sections that needed their own call]
         }
         """
-        companies = ", ".join([exp.get('company', '') for exp in work_history if exp.get('company')])
+        return self.run(self.agenerate_complete_resume_content(job_description, years_experience, work_history,
+                                                                 fresh=fresh, descriptions=descriptions))
+    
+    def _batch_tokens(self, positions: int, descriptions: bool = True) -> int:
+        """Completion tokens a batch response with this many positions needs"""
+        if not descriptions:
+            return BATCH_BASE_TOKENS + positions * BATCH_JOB_TITLE_TOKENS
+        return BATCH_BASE_TOKENS + sum(BATCH_RECENT_JOB_TOKENS if idx < 2 else BATCH_OLDER_JOB_TOKENS
+                                       for idx in range(positions))
+    
+    def _batch_positions(self, work_history: List[Dict], descriptions: bool = True) -> int:
+        """How many positions fit in one batch response (the rest get individual calls)"""
+        count = len(work_history)
+        while count and self._batch_tokens(count, descriptions) > BATCH_MAX_TOKENS:
+            count -= 1
+        return count
+    
+    async def agenerate_complete_resume_content(self, job_description: str, years_experience: int, 
+                                               work_history: List[Dict], fresh: bool = False,
+                                               descriptions: bool = True, context: str = None) -> Dict[str, Any]:
+        """Async version of generate_complete_resume_content() (context: see prompt_context())"""
+        context = context or self.prompt_context(job_description, years_experience, work_history)
+        batch_jobs = work_history[:self._batch_positions(work_history, descriptions)]
         
         # Build work history details for the prompt
         work_history_details = []
-        for idx, exp in enumerate(work_history):
+        for idx, exp in enumerate(batch_jobs):
             company = exp.get('company', f'Company {idx+1}')
             start_date = exp.get('start_date', '')
             end_date = exp.get('end_date', 'Present')
             location = exp.get('location', '')
-            seniority = "Senior" if idx == 0 else ("Mid-level" if idx < 3 else "Junior")
+            seniority = self._seniority(idx)[0]
             recency = "most recent" if idx == 0 else f"position #{idx + 1}"
             word_count = "600-800 words" if idx < 2 else "400-600 words"
             
+            length_line = f"- Description length: {word_count}\n" if descriptions else ""
             work_history_details.append(f"""
 Position {idx + 1} ({recency}):
 - Company: {company}
 - Location: {location}
 - Dates: {start_date} - {end_date}
 - Seniority: {seniority}
-- Description length: {word_count}
-""")
+{length_line}""")
         
         work_history_text = "\n".join(work_history_details)
+        first_company = batch_jobs[0].get('company', '') if batch_jobs else ''
+        if descriptions:
+            description_field = ''',
+      "description": "For position 1 (most recent): Write 600-800 words. Start with 'At [company],' and write a flowing paragraph in first person past tense showing how this experience demonstrates the candidate is perfect for the target job. Use terminology and skills from the job description. NO bullet points."'''
+            description_rules = """
+- Recent positions get 600-800 words, older ones get 400-600 words
+- All descriptions must be flowing paragraphs in first person past tense, NO bullet points"""
+        else:
+            description_field = description_rules = ""
         
-        prompt = f"""You are a professional resume writer. Generate a complete, ATS-optimized resume content based on the target job description below.
-
-TARGET JOB DESCRIPTION:
-{job_description}
-
-CANDIDATE PROFILE:
-- Years of Experience: {years_experience}+ years
-- Companies worked at: {companies}
+        prompt = f"""Generate complete, ATS-optimized resume content based on the target job description and candidate profile above.
 
 WORK HISTORY TO GENERATE CONTENT FOR:
 {work_history_text}
@@ -482,8 +1040,7 @@ Generate the following in VALID JSON format:
   "work_experiences": [
     {{
       "job_title": "Job title for position 1 that matches the target job field/industry",
-      "company": "{work_history[0].get('company', '')}",
-      "description": "For position 1 (most recent): Write 600-800 words. Start with 'At [company],' and write a flowing paragraph in first person past tense showing how this experience demonstrates the candidate is perfect for the target job. Use terminology and skills from the job description. NO bullet points."
+      "company": "{first_company}"{description_field}
     }},
     ... (continue for all positions in work history)
   ]
@@ -491,24 +1048,19 @@ Generate the following in VALID JSON format:
 
 IMPORTANT: 
 - Return ONLY valid JSON, no markdown, no explanations
+- "work_experiences" must contain exactly {len(batch_jobs)} entries, in the order of the work history above
 - Match job titles and descriptions to the TARGET JOB field/industry
 - Use skills and terminology from the TARGET JOB DESCRIPTION
-- Make the candidate look perfect for the TARGET JOB
-- Recent positions get 600-800 words, older ones get 400-600 words
-- All descriptions must be flowing paragraphs in first person past tense, NO bullet points
+- Make the candidate look perfect for the TARGET JOB{description_rules}
 
 JSON:"""
 
+        sections = {}
         try:
-            print(f"🚀 Generating ALL content in one API call...")
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4000,  # Increased for all content
-                temperature=0.7
-            )
-            
-            response_text = response.choices[0].message.content.strip()
+            print(f"🚀 Generating ALL content in one API call ({len(batch_jobs)}/{len(work_history)} positions)...")
+            max_tokens = self._batch_tokens(len(batch_jobs), descriptions)
+            response_text = (await self._achat(prompt, max_tokens=max_tokens, temperature=0.7, fresh=fresh,
+                                               json_mode=True, context=context)).strip()
             
             # Clean up response (remove markdown code blocks if present)
             if response_text.startswith("```json"):
@@ -519,84 +1071,146 @@ JSON:"""
                 response_text = response_text[:-3]
             response_text = response_text.strip()
             
-            # Parse JSON
-            result = json.loads(response_text)
-            
-            print(f"✅ Generated ALL content in ONE call!")
-            print(f"   Title: {result.get('professional_title', '')[:80]}...")
-            print(f"   Summary: {result.get('professional_summary', '')[:80]}...")
-            print(f"   Work Experiences: {len(result.get('work_experiences', []))}")
-            
-            return result
-            
+            sections = self._validate_batch(json.loads(response_text), batch_jobs, descriptions)
         except json.JSONDecodeError as e:
             print(f"❌ JSON parsing error: {e}")
             print(f"Response text: {response_text[:500]}...")
-            # Fall back to individual calls
-            return None
+        except (LatencyBudgetExceeded, CircuitOpenError):
+            raise
         except Exception as e:
             print(f"❌ Error generating complete content: {e}")
-            return None
+        
+        # Re-request only what the batch did not deliver
+        repairs = {}
+        if 'professional_title' not in sections:
+            repairs['professional_title'] = self.agenerate_professional_title(job_description, years_experience,
+                                                                             fresh=fresh, context=context)
+        if 'professional_summary' not in sections:
+            repairs['professional_summary'] = self.agenerate_professional_summary(job_description, years_experience,
+                                                                                 work_history, fresh=fresh,
+                                                                                 context=context)
+        for idx, exp in enumerate(work_history):
+            company = exp.get('company', '')
+            if f'job_title_{idx}' not in sections:
+                repairs[f'job_title_{idx}'] = self.agenerate_job_title_for_position(
+                    job_description, company, idx, years_at_position(exp), fresh=fresh, context=context)
+            if descriptions and f'job_description_{idx}' not in sections:
+                repairs[f'job_description_{idx}'] = self.agenerate_job_description(
+                    job_description, company, None, exp.get('start_date', ''), exp.get('end_date', ''), idx,
+                    fresh=fresh, context=context)
+        if repairs:
+            print(f"[AI] Batch response incomplete, requesting {len(repairs)} section(s) individually: "
+                  f"{', '.join(repairs)}")
+            sections.update(zip(repairs, await asyncio.gather(*repairs.values())))
+        
+        result = {
+            'professional_title': sections['professional_title'],
+            'professional_summary': sections['professional_summary'],
+            'work_experiences': [
+                {
+                    'job_title': sections[f'job_title_{idx}'],
+                    'company': exp.get('company', ''),
+                    **({'description': sections[f'job_description_{idx}']} if descriptions else {})
+                }
+                for idx, exp in enumerate(work_history)
+            ],
+            'repaired': list(repairs)
+        }
+        
+        separate_calls = (2 if descriptions else 1) * len(work_history) + 2
+        print(f"✅ Generated content with {1 + len(repairs)} call(s) instead of {separate_calls}")
+        print(f"   Title: {result['professional_title'][:80]}...")
+        print(f"   Summary: {result['professional_summary'][:80]}...")
+        print(f"   Work Experiences: {len(result['work_experiences'])}")
+        
+        return result
+    
+    def _validate_batch(self, data: Any, batch_jobs: List[Dict], descriptions: bool = True) -> Dict[str, str]:
+        """
+        Check a batch response section by section
+        
+        Returns:
+            Cleaned text of every valid section, keyed 'professional_title',
+            'professional_summary', 'job_title_<i>' and 'job_description_<i>'
+        """
+        sections = {}
+        if not isinstance(data, dict):
+            return sections
+        
+        title = _section_text(data.get('professional_title'), max_chars=200)
+        if title:
+            sections['professional_title'] = self._clean_preamble(title.strip('"'))
+        summary = _section_text(data.get('professional_summary'), min_words=25)
+        if summary:
+            sections['professional_summary'] = self._clean_preamble(summary)
+        
+        experiences = data.get('work_experiences')
+        if not isinstance(experiences, list):
+            return sections
+        for idx, exp in enumerate(batch_jobs):
+            if idx >= len(experiences) or not isinstance(experiences[idx], dict):
+                break
+            entry = experiences[idx]
+            # Entries out of order (or for another company) are not trusted
+            company = entry.get('company')
+            if isinstance(company, str) and company.strip() and exp.get('company') \
+                    and company.strip().lower() != exp['company'].strip().lower():
+                continue
+            job_title = _section_text(entry.get('job_title'), max_chars=120)
+            if job_title:
+                sections[f'job_title_{idx}'] = self._clean_preamble(job_title.strip('"\''))
+            description = descriptions and _section_text(entry.get('description'), min_words=MIN_DESCRIPTION_WORDS)
+            if description:
+                description = self._clean_preamble(description).replace('\n\n', ' ').replace('\n', ' ')
+                sections[f'job_description_{idx}'] = description.replace('***', '').replace('**', '').strip()
+        return sections
     
     def generate_complete_resume_content_parallel(self, job_description: str, years_experience: int, 
-                                                   work_history: List[Dict]) -> Dict[str, Any]:
+                                                   work_history: List[Dict], fresh: bool = False) -> Dict[str, Any]:
         """
         🚀 FASTEST: Generate ALL resume content using PARALLEL API calls (3-5 seconds)
         Makes multiple API calls simultaneously instead of sequentially
         """
+        return self.run(self.agenerate_complete_resume_content_parallel(job_description, years_experience,
+                                                                          work_history, fresh=fresh))
+    
+    async def agenerate_complete_resume_content_parallel(self, job_description: str, years_experience: int,
+                                                         work_history: List[Dict],
+                                                         fresh: bool = False) -> Dict[str, Any]:
+        """
+        Async version of generate_complete_resume_content_parallel()
+        
+        Title, summary and every position's title and description run as
+        concurrent tasks on the worker's event loop: waiting on the API costs
+        no threads, however many positions the work history has.
+        """
         print(f"⚡ PARALLEL MODE: Making all API calls simultaneously...")
         start_time = time.time()
+        context = self.prompt_context(job_description, years_experience, work_history)
+        if PREFIX_WARMUP:
+            await self.awarm_prefix(context)
         
-        companies = ", ".join([exp.get('company', '') for exp in work_history if exp.get('company')])
-        
-        # Prepare all the API call functions
-        def call_title():
-            return self.generate_professional_title(job_description, years_experience)
-        
-        def call_summary():
-            return self.generate_professional_summary(job_description, years_experience, work_history)
-        
-        def call_job_content(idx, exp):
+        async def job_content(idx, exp):
             company = exp.get('company', '')
-            start_date = exp.get('start_date', '')
-            end_date = exp.get('end_date', '')
-            
-            # Generate title and description together
-            years_at_company = 3
-            try:
-                start_year = int(start_date.split()[-1]) if start_date else 2020
-                end_year = int(end_date.split()[-1]) if end_date and end_date.lower() != 'present' else 2024
-                years_at_company = max(1, end_year - start_year)
-            except:
-                pass
-            
-            job_title = self.generate_job_title_for_position(job_description, company, idx, years_at_company)
-            description = self.generate_job_description(job_description, company, job_title, 
-                                                        start_date, end_date, idx)
+            # The description is written for the position's level, so it does not wait for the title
+            job_title, description = await asyncio.gather(
+                self.agenerate_job_title_for_position(job_description, company, idx,
+                                                      years_at_position(exp), fresh=fresh, context=context),
+                self.agenerate_job_description(job_description, company, None, exp.get('start_date', ''),
+                                               exp.get('end_date', ''), idx, fresh=fresh, context=context)
+            )
             return {
                 'job_title': job_title,
                 'company': company,
                 'description': description
             }
         
-        # Execute all calls in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            # Submit all tasks
-            future_title = executor.submit(call_title)
-            future_summary = executor.submit(call_summary)
-            
-            # Submit all work experience tasks
-            future_jobs = []
-            for idx, exp in enumerate(work_history):
-                future_jobs.append(executor.submit(call_job_content, idx, exp))
-            
-            # Collect results
-            professional_title = future_title.result()
-            professional_summary = future_summary.result()
-            
-            work_experiences = []
-            for future in future_jobs:
-                work_experiences.append(future.result())
+        professional_title, professional_summary, *work_experiences = await asyncio.gather(
+            self.agenerate_professional_title(job_description, years_experience, fresh=fresh, context=context),
+            self.agenerate_professional_summary(job_description, years_experience, work_history, fresh=fresh,
+                                                context=context),
+            *(job_content(idx, exp) for idx, exp in enumerate(work_history))
+        )
         
         end_time = time.time()
         elapsed = end_time - start_time
@@ -607,6 +1221,5 @@ JSON:"""
         return {
             'professional_title': professional_title,
             'professional_summary': professional_summary,
-            'work_experiences': work_experiences
+            'work_experiences': list(work_experiences)
         }
-
@@ -0,0 +1,78 @@
+"""
+Job Description Analysis Cache
+Bounded LRU cache with TTL for ATSMatcher analysis results
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_jd(job_description: str) -> str:
+    """Collapse whitespace within lines and drop blank lines"""
+    lines = (' '.join(line.split()) for line in job_description.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def jd_cache_key(normalized_jd: str) -> str:
+    """Cache key of an already-normalized JD"""
+    return hashlib.sha256(normalized_jd.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache with per-entry expiry and hit/miss counters"""
+
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None):
+        self.max_entries = max_entries or int(os.getenv('ANALYSIS_CACHE_SIZE', 512))
+        self.ttl_seconds = ttl_seconds or float(os.getenv('ANALYSIS_CACHE_TTL', 3600))
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
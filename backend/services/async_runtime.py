@@ -0,0 +1,75 @@
+"""
+Async Runtime - one long-lived asyncio event loop per worker process
+Lets synchronous Flask handlers run coroutines on a shared loop (and connection pool)
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine
+
+
+class AsyncRuntime:
+    """Runs an event loop in a daemon thread and bridges sync callers onto it"""
+
+    def __init__(self, name: str = 'ai-event-loop'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop of this process (started on first use, and again after a fork)"""
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    self._start()
+        return self._loop
+
+    def _start(self):
+        # A forked child inherits the loop object but not the thread running it
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=serve, name=self.name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop, self._thread, self._pid = loop, thread, os.getpid()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the shared loop without waiting for it
+
+        Cancelling the returned future cancels the coroutine.
+        """
+        if self.in_loop_thread() and self._pid == os.getpid():
+            coro.close()
+            raise RuntimeError('AsyncRuntime called from the event loop thread; await instead')
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine on the shared loop and block until it finishes
+
+        Must not be called from coroutines running on the loop itself
+        (they should await instead).
+        """
+        return self.submit(coro).result()
+
+
+_runtime = AsyncRuntime()
+
+
+def get_runtime() -> AsyncRuntime:
+    """The process-wide runtime shared by all AI generators"""
+    return _runtime
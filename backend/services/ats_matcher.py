@@ -1,182 +1,290 @@
 """
 ATS Keyword Matching and Resume Optimization Service
 """
+import os
 import re
-from typing import List, Dict, Set, Any
-from collections import Counter
+import threading
+import time
+from bisect import bisect_right
+from typing import List, Dict, Set, Tuple, Any, Iterable, Optional, Union
+from services.keyword_automaton import KeywordAutomaton
+from services.skill_taxonomy import SkillTaxonomy
+from services.skill_index import (SkillIndex, SKILLS_SOURCE, compile_skill_index,
+                                  default_index_path, load_skill_index)
+from services.skill_ranker import SkillRanker, rank_terms
+from services.jd_sections import SectionTracker, split_sections
+from services.jd_stream import JDStreamReader, iter_string_chunks
+from services.analysis_cache import AnalysisCache, normalize_jd, jd_cache_key
+
+# How often (seconds) each worker checks whether the compiled skills index was replaced
+RELOAD_CHECK_INTERVAL = float(os.getenv('SKILLS_RELOAD_CHECK_INTERVAL', 30))
+
+# Unknown capitalized phrases tracked per streamed JD (skills are bounded by the vocabulary)
+STREAM_MAX_PHRASES = int(os.getenv('JD_STREAM_MAX_PHRASES', 2000))
+
+# JDs longer than this (characters) are analyzed with the streaming path
+STREAM_THRESHOLD = int(os.getenv('JD_STREAM_THRESHOLD', 256 * 1024))
+
+# Map misspelled/variant skill names (e.g. 'Kubernetess', 'Mongo DB') to canonical skills
+FUZZY_MATCHING = os.getenv('FUZZY_SKILL_MATCHING', 'true').lower() == 'true'
+
+# Capitalized words/phrases and acronyms that may be technical terms (within one line)
+CAPITALIZED_PHRASE = re.compile(r'\b[A-Z](?:[A-Za-z0-9+#]|\.(?=[A-Za-z0-9]))*(?:[ \t]+[A-Z][a-z]*)*\b')
+
+# Common words that are capitalized at the start of sentences, not technical terms
+STOP_WORDS = {
+    'The', 'This', 'That', 'These', 'Those', 'What', 'When', 'Where', 'Who', 'Why', 'How',
+    'Are', 'Were', 'Was', 'Is', 'Be', 'Been', 'Being', 'Have', 'Has', 'Had', 'Do', 'Does',
+    'Did', 'Will', 'Would', 'Should', 'Could', 'May', 'Might', 'Must', 'Can', 'Our', 'Your',
+    'Their', 'His', 'Her', 'Its', 'We', 'You', 'They', 'He', 'She', 'It', 'Send', 'Get',
+    'Make', 'Take', 'Give', 'Find', 'Use', 'Work', 'Call', 'Try', 'Ask', 'Need', 'Feel',
+    'Want', 'Know', 'Put', 'Mean', 'Keep', 'Let', 'Begin', 'Start', 'Show', 'Turn', 'Follow',
+    'Play', 'Run', 'Move', 'Live', 'Believe', 'Hold', 'Bring', 'Write', 'Provide', 'Sit',
+    'Stand', 'Lose', 'Pay', 'Meet', 'Include', 'Continue', 'Set', 'Learn', 'Change', 'Lead',
+    'And', 'Or', 'But', 'If', 'Then', 'Because', 'As', 'Until', 'While', 'Of', 'At', 'By',
+    'For', 'With', 'About', 'Against', 'Between', 'Into', 'Through', 'During', 'Before', 'After',
+    'Above', 'Below', 'To', 'From', 'Up', 'Down', 'In', 'Out', 'On', 'Off', 'Over', 'Under'
+}
+
+class _AnalysisBuilder:
+    """Accumulates the analysis of a JD that is fed in blocks of whole lines"""
+    
+    def __init__(self, index: SkillIndex, max_phrases: Optional[int] = None):
+        """
+        Args:
+            index: Skill index to match against
+            max_phrases: Bound on tracked unknown phrases (None keeps all of them)
+        """
+        self.index = index
+        self.max_phrases = max_phrases
+        self.pruned = False
+        self.tracker = SectionTracker()
+        self.ranker = SkillRanker()
+        self.matched_ids = {}
+        self.fuzzy_matches = {}
+        self.extra_keywords = {}
+    
+    def feed(self, block: str):
+        """Analyze the next block (normalized lines, in JD order)"""
+        index = self.index
+        taxonomy = index.taxonomy
+        ranker = self.ranker
+        matched_ids = self.matched_ids
+        text_lower = ATSMatcher._lower_aligned(block)
+        spans = split_sections(block, self.tracker)
+        line_starts = [start for start, _, _ in spans]
+        section_at = lambda pos: spans[bisect_right(line_starts, pos) - 1][2]
+        
+        for start, skill_id in ATSMatcher._skill_mentions(index, text_lower):
+            matched_ids.setdefault(skill_id, None)
+            ranker.add(taxonomy.names[skill_id], section_at(start), canonical=True)
+        
+        # Spelling variants the exact automaton missed, weighted by match confidence
+        fuzzy_covered = set()
+        if FUZZY_MATCHING:
+            occurrences = {}
+            for candidate, start in index.fuzzy_matcher.candidates(block):
+                occurrences.setdefault(candidate, []).append(start)
+            for candidate, (skill_id, confidence) in index.fuzzy_matcher.match(occurrences).items():
+                matched_ids.setdefault(skill_id, None)
+                if self.max_phrases is None or len(self.fuzzy_matches) < self.max_phrases:
+                    self.fuzzy_matches.setdefault(candidate, taxonomy.names[skill_id])
+                for start in occurrences[candidate]:
+                    ranker.add(taxonomy.names[skill_id], section_at(start), canonical=True, confidence=confidence)
+                    fuzzy_covered.update(range(start, start + len(candidate)))
+        
+        # Capitalized phrases and acronyms the database does not know about
+        # (not ones that overlap a misspelled skill resolved above, e.g. 'Need Kubernetess')
+        extra_keywords = self.extra_keywords
+        for match in CAPITALIZED_PHRASE.finditer(block):
+            phrase = match.group()
+            if (phrase in STOP_WORDS or len(phrase) <= 2
+                    or not fuzzy_covered.isdisjoint(range(match.start(), match.end()))
+                    or taxonomy.canonical_id(phrase) is not None):
+                continue
+            extra_keywords.setdefault(phrase, None)
+            ranker.add(phrase, section_at(match.start()), canonical=False)
+        
+        if self.max_phrases is not None and len(extra_keywords) > 2 * self.max_phrases:
+            self._prune_phrases()
+    
+    def _prune_phrases(self):
+        """Keep only the best-scoring unknown phrases (amortized: runs when the table doubles)"""
+        keep = set(rank_terms(self.ranker.scores, self.extra_keywords, k=self.max_phrases))
+        for phrase in list(self.extra_keywords):
+            if phrase not in keep:
+                del self.extra_keywords[phrase]
+                del self.ranker.scores[phrase]
+                del self.ranker.counts[phrase]
+        self.pruned = True
+    
+    def result(self) -> Dict[str, Any]:
+        taxonomy = self.index.taxonomy
+        return {
+            'matched_skills': [taxonomy.names[skill_id] for skill_id in self.matched_ids],
+            'extra_keywords': list(self.extra_keywords),
+            'related_skills': taxonomy.related_skills(list(self.matched_ids)),
+            'fuzzy_matches': self.fuzzy_matches,
+            'scores': dict(self.ranker.scores),
+        }
+
 
 class ATSMatcher:
     """Handles ATS keyword matching and resume optimization"""
     
-    def __init__(self):
-        self.tech_skills_database = self._load_tech_skills()
+    def __init__(self, analysis_cache: AnalysisCache = None, skills_path: str = SKILLS_SOURCE):
+        self.analysis_cache = analysis_cache or AnalysisCache()
+        self.skills_path = skills_path
+        self.index_path = default_index_path(skills_path)
+        self._index = load_skill_index(self.skills_path, self.index_path)
+        self._index_mtime = self._artifact_mtime()
+        self._next_reload_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+        self._reload_requested = False
+        self._reload_lock = threading.Lock()
     
-    def _load_tech_skills(self) -> Set[str]:
-        """Load comprehensive list of technical skills"""
-        return {
-            # Programming Languages
-            'Python', 'Java', 'JavaScript', 'TypeScript', 'C#', 'C++', 'C', 'Go', 'Rust', 'Ruby', 
-            'PHP', 'Swift', 'Kotlin', 'Scala', 'R', 'MATLAB', 'Perl', 'Shell', 'Bash', 'PowerShell',
-            
-            # Frontend Technologies
-            'React', 'Angular', 'Vue.js', 'Vue', 'Next.js', 'Nuxt.js', 'Svelte', 'Ember.js',
-            'HTML5', 'HTML', 'CSS3', 'CSS', 'SCSS', 'SASS', 'LESS', 'Tailwind CSS', 'Bootstrap',
-            'Material UI', 'Material Design', 'Chakra UI', 'Ant Design', 'Semantic UI',
-            'jQuery', 'Redux', 'MobX', 'NgRx', 'RxJS', 'Webpack', 'Vite', 'Rollup', 'Parcel',
-            'Babel', 'ESLint', 'Prettier', 'Styled Components', 'Emotion', 'CSS Modules',
-            'Responsive Design', 'Mobile-First Design', 'Progressive Web Apps', 'PWA',
-            'Single Page Applications', 'SPA', 'Server-Side Rendering', 'SSR', 'Static Site Generation',
-            'Web Components', 'Shadow DOM', 'Web Accessibility', 'WCAG', 'ARIA', 'SEO',
-            'Cross-Browser Compatibility', 'Browser DevTools', 'Lighthouse',
-            
-            # Backend Technologies
-            '.NET', '.NET Core', '.NET Framework', 'ASP.NET', 'ASP.NET Core', 'ASP.NET MVC',
-            'ASP.NET Web API', 'Entity Framework', 'Entity Framework Core', 'ADO.NET', 'LINQ',
-            'Node.js', 'Express.js', 'Nest.js', 'Koa', 'Fastify', 'Hapi',
-            'Django', 'Flask', 'FastAPI', 'Pyramid', 'Tornado',
-            'Spring', 'Spring Boot', 'Spring MVC', 'Hibernate', 'JPA',
-            'Ruby on Rails', 'Sinatra', 'Laravel', 'Symfony', 'CodeIgniter',
-            'GraphQL', 'Apollo', 'gRPC', 'REST', 'RESTful API', 'SOAP', 'WebSockets',
-            'SignalR', 'Socket.io', 'Microservices', 'Monolithic Architecture',
-            'Serverless', 'Lambda Functions', 'Event-Driven Architecture',
-            'Message Queues', 'RabbitMQ', 'Kafka', 'Redis', 'Celery',
-            'API Gateway', 'API Design', 'OpenAPI', 'Swagger', 'Postman',
-            
-            # Databases
-            'SQL', 'SQL Server', 'MySQL', 'PostgreSQL', 'Oracle', 'SQLite', 'MariaDB',
-            'MongoDB', 'Cassandra', 'Redis', 'Elasticsearch', 'DynamoDB', 'CosmosDB',
-            'Firebase', 'Firestore', 'Realm', 'Neo4j', 'CouchDB', 'InfluxDB',
-            'Database Design', 'Database Optimization', 'Query Optimization', 'Indexing',
-            'Stored Procedures', 'Triggers', 'Views', 'Transactions', 'ACID', 'CAP Theorem',
-            'NoSQL', 'Document Databases', 'Key-Value Stores', 'Column Stores', 'Graph Databases',
-            'Data Modeling', 'Schema Design', 'Normalization', 'Denormalization',
-            'Database Migration', 'Data Warehousing', 'ETL', 'Data Pipeline',
-            
-            # Cloud Platforms
-            'AWS', 'Amazon Web Services', 'Azure', 'Microsoft Azure', 'Google Cloud Platform', 'GCP',
-            'EC2', 'S3', 'Lambda', 'RDS', 'DynamoDB', 'CloudFront', 'Route 53', 'ECS', 'EKS',
-            'Azure Functions', 'Azure App Services', 'Azure DevOps', 'Azure SQL Database',
-            'Azure Blob Storage', 'Azure Kubernetes Service', 'AKS', 'Application Insights',
-            'Cloud Functions', 'Cloud Run', 'BigQuery', 'Cloud Storage', 'Cloud SQL',
-            'Heroku', 'DigitalOcean', 'Linode', 'Vercel', 'Netlify', 'Railway',
-            'Cloud Architecture', 'Cloud Security', 'Cloud Migration', 'Multi-Cloud',
-            'Infrastructure as Code', 'IaC', 'Terraform', 'CloudFormation', 'ARM Templates',
-            'Serverless Framework', 'SAM', 'CDK', 'Pulumi',
-            
-            # DevOps & CI/CD
-            'Docker', 'Kubernetes', 'Helm', 'Docker Compose', 'Container Orchestration',
-            'Jenkins', 'GitHub Actions', 'GitLab CI', 'CircleCI', 'Travis CI', 'Bitbucket Pipelines',
-            'Azure Pipelines', 'TeamCity', 'Bamboo', 'Octopus Deploy',
-            'Git', 'GitHub', 'GitLab', 'Bitbucket', 'Version Control', 'Source Control',
-            'CI/CD', 'Continuous Integration', 'Continuous Deployment', 'Continuous Delivery',
-            'Automation', 'Build Automation', 'Deployment Automation', 'Release Management',
-            'Infrastructure Monitoring', 'Application Monitoring', 'Log Management',
-            'Prometheus', 'Grafana', 'ELK Stack', 'Elasticsearch', 'Logstash', 'Kibana',
-            'Splunk', 'DataDog', 'New Relic', 'CloudWatch', 'Application Insights',
-            'Sentry', 'Rollbar', 'PagerDuty', 'Nagios', 'Zabbix',
-            
-            # Testing
-            'Unit Testing', 'Integration Testing', 'End-to-End Testing', 'E2E Testing',
-            'Test-Driven Development', 'TDD', 'Behavior-Driven Development', 'BDD',
-            'Jest', 'Mocha', 'Chai', 'Jasmine', 'Karma', 'Cypress', 'Playwright', 'Selenium',
-            'Puppeteer', 'TestCafe', 'WebdriverIO', 'JUnit', 'TestNG', 'Mockito', 'JMock',
-            'xUnit', 'NUnit', 'MSTest', 'PyTest', 'unittest', 'RSpec', 'PHPUnit',
-            'Test Automation', 'API Testing', 'Performance Testing', 'Load Testing',
-            'Stress Testing', 'Security Testing', 'Penetration Testing', 'Vulnerability Assessment',
-            'JMeter', 'Gatling', 'Locust', 'K6', 'Artillery',
-            
-            # Security
-            'OAuth', 'OAuth2', 'OpenID Connect', 'SAML', 'JWT', 'JSON Web Tokens',
-            'Authentication', 'Authorization', 'RBAC', 'Identity Management', 'SSO',
-            'Encryption', 'SSL/TLS', 'HTTPS', 'Certificate Management', 'PKI',
-            'Web Security', 'Application Security', 'Network Security', 'Cloud Security',
-            'OWASP', 'XSS', 'CSRF', 'SQL Injection', 'Security Best Practices',
-            'Content Security Policy', 'CSP', 'CORS', 'Same-Origin Policy',
-            'Secure Coding', 'Code Security', 'Security Audits', 'Compliance',
-            'GDPR', 'HIPAA', 'PCI DSS', 'SOC 2', 'ISO 27001',
-            
-            # Architecture & Design
-            'Microservices Architecture', 'Service-Oriented Architecture', 'SOA',
-            'Event-Driven Architecture', 'Domain-Driven Design', 'DDD', 'CQRS',
-            'Event Sourcing', 'Hexagonal Architecture', 'Clean Architecture', 'Onion Architecture',
-            'MVC', 'MVVM', 'MVP', 'Design Patterns', 'Gang of Four', 'SOLID Principles',
-            'Scalable Architecture', 'Distributed Systems', 'System Design', 'High Availability',
-            'Load Balancing', 'Caching', 'CDN', 'Performance Optimization', 'Code Optimization',
-            'Refactoring', 'Code Review', 'Technical Debt', 'Legacy System Modernization',
-            'API Design', 'REST', 'RESTful', 'HATEOAS', 'API Versioning',
-            
-            # Methodologies & Practices
-            'Agile', 'Scrum', 'Kanban', 'Lean', 'Waterfall', 'XP', 'Extreme Programming',
-            'SAFe', 'DevOps', 'GitOps', 'Pair Programming', 'Code Review', 'Sprint Planning',
-            'Daily Standup', 'Retrospective', 'Sprint Review', 'Backlog Grooming',
-            'User Stories', 'Acceptance Criteria', 'Definition of Done', 'Story Points',
-            'Estimation', 'Velocity', 'Burndown Chart', 'Burnup Chart',
-            
-            # Tools & Platforms
-            'Jira', 'Confluence', 'Trello', 'Asana', 'Monday.com', 'ClickUp', 'Linear',
-            'Slack', 'Microsoft Teams', 'Zoom', 'Google Workspace', 'Microsoft 365',
-            'VS Code', 'Visual Studio', 'IntelliJ IDEA', 'PyCharm', 'WebStorm',
-            'Eclipse', 'NetBeans', 'Sublime Text', 'Atom', 'Vim', 'Emacs',
-            'Figma', 'Sketch', 'Adobe XD', 'Photoshop', 'Illustrator',
-            'npm', 'yarn', 'pnpm', 'Maven', 'Gradle', 'pip', 'NuGet', 'Composer',
-            
-            # Data & Analytics
-            'Data Analysis', 'Data Science', 'Machine Learning', 'Deep Learning', 'AI',
-            'Artificial Intelligence', 'Neural Networks', 'TensorFlow', 'PyTorch', 'Keras',
-            'scikit-learn', 'Pandas', 'NumPy', 'Matplotlib', 'Seaborn', 'Plotly',
-            'Data Visualization', 'Business Intelligence', 'BI', 'Tableau', 'Power BI',
-            'Looker', 'Metabase', 'Google Analytics', 'Adobe Analytics', 'Mixpanel',
-            'Segment', 'Amplitude', 'Heap', 'Hotjar',
-            
-            # Mobile Development
-            'React Native', 'Flutter', 'Ionic', 'Xamarin', 'Cordova', 'PhoneGap',
-            'iOS Development', 'Android Development', 'Swift', 'SwiftUI', 'Objective-C',
-            'Kotlin', 'Java', 'Mobile UI/UX', 'Mobile Performance', 'App Store Optimization',
-            'Push Notifications', 'In-App Purchases', 'Mobile Analytics',
-            
-            # Other Technologies
-            'WebRTC', 'WebGL', 'Three.js', 'D3.js', 'Chart.js', 'Highcharts', 'ApexCharts',
-            'Storybook', 'Chromatic', 'Design Systems', 'Component Libraries',
-            'Internationalization', 'i18n', 'Localization', 'l10n', 'Translation',
-            'Accessibility', 'A11y', 'Screen Readers', 'Keyboard Navigation',
-            'Performance Monitoring', 'Error Tracking', 'Feature Flags', 'A/B Testing',
-            'Analytics', 'Metrics', 'KPI', 'Dashboards', 'Reporting',
-            'Documentation', 'Technical Writing', 'API Documentation', 'Markdown',
-            'Confluence', 'Wiki', 'Knowledge Base', 'Runbooks',
+    @property
+    def taxonomy(self) -> SkillTaxonomy:
+        return self._index.taxonomy
+    
+    @property
+    def skill_automaton(self) -> KeywordAutomaton:
+        return self._index.automaton
+    
+    @property
+    def tech_skills_database(self) -> Set[str]:
+        """The skill vocabulary as listed in the skills database"""
+        return set(self._index.vocabulary)
+    
+    @property
+    def index_id(self) -> str:
+        return self._index.index_id
+    
+    def reload_skills(self, recompile: bool = False) -> Dict[str, Any]:
+        """
+        Load the skills index again and swap it in atomically
+        
+        Requests already running keep using the index they started with; new
+        calls see the new one. Cached analyses are keyed by index build, so
+        results computed with the old vocabulary are never served.
+        
+        Args:
+            recompile: Rebuild the artifact from skills.json even if it looks current
             
-            # Soft Skills & Concepts
-            'Problem Solving', 'Critical Thinking', 'Communication', 'Team Collaboration',
-            'Leadership', 'Mentoring', 'Code Review', 'Technical Leadership',
-            'Cross-Functional Collaboration', 'Stakeholder Management', 'Project Management',
-            'Time Management', 'Prioritization', 'Decision Making', 'Conflict Resolution'
-        }
+        Returns:
+            Information about the index that is now active
+        """
+        with self._reload_lock:
+            previous = self._index.index_id
+            if recompile:
+                self._index = compile_skill_index(self.skills_path, self.index_path)
+            else:
+                self._index = load_skill_index(self.skills_path, self.index_path)
+            self._index_mtime = self._artifact_mtime()
+            print(f"[SKILLS] Index reloaded: {previous} -> {self._index.index_id}")
+            return {
+                'previous_index': previous,
+                'index': self._index.index_id,
+                'skills': len(self._index.vocabulary),
+                'canonical_skills': len(self._index.taxonomy),
+            }
+    
+    def request_reload(self, *_):
+        """Ask for a reload on the next analysis (safe to call from a signal handler)"""
+        self._reload_requested = True
+    
+    def _artifact_mtime(self) -> float:
+        try:
+            return os.path.getmtime(self.index_path)
+        except OSError:
+            return 0.0
+    
+    def _current_index(self) -> SkillIndex:
+        """Return the active index, picking up a requested or newly compiled one first"""
+        now = time.monotonic()
+        if self._reload_requested or now >= self._next_reload_check:
+            self._next_reload_check = now + RELOAD_CHECK_INTERVAL
+            # Another worker (or compile_skills.py) may have replaced the artifact
+            if self._reload_requested or self._artifact_mtime() != self._index_mtime:
+                self._reload_requested = False
+                try:
+                    self.reload_skills()
+                except Exception as e:
+                    print(f"[ERROR] Skills reload failed, keeping {self._index.index_id}: {e}")
+        return self._index
     
-    def extract_keywords(self, job_description: str) -> List[str]:
+    def analyze_job_description(self, job_description: str) -> Dict[str, Any]:
         """
-        Extract important keywords from job description
+        Run the full keyword analysis of a job description in one pass
         
         Args:
             job_description: The job description text
             
         Returns:
-            List of extracted keywords
+            Dictionary with matched canonical skills, extra (capitalized phrase)
+            keywords, related ecosystem skills, fuzzy spelling matches and the
+            score of every term.
+            Results are shared through the analysis cache: treat them as read-only.
         """
-        # Convert to lowercase for matching
-        text_lower = job_description.lower()
+        index = self._current_index()
+        normalized = normalize_jd(job_description)
+        cache_key = f"{index.index_id}:{jd_cache_key(normalized)}"
+        analysis = self.analysis_cache.get(cache_key)
+        if analysis is None:
+            if len(job_description) > STREAM_THRESHOLD:
+                # Very large pastes (whole career pages) take the bounded-memory path
+                analysis = self.analyze_stream(iter_string_chunks(job_description))
+            else:
+                analysis = self._analyze(normalized, index)
+            self.analysis_cache.put(cache_key, analysis)
+        return analysis
+    
+    def _analyze(self, job_description: str, index: SkillIndex) -> Dict[str, Any]:
+        """Uncached analysis of a normalized job description"""
+        builder = _AnalysisBuilder(index)
+        builder.feed(job_description)
+        return builder.result()
+    
+    def analyze_stream(self, chunks: Iterable[Union[bytes, str]], max_bytes: int = None) -> Dict[str, Any]:
+        """
+        Analyze a job description delivered in chunks with bounded memory
         
-        # Find matching skills
-        found_skills = []
-        for skill in self.tech_skills_database:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
+        Text is processed in blocks of whole lines, so the full JD is never
+        held, lowercased or copied at once. Unknown capitalized phrases are
+        kept in a bounded table.
         
-        # Extract additional keywords (capitalized words, acronyms)
-        words = re.findall(r'\b[A-Z][A-Za-z0-9+#\.]*(?:\s+[A-Z][a-z]*)*\b', job_description)
+        Args:
+            chunks: Byte or text chunks (e.g. a streamed request body)
+            max_bytes: Input cap (defaults to JD_STREAM_MAX_BYTES)
+            
+        Returns:
+            The analyze_job_description() result plus 'bytes_read' and
+            'truncated'. Exact results are added to the analysis cache.
+        """
+        index = self._current_index()
+        reader = JDStreamReader(chunks, max_bytes)
+        builder = _AnalysisBuilder(index, max_phrases=STREAM_MAX_PHRASES)
+        for block in reader.blocks():
+            builder.feed(block)
+        analysis = builder.result()
         
-        # Combine and deduplicate
-        all_keywords = list(set(found_skills + words))
+        # Same key as the non-streaming path, so generate-resume can reuse it
+        if not reader.truncated and not builder.pruned:
+            self.analysis_cache.put(f"{index.index_id}:{reader.digest}", analysis)
         
-        return sorted(all_keywords)[:50]  # Return top 50 keywords
+        return dict(analysis, bytes_read=reader.bytes_read, truncated=reader.truncated)
+    
+    def extract_keywords(self, job_description: str, limit: int = 50) -> List[str]:
+        """
+        Extract important keywords from job description
+        
+        Args:
+            job_description: The job description text
+            limit: Maximum number of keywords to return
+            
+        Returns:
+            List of extracted keywords, highest-scoring first
+        """
+        return self.keywords_from_analysis(self.analyze_job_description(job_description), limit)
     
     def get_relevant_skills(self, job_description: str) -> List[str]:
         """
@@ -188,89 +296,85 @@ class ATSMatcher:
         Returns:
             List of all relevant skills from JD plus related ones
         """
-        text_lower = job_description.lower()
-        
-        # Find exact matches from JD (from our skills database)
-        exact_matches = []
-        for skill in self.tech_skills_database:
-            if skill.lower() in text_lower:
-                exact_matches.append(skill)
-        
-        # Extract additional technical keywords from JD (capitalized words, acronyms)
-        # Only include words that look like technical terms
-        additional_keywords = re.findall(r'\b[A-Z][A-Za-z0-9+#\.]*(?:\s+[A-Z][a-z]*)*\b', job_description)
-        
-        # Filter to only real technical keywords (not common words)
-        stop_words = {'The', 'This', 'That', 'These', 'Those', 'What', 'When', 'Where', 'Who', 'Why', 'How',
-                     'Are', 'Were', 'Was', 'Is', 'Be', 'Been', 'Being', 'Have', 'Has', 'Had', 'Do', 'Does',
-                     'Did', 'Will', 'Would', 'Should', 'Could', 'May', 'Might', 'Must', 'Can', 'Our', 'Your',
-                     'Their', 'His', 'Her', 'Its', 'We', 'You', 'They', 'He', 'She', 'It', 'Send', 'Get',
-                     'Make', 'Take', 'Give', 'Find', 'Use', 'Work', 'Call', 'Try', 'Ask', 'Need', 'Feel',
-                     'Want', 'Know', 'Put', 'Mean', 'Keep', 'Let', 'Begin', 'Start', 'Show', 'Turn', 'Follow',
-                     'Play', 'Run', 'Move', 'Live', 'Believe', 'Hold', 'Bring', 'Write', 'Provide', 'Sit',
-                     'Stand', 'Lose', 'Pay', 'Meet', 'Include', 'Continue', 'Set', 'Learn', 'Change', 'Lead',
-                     'And', 'Or', 'But', 'If', 'Then', 'Because', 'As', 'Until', 'While', 'Of', 'At', 'By',
-                     'For', 'With', 'About', 'Against', 'Between', 'Into', 'Through', 'During', 'Before', 'After',
-                     'Above', 'Below', 'To', 'From', 'Up', 'Down', 'In', 'Out', 'On', 'Off', 'Over', 'Under'}
-        
-        additional_keywords = [k for k in additional_keywords if k not in stop_words and len(k) > 2]
-        
-        # Add related skills based on context (ecosystem skills)
-        related_skills = self._get_related_skills(exact_matches, text_lower)
-        
-        # Combine all skills - prioritize JD skills first, then related
-        all_skills = list(dict.fromkeys(exact_matches + additional_keywords + related_skills))
-        
-        return all_skills
+        return self.skills_from_analysis(self.analyze_job_description(job_description))
     
-    def _get_related_skills(self, found_skills: List[str], job_text: str) -> List[str]:
-        """Get skills related to those found in job description"""
-        related = []
-        
-        # Frontend ecosystems
-        if any(s in found_skills for s in ['Angular', 'React', 'Vue.js', 'Vue']):
-            related.extend([
-                'TypeScript', 'JavaScript', 'HTML5', 'CSS3', 'SCSS', 'Webpack',
-                'npm', 'Node.js', 'REST', 'API', 'Git', 'Responsive Design',
-                'Component Architecture', 'State Management', 'RxJS', 'Redux',
-                'Single Page Applications', 'SPA', 'Progressive Web Apps', 'PWA'
-            ])
-        
-        # Backend ecosystems
-        if any(s in found_skills for s in ['.NET', 'ASP.NET', 'C#']):
-            related.extend([
-                'C#', '.NET Core', '.NET Framework', 'ASP.NET Core', 'ASP.NET MVC',
-                'Entity Framework', 'LINQ', 'SQL Server', 'Azure', 'REST',
-                'Web API', 'Microservices', 'Docker', 'Kubernetes'
-            ])
-        
-        if any(s in found_skills for s in ['Node.js', 'Express', 'JavaScript']):
-            related.extend([
-                'Node.js', 'Express.js', 'JavaScript', 'TypeScript', 'MongoDB',
-                'PostgreSQL', 'REST', 'GraphQL', 'Docker', 'AWS', 'Microservices'
-            ])
+    def keywords_and_skills(self, job_description: str) -> Tuple[List[str], List[str]]:
+        """Return (keywords, relevant skills) for a JD from a single analysis"""
+        analysis = self.analyze_job_description(job_description)
+        return self.keywords_from_analysis(analysis), self.skills_from_analysis(analysis)
+    
+    @staticmethod
+    def keywords_from_analysis(analysis: Dict[str, Any], limit: int = 50) -> List[str]:
+        """Top keywords of an analysis result, highest-scoring first"""
+        return rank_terms(analysis['scores'], k=limit)
+    
+    @staticmethod
+    def skills_from_analysis(analysis: Dict[str, Any]) -> List[str]:
+        """Relevant skills of an analysis result"""
+        scores = analysis['scores']
         
-        # Cloud platforms
-        if 'AWS' in found_skills or 'aws' in job_text:
-            related.extend([
-                'AWS', 'EC2', 'S3', 'Lambda', 'RDS', 'CloudFront', 'API Gateway',
-                'CloudFormation', 'Terraform', 'Docker', 'Kubernetes', 'DevOps'
-            ])
+        # JD skills first (by score), then other JD keywords, then related ecosystem skills
+        all_skills = (rank_terms(scores, analysis['matched_skills']) +
+                      rank_terms(scores, analysis['extra_keywords']) +
+                      analysis['related_skills'])
         
-        if 'Azure' in found_skills or 'azure' in job_text:
-            related.extend([
-                'Azure', 'Azure DevOps', 'Azure Functions', 'Azure App Services',
-                'Azure SQL Database', 'Application Insights', 'ARM Templates', 'Docker'
-            ])
+        return list(dict.fromkeys(all_skills))
+    
+    def count_skill_ids(self, text: str) -> Dict[int, int]:
+        """Count mentions of every canonical skill in text (keyed by skill ID)"""
+        counts = {}
+        for _, skill_id in self._skill_mentions(self._current_index(), self._lower_aligned(text)):
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+        return counts
+    
+    def rank_skills(self, skills: List[str], job_description: str) -> List[str]:
+        """
+        Deduplicate skills (by canonical name) and order them by their JD score
         
-        # DevOps
-        if any(s in found_skills for s in ['Docker', 'Kubernetes', 'CI/CD']):
-            related.extend([
-                'Docker', 'Kubernetes', 'Jenkins', 'GitHub Actions', 'GitLab CI',
-                'Terraform', 'Ansible', 'Monitoring', 'Logging', 'Infrastructure as Code'
-            ])
+        Skills the JD does not mention keep their original relative order.
+        """
+        scores = {term.lower(): score for term, score in self.analyze_job_description(job_description)['scores'].items()}
+        taxonomy = self.taxonomy
+        unique = {}
+        for skill in skills:
+            canonical = taxonomy.canonical_name(skill)
+            unique.setdefault(canonical.lower(), canonical)
+        return sorted(unique.values(), key=lambda skill: scores.get(skill.lower(), 0.0), reverse=True)
+    
+    @staticmethod
+    def _skill_mentions(index: SkillIndex, text_lower: str) -> List[Tuple[int, int]]:
+        """
+        (start, skill_id) of each skill mention in lowercased text, in text order
         
-        return related
+        The automaton also reports patterns inside longer ones ('vue' in 'vue.js',
+        'react' in 'react native', '.net' in 'asp.net core'). Only the longest
+        match covering a span is kept, so a mention counts once, as the most
+        specific skill it names.
+        """
+        patterns = index.automaton.patterns
+        matches = sorted(
+            ((start, start + len(patterns[pattern_id]), pattern_id)
+             for start, pattern_id in index.automaton.iter_matches(text_lower)),
+            key=lambda match: (match[0], -match[1])
+        )
+        mentions = []
+        reach = -1
+        for start, end, pattern_id in matches:
+            # Starts no earlier than every match before it: inside one iff one ends at or after it
+            if end <= reach:
+                continue
+            reach = end
+            mentions.append((start, index.pattern_skill_ids[pattern_id]))
+        return mentions
+    
+    @staticmethod
+    def _lower_aligned(text: str) -> str:
+        """Lowercase text while keeping character offsets aligned with the original"""
+        text_lower = text.lower()
+        if len(text_lower) != len(text):
+            # A few characters (e.g. 'İ') expand when lowercased
+            text_lower = ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+        return text_lower
     
     def _get_common_skills(self) -> List[str]:
         """Return commonly required skills across many job postings"""
@@ -294,16 +398,18 @@ class ATSMatcher:
         """
         optimized = user_data.copy()
         
-        # Get relevant skills from JD
+        # Get relevant skills from JD (already in scored order)
         relevant_skills = self.get_relevant_skills(job_description)
+        relevant_keys = {s.lower() for s in relevant_skills}
         
         # Merge user skills with job-relevant skills (prioritize JD-matching skills first)
-        user_skills = set(user_data.get('skills', []))
+        user_skills = list(dict.fromkeys(self.taxonomy.canonical_name(s) for s in user_data.get('skills', [])))
+        user_keys = {s.lower() for s in user_skills}
         
         # Prioritize: JD skills that user has, then all other JD skills, then remaining user skills
-        jd_skills_user_has = [s for s in relevant_skills if s in user_skills]
-        jd_skills_user_lacks = [s for s in relevant_skills if s not in user_skills]
-        remaining_user_skills = [s for s in user_skills if s not in relevant_skills]
+        jd_skills_user_has = [s for s in relevant_skills if s.lower() in user_keys]
+        jd_skills_user_lacks = [s for s in relevant_skills if s.lower() not in user_keys]
+        remaining_user_skills = [s for s in user_skills if s.lower() not in relevant_keys]
         
         all_skills = jd_skills_user_has + jd_skills_user_lacks + remaining_user_skills
         
@@ -326,7 +432,7 @@ class ATSMatcher:
         years = len(work_exp) * 2  # Rough estimate
         
         # Extract key skills from job description
-        keywords = self.extract_keywords(job_description)[:5]
+        keywords = self.extract_keywords(job_description, limit=5)
         skills_text = ', '.join(keywords) if keywords else 'modern technologies'
         
         return f"Professional with {years}+ years of experience in software development, specializing in {skills_text}. Proven track record of delivering high-quality solutions and collaborating effectively with cross-functional teams."
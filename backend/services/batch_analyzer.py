@@ -0,0 +1,130 @@
+"""
+Batch Job Description Analysis
+Fans job descriptions out across a process pool whose workers load the compiled skill index
+"""
+import multiprocessing
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# The matcher used by pool workers, set by _init_worker when each worker starts
+# (or by the parent when analyzing in-process)
+_worker_matcher = None
+
+
+def _init_worker(skills_path: str):
+    """Pool initializer: load the compiled skill index (a file read, not a rebuild)"""
+    global _worker_matcher
+    from services.ats_matcher import ATSMatcher
+    _worker_matcher = ATSMatcher(skills_path=skills_path)
+
+
+def _start_method() -> Optional[str]:
+    """
+    Start method for pool workers
+
+    Not 'fork': the server process runs threads (request handlers, the AI event
+    loop), and a child forked while one of them holds a lock can hang on it.
+    forkserver workers are forked from a clean single-threaded process instead.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    for method in ('forkserver', 'spawn'):
+        if method in methods:
+            return method
+    return None
+
+
+def _analyze_item(item) -> Dict[str, Any]:
+    """Analyze one (index, id, job_description) item inside a pool worker"""
+    index, item_id, job_description = item
+    result = {'index': index}
+    if item_id is not None:
+        result['id'] = item_id
+
+    if not isinstance(job_description, str):
+        result.update({'success': False, 'error': 'job_description must be a string'})
+        return result
+
+    try:
+        keywords, suggested_skills = _worker_matcher.keywords_and_skills(job_description)
+        result.update({'success': True, 'keywords': keywords, 'suggested_skills': suggested_skills})
+    except Exception as e:
+        result.update({'success': False, 'error': str(e)})
+    return result
+
+
+class BatchAnalyzer:
+    """Analyzes many job descriptions in parallel and yields results as they finish"""
+
+    def __init__(self, ats_matcher, processes: Optional[int] = None, chunksize: int = 4):
+        """
+        Args:
+            ats_matcher: ATSMatcher for in-process analysis; pool workers load its skills index
+            processes: Pool size (defaults to BATCH_ANALYZER_PROCESSES or the CPU count)
+            chunksize: Number of JDs handed to a worker at a time
+        """
+        self.ats_matcher = ats_matcher
+        self.processes = processes or int(os.getenv('BATCH_ANALYZER_PROCESSES', 0)) or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._pool = None
+        self._pool_pid = None
+        self._pool_index_id = None
+
+    def _get_pool(self):
+        """Create the pool lazily (once per server worker process)"""
+        method = _start_method()
+        if self.processes < 2 or method is None:
+            return None
+
+        # Workers load the skill index when they start: restart them after a reload
+        index_id = self.ats_matcher.index_id
+        if self._pool is not None and self._pool_index_id != index_id:
+            self.close()
+
+        if self._pool is None or self._pool_pid != os.getpid():
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                # Import the matcher once in the fork server rather than in every worker
+                context.set_forkserver_preload(['services.ats_matcher'])
+            self._pool = context.Pool(self.processes, initializer=_init_worker,
+                                      initargs=(self.ats_matcher.skills_path,))
+            self._pool_pid = os.getpid()
+            self._pool_index_id = index_id
+        return self._pool
+
+    def analyze(self, job_descriptions: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze job descriptions, yielding results in completion order
+
+        Args:
+            job_descriptions: JD strings or {'id': ..., 'job_description': ...} dicts.
+                May be a lazy iterator (e.g. parsed from an NDJSON stream).
+
+        Yields:
+            Result dictionaries carrying the input 'index' (and 'id' if given)
+        """
+        items = self._normalize(job_descriptions)
+        pool = self._get_pool()
+
+        if pool is None:
+            global _worker_matcher
+            _worker_matcher = self.ats_matcher
+            for item in items:
+                yield _analyze_item(item)
+            return
+
+        yield from pool.imap_unordered(_analyze_item, items, self.chunksize)
+
+    @staticmethod
+    def _normalize(job_descriptions: Iterable[Any]) -> Iterator[tuple]:
+        """Turn the accepted input shapes into (index, id, job_description) tuples"""
+        for index, entry in enumerate(job_descriptions):
+            if isinstance(entry, dict):
+                yield index, entry.get('id'), entry.get('job_description', '')
+            else:
+                yield index, None, entry
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.terminate()
+        self._pool = None
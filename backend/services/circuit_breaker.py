@@ -0,0 +1,214 @@
+"""
+AI Circuit Breaker
+Watches the error rate and latency of DeepSeek calls and cuts the provider off while
+it is failing, so resumes are built from templates instead of waiting on timeouts.
+State lives in SQLite so every gunicorn worker sees the same breaker.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict
+
+BREAKER_DB_PATH = os.getenv('AI_BREAKER_DB_PATH', 'data/ai_breaker.db')
+
+# Trip when at least MIN_CALLS calls in the window have this failure share
+# (errors, timeouts and calls slower than SLOW_CALL seconds)
+AI_BREAKER_WINDOW = float(os.getenv('AI_BREAKER_WINDOW', 60))
+AI_BREAKER_MIN_CALLS = int(os.getenv('AI_BREAKER_MIN_CALLS', 10))
+AI_BREAKER_FAILURE_RATE = float(os.getenv('AI_BREAKER_FAILURE_RATE', 0.5))
+AI_BREAKER_SLOW_CALL = float(os.getenv('AI_BREAKER_SLOW_CALL', 30))
+
+# Seconds open before a probe request is let through, and successes that close it again
+AI_BREAKER_COOLDOWN = float(os.getenv('AI_BREAKER_COOLDOWN', 30))
+HALF_OPEN_SUCCESSES = 3
+
+# A probe that never reports back frees the half-open slot after this long
+PROBE_TTL = 60.0
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    ts REAL NOT NULL,
+    failed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outcomes_ts ON outcomes (ts);
+CREATE TABLE IF NOT EXISTS breaker (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    state TEXT NOT NULL,
+    since REAL NOT NULL,
+    probe_until REAL NOT NULL DEFAULT 0,
+    successes INTEGER NOT NULL DEFAULT 0,
+    opened INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS state_time (
+    state TEXT PRIMARY KEY,
+    seconds REAL NOT NULL
+);
+"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker shared by all workers
+
+    Closed: calls go through and their outcomes are recorded. Open: callers
+    should skip the provider (allow_request() is False) until the cooldown
+    has passed. Half-open: one request at a time is let through as a probe;
+    HALF_OPEN_SUCCESSES successful calls close the breaker, a failure opens
+    it again. The time spent in each state is accumulated for stats().
+    SQLite failures are logged and the breaker fails closed (calls allowed).
+    """
+
+    def __init__(self, path: str = None, window: float = None, min_calls: int = None,
+                 failure_rate: float = None, slow_call: float = None, cooldown: float = None):
+        self.path = path or BREAKER_DB_PATH
+        self.window = window or AI_BREAKER_WINDOW
+        self.min_calls = min_calls or AI_BREAKER_MIN_CALLS
+        self.failure_rate = failure_rate or AI_BREAKER_FAILURE_RATE
+        self.slow_call = slow_call or AI_BREAKER_SLOW_CALL
+        self.cooldown = cooldown or AI_BREAKER_COOLDOWN
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection, float], Any], default: Any) -> Any:
+        """Run fn(conn, now) in a write transaction; return default if SQLite fails"""
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(conn, time.time())
+                conn.execute('COMMIT')
+                return result
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            print(f"[WARN] AI circuit breaker unavailable, allowing calls: {e}")
+            return default
+
+    def _load(self, conn: sqlite3.Connection, now: float) -> Dict[str, Any]:
+        """Current breaker row; an open breaker past its cooldown becomes half-open"""
+        row = conn.execute('SELECT state, since, probe_until, successes, opened FROM breaker WHERE id = 1').fetchone()
+        if row is None:
+            conn.execute('INSERT INTO breaker (id, state, since) VALUES (1, ?, ?)', (CLOSED, now))
+            row = (CLOSED, now, 0.0, 0, 0)
+        breaker = dict(zip(('state', 'since', 'probe_until', 'successes', 'opened'), row))
+        if breaker['state'] == OPEN and now - breaker['since'] >= self.cooldown:
+            breaker = self._move(conn, breaker, HALF_OPEN, now)
+        return breaker
+
+    def _move(self, conn: sqlite3.Connection, breaker: Dict[str, Any], state: str, now: float) -> Dict[str, Any]:
+        """Switch state, adding the time spent in the old one to its total"""
+        conn.execute(
+            'INSERT INTO state_time (state, seconds) VALUES (?, ?) '
+            'ON CONFLICT(state) DO UPDATE SET seconds = seconds + excluded.seconds',
+            (breaker['state'], now - breaker['since'])
+        )
+        opened = breaker['opened'] + (1 if state == OPEN else 0)
+        conn.execute('UPDATE breaker SET state = ?, since = ?, probe_until = 0, successes = 0, opened = ? WHERE id = 1',
+                     (state, now, opened))
+        if state == CLOSED:
+            # Failures from before the outage must not trip the breaker again right away
+            conn.execute('DELETE FROM outcomes')
+        print(f"[AI] Circuit breaker {breaker['state']} -> {state}")
+        return {'state': state, 'since': now, 'probe_until': 0.0, 'successes': 0, 'opened': opened}
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may use the provider now
+
+        In the half-open state this claims the probe slot, so only one caller
+        at a time gets True. Blocking (SQLite); call off the event loop.
+        """
+        def check(conn, now):
+            breaker = self._load(conn, now)
+            if breaker['state'] == CLOSED:
+                return True
+            if breaker['state'] == HALF_OPEN and breaker['probe_until'] < now:
+                conn.execute('UPDATE breaker SET probe_until = ? WHERE id = 1', (now + PROBE_TTL,))
+                print("[AI] Circuit breaker half-open, letting a probe request through")
+                return True
+            return False
+
+        return self._transaction(check, True)
+
+    def is_open(self) -> bool:
+        """Whether calls should fail fast (open and still cooling down). Blocking (SQLite)"""
+        return self._transaction(lambda conn, now: self._load(conn, now)['state'] == OPEN, False)
+
+    def record(self, failed: bool, latency: float = None):
+        """
+        Record the outcome of a provider call. Blocking (SQLite)
+
+        Args:
+            failed: The call errored or timed out
+            latency: Seconds the call took (a slow success counts as a failure)
+        """
+        failed = failed or (latency is not None and latency > self.slow_call)
+
+        def update(conn, now):
+            conn.execute('INSERT INTO outcomes (ts, failed) VALUES (?, ?)', (now, int(failed)))
+            conn.execute('DELETE FROM outcomes WHERE ts < ?', (now - self.window,))
+            breaker = self._load(conn, now)
+            if breaker['state'] == HALF_OPEN:
+                if failed:
+                    self._move(conn, breaker, OPEN, now)
+                elif breaker['successes'] + 1 >= HALF_OPEN_SUCCESSES:
+                    self._move(conn, breaker, CLOSED, now)
+                else:
+                    conn.execute('UPDATE breaker SET successes = successes + 1, probe_until = 0 WHERE id = 1')
+            elif breaker['state'] == CLOSED and failed:
+                calls, failures = conn.execute('SELECT COUNT(*), SUM(failed) FROM outcomes').fetchone()
+                if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                    print(f"[AI] {failures}/{calls} DeepSeek calls failed in the last {self.window:.0f}s")
+                    self._move(conn, breaker, OPEN, now)
+
+        self._transaction(update, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Shared breaker state, recent outcomes and seconds spent in each state"""
+        def read(conn, now):
+            breaker = self._load(conn, now)
+            seconds = {state: 0.0 for state in (CLOSED, OPEN, HALF_OPEN)}
+            seconds.update(dict(conn.execute('SELECT state, seconds FROM state_time').fetchall()))
+            seconds[breaker['state']] += now - breaker['since']
+            calls, failures = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(failed), 0) FROM outcomes WHERE ts >= ?', (now - self.window,)
+            ).fetchone()
+            return {
+                'state': breaker['state'],
+                'state_seconds': round(now - breaker['since'], 1),
+                'times_opened': breaker['opened'],
+                'seconds_in_state': {state: round(value, 1) for state, value in seconds.items()},
+                'window_calls': calls,
+                'window_failures': failures,
+            }
+
+        return self._transaction(read, {'state': 'unknown'})
+
+
+_breaker = None
+
+
+def get_breaker() -> CircuitBreaker:
+    """The process-wide breaker (its state is shared with the other workers)"""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker()
+    return _breaker
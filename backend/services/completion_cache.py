@@ -0,0 +1,199 @@
+"""
+Persistent Completion Cache
+Content-addressed SQLite store for AI chat completions, shared by all server workers
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+COMPLETION_CACHE_PATH = os.getenv('COMPLETION_CACHE_PATH', 'data/completion_cache.db')
+
+# Run LRU eviction once every this many writes (not on every put)
+EVICTION_INTERVAL = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def completion_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                   response_format: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of everything that determines a completion request"""
+    request = {'model': model, 'messages': messages, 'temperature': temperature, 'max_tokens': max_tokens}
+    if response_format is not None:
+        request['response_format'] = response_format
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """
+    Size-bounded LRU cache of completions with per-entry expiry
+
+    SQLite in WAL mode lets every gunicorn worker read and write the same
+    file concurrently. Errors are logged and treated as cache misses, so a
+    broken cache never breaks generation.
+
+    Leases let one worker claim a key while it computes the completion, so
+    other workers wait for the cached result instead of repeating the call.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl_seconds: float = None):
+        self.path = path or COMPLETION_CACHE_PATH
+        self.max_entries = max_entries or int(os.getenv('COMPLETION_CACHE_SIZE', 5000))
+        self.ttl_seconds = ttl_seconds or float(os.getenv('COMPLETION_CACHE_TTL', 7 * 24 * 3600))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections must not cross a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str, record_miss: bool = True) -> Optional[str]:
+        """Return the cached completion text, or None if missing or expired"""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT content, total_tokens, expires_at FROM completions WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[2] < now:
+                if record_miss:
+                    with self._lock:
+                        self.misses += 1
+                return None
+            conn.execute('UPDATE completions SET last_used = ?, hits = hits + 1 WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            print(f"[WARN] Completion cache read failed: {e}")
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.tokens_saved += row[1]
+        return row[0]
+
+    def put(self, key: str, model: str, content: str, total_tokens: int = 0):
+        """Store a completion, evicting expired and least recently used entries periodically"""
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO completions '
+                '(key, model, content, total_tokens, created_at, last_used, expires_at, hits) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, 0)',
+                (key, model, content, total_tokens, now, now, now + self.ttl_seconds)
+            )
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % EVICTION_INTERVAL == 0
+            if evict:
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"[WARN] Completion cache write failed: {e}")
+
+    def try_lease(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Claim key for owner unless another owner holds an unexpired lease"""
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE leases.expires_at < ?',
+                (key, owner, now + ttl_seconds, now)
+            )
+            row = conn.execute('SELECT owner FROM leases WHERE key = ?', (key,)).fetchone()
+            return row is not None and row[0] == owner
+        except sqlite3.Error as e:
+            print(f"[WARN] Completion cache lease failed: {e}")
+            # Without the lease table, proceed as if this worker holds the lease
+            return True
+
+    def lease_held(self, key: str) -> bool:
+        """Whether some owner holds an unexpired lease on key"""
+        try:
+            row = self._connection().execute(
+                'SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?', (key, time.time())
+            ).fetchone()
+            return row is not None
+        except sqlite3.Error:
+            return False
+
+    def release_lease(self, key: str, owner: str):
+        """Drop owner's lease on key (no-op if it expired and was taken over)"""
+        try:
+            self._connection().execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, owner))
+        except sqlite3.Error as e:
+            print(f"[WARN] Completion cache lease release failed: {e}")
+
+    def evict(self) -> int:
+        """Drop expired entries and trim the store to max_entries (least recently used first)"""
+        conn = self._connection()
+        conn.execute('DELETE FROM leases WHERE expires_at < ?', (time.time(),))
+        removed = conn.execute('DELETE FROM completions WHERE expires_at < ?', (time.time(),)).rowcount
+        count = conn.execute('SELECT COUNT(*) FROM completions').fetchone()[0]
+        if count > self.max_entries:
+            removed += conn.execute(
+                'DELETE FROM completions WHERE key IN '
+                '(SELECT key FROM completions ORDER BY last_used ASC LIMIT ?)',
+                (count - self.max_entries,)
+            ).rowcount
+        return removed
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        try:
+            self._connection().execute('DELETE FROM completions')
+        except sqlite3.Error as e:
+            print(f"[WARN] Completion cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return store size and this worker's hit/miss counters"""
+        try:
+            entries = self._connection().execute('SELECT COUNT(*) FROM completions').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'tokens_saved': self.tokens_saved,
+            }
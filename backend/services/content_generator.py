@@ -2,10 +2,33 @@
 Professional Content Generator for ATS-Optimized Resumes
 Auto-generates professional summaries, job descriptions, and other content
 """
+import os
 import re
-from typing import List, Dict, Any
+import asyncio
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime
-from services.ai_content_generator import AIContentGenerator
+from services.ai_content_generator import (AIContentGenerator, PREFIX_WARMUP, request_time_left,
+                                           set_request_budget, track_request_usage, years_at_position)
+from services.async_runtime import get_runtime
+from services.circuit_breaker import CircuitOpenError
+from services.draft_store import DraftStore, context_key, FAILED, PENDING, READY
+from services.jd_compactor import JD_COMPACTION_ENABLED, compact_jd
+from services.strategy_selector import StrategySelector
+from services.task_graph import TaskGraph
+
+# 'fanout': one API call per section, all concurrent (streams text).
+# 'batch': one JSON call for every section, re-requesting only invalid ones (fewest calls).
+# 'hybrid': one JSON call for the short sections, one call per job description (streams descriptions).
+# 'auto': pick per request from measured latencies (see services/strategy_selector.py).
+GENERATION_MODES = ('fanout', 'batch', 'hybrid')
+STREAMING_MODES = ('fanout', 'hybrid')
+GENERATION_MODE = os.getenv('AI_GENERATION_MODE', 'auto')
+
+# Seconds an AI resume may take; sections still pending then are filled from the templates (0 = no limit)
+RESUME_LATENCY_BUDGET = float(os.getenv('RESUME_LATENCY_BUDGET', 25))
+
+# Task graph nodes that are steps towards a section rather than sections themselves
+INTERNAL_NODES = ('warm_prefix', 'draft', 'skills_raw', 'sections')
 
 class ContentGenerator:
     """Generates professional resume content based on job description and user inputs"""
@@ -15,7 +38,18 @@ class ContentGenerator:
         self.use_ai = use_ai
         if use_ai:
             self.ai_generator = AIContentGenerator()
-        
+            self.strategy = StrategySelector(self.ai_generator.governor)
+            self.drafts = DraftStore()
+        
+    def _ai_available(self) -> bool:
+        """use_ai, unless the circuit breaker has cut DeepSeek off (blocking: reads the shared breaker)"""
+        if not self.use_ai:
+            return False
+        if self.ai_generator.breaker.allow_request():
+            return True
+        print("[AI] Circuit breaker open, using template content")
+        return False
+    
     def calculate_years_experience(self, work_history: List[Dict]) -> int:
         """Calculate total years of experience from work history"""
         total_years = 0
@@ -37,14 +71,18 @@ class ContentGenerator:
         match = re.search(r'\d{4}', date_str)
         return int(match.group()) if match else None
     
-    def generate_professional_title(self, job_description: str, years_exp: int = 14) -> str:
+    def generate_professional_title(self, job_description: str, years_exp: int = 14, fresh: bool = False) -> str:
         """Generate professional title based on job description"""
-        if self.use_ai:
+        if self._ai_available():
             try:
-                return self.ai_generator.generate_professional_title(job_description, years_exp)
+                return self.ai_generator.generate_professional_title(job_description, years_exp, fresh=fresh)
             except Exception as e:
                 print(f"AI failed, using fallback: {e}")
         
+        return self._template_title(job_description)
+    
+    def _template_title(self, job_description: str) -> str:
+        """Professional title without AI"""
         # Enhanced fallback - detect role from job description
         job_desc_lower = job_description.lower()
         seniority = "Senior"
@@ -68,14 +106,22 @@ class ContentGenerator:
         
         return f"{seniority} {role} | {specs}"
     
-    def generate_professional_summary(self, job_description: str, work_history: List[Dict]) -> str:
+    def generate_professional_summary(self, job_description: str, work_history: List[Dict],
+                                      fresh: bool = False) -> str:
         """Generate comprehensive professional summary"""
         years_exp = self.calculate_years_experience(work_history)
         
-        if self.use_ai:
-            return self.ai_generator.generate_professional_summary(job_description, years_exp, work_history)
+        if self._ai_available():
+            try:
+                return self.ai_generator.generate_professional_summary(job_description, years_exp, work_history,
+                                                                       fresh=fresh)
+            except CircuitOpenError:
+                print("[AI] Circuit breaker opened, using template summary")
         
-        # Fallback
+        return self._template_summary(job_description, years_exp)
+    
+    def _template_summary(self, job_description: str, years_exp: int) -> str:
+        """Professional summary without AI"""
         keywords = self.ats_matcher.extract_keywords(job_description)
         job_desc_lower = job_description.lower()
         
@@ -143,9 +189,9 @@ class ContentGenerator:
         return summary
     
     def generate_job_title(self, company_index: int, job_description: str, company_name: str, 
-                           start_date: str = "", end_date: str = "") -> str:
+                           start_date: str = "", end_date: str = "", fresh: bool = False) -> str:
         """Generate appropriate job title based on position in career"""
-        if self.use_ai:
+        if self._ai_available():
             years_at_company = 3  # Default estimate
             if start_date and end_date:
                 start_year = self._extract_year(start_date)
@@ -153,11 +199,17 @@ class ContentGenerator:
                 if start_year and end_year:
                     years_at_company = end_year - start_year
             
-            return self.ai_generator.generate_job_title_for_position(
-                job_description, company_name, company_index, years_at_company
-            )
+            try:
+                return self.ai_generator.generate_job_title_for_position(
+                    job_description, company_name, company_index, years_at_company, fresh=fresh
+                )
+            except CircuitOpenError:
+                print("[AI] Circuit breaker opened, using template job title")
         
-        # Fallback
+        return self._template_job_title(company_index)
+    
+    def _template_job_title(self, company_index: int) -> str:
+        """Job title for a position without AI"""
         if company_index == 0:
             return "Senior Professional"
         elif company_index == 1:
@@ -168,14 +220,21 @@ class ContentGenerator:
             return "Associate Professional"
     
     def generate_job_description(self, company_index: int, company_name: str, 
-                                 job_description: str, start_date: str, end_date: str, job_title: str = "") -> str:
+                                 job_description: str, start_date: str, end_date: str, job_title: str = "",
+                                 fresh: bool = False) -> str:
         """Generate detailed, accomplishment-focused job description"""
-        if self.use_ai:
-            return self.ai_generator.generate_job_description(
-                job_description, company_name, job_title, start_date, end_date, company_index
-            )
+        if self._ai_available():
+            try:
+                return self.ai_generator.generate_job_description(
+                    job_description, company_name, job_title, start_date, end_date, company_index, fresh=fresh
+                )
+            except CircuitOpenError:
+                print("[AI] Circuit breaker opened, using template job description")
         
-        # Fallback
+        return self._template_job_description(company_index, company_name, job_description)
+    
+    def _template_job_description(self, company_index: int, company_name: str, job_description: str) -> str:
+        """Job description for a position without AI"""
         job_desc_lower = job_description.lower()
         keywords = self.ats_matcher.extract_keywords(job_description)
         
@@ -376,124 +435,415 @@ class ContentGenerator:
         
         return enhanced
     
-    def generate_full_resume_data(self, user_data: Dict, job_description: str) -> Dict:
-        """Generate complete resume with all auto-generated content"""
+    def generate_full_resume_data(self, user_data: Dict, job_description: str, fresh: bool = False,
+                                  budget: float = None, draft_token: str = None) -> Dict:
+        """
+        Generate complete resume with all auto-generated content
+        
+        Args:
+            user_data: User's resume data
+            job_description: Target job description
+            fresh: Ask the AI for new content instead of reusing cached completions
+            budget: Latency budget in seconds for the AI path (default RESUME_LATENCY_BUDGET)
+            draft_token: Token from prepare_draft() for this JD
+        """
+        if self.use_ai:
+            # ⚡ FASTEST: every section is a task that starts as soon as its inputs are ready
+            print("[AI] Generating ALL content as concurrent API calls (task graph)...")
+            return self.ai_generator.run(self.agenerate_full_resume_data(user_data, job_description, fresh=fresh,
+                                                                         budget=budget, draft_token=draft_token))
+        return self._template_resume_data(user_data, job_description)
+    
+    def prepare_draft(self, job_description: str, work_experience: List[Dict] = None) -> Optional[str]:
+        """
+        Start the part of a generation that only needs the JD, in the background
+        
+        Compacts the JD and extracts its skills, plus the title when the work
+        history is already known (written with the same prompt context as the
+        generation, so it is only used if the work history is unchanged). The
+        results are stored under a draft token for agenerate_full_resume_data().
+        A live draft for the same JD and work history is reused. Returns right
+        away; the AI calls run on the shared event loop.
+        
+        Returns:
+            Draft token, or None if the AI is not in use (or cut off by the circuit breaker)
+        """
+        if not self.use_ai or not job_description.strip() or self.ai_generator.breaker.is_open():
+            return None
+        years_exp = self.calculate_years_experience(work_experience) if work_experience else None
+        variant = context_key(self.ai_generator.prompt_context(job_description, years_exp, work_experience))
+        token = self.drafts.find(job_description, variant)
+        if token:
+            print(f"[DRAFT] Reusing draft {token[:8]} for the same job description")
+            return token
+        token = self.drafts.create(job_description, variant)
+        get_runtime().submit(self._abuild_draft(token, job_description, work_experience))
+        return token
+    
+    async def _abuild_draft(self, token: str, job_description: str, work_experience: Optional[List[Dict]]):
+        """Compute and store a draft's pieces (see prepare_draft)"""
+        ai = self.ai_generator
+        years_exp = self.calculate_years_experience(work_experience) if work_experience else None
+        usage = track_request_usage()
+        set_request_budget(RESUME_LATENCY_BUDGET)
+        try:
+            compaction = await asyncio.to_thread(compact_jd, job_description) if JD_COMPACTION_ENABLED else None
+            prompt_jd = (compaction['text'] if compaction else None) or job_description
+            calls = [ai.aextract_skills_from_jd(prompt_jd, context=ai.prompt_context(prompt_jd))]
+            if years_exp is not None:
+                # The generation's own context, so the title matches what that run would write
+                title_context = ai.prompt_context(prompt_jd, years_exp, work_experience)
+                calls.append(ai.agenerate_professional_title(prompt_jd, years_exp, context=title_context))
+            results = await asyncio.gather(*calls, return_exceptions=True)
+            
+            # A failed call returns its fallback; leave that piece for the generation to retry
+            draft = {'compaction': compaction, 'skills': None, 'titles': {}}
+            if isinstance(results[0], list) and results[0] != ai.fallback_skills():
+                draft['skills'] = results[0]
+            if years_exp is not None and isinstance(results[1], str) and results[1] != ai.fallback_title(years_exp):
+                draft['titles'][context_key(title_context)] = results[1]
+            await asyncio.to_thread(self.drafts.save, token, draft)
+            print(f"[DRAFT] Draft {token[:8]} ready: {len(draft['skills'] or [])} skills, "
+                  f"{'a' if draft['titles'] else 'no'} title ({usage['api_calls']} API calls)")
+        except Exception as e:
+            print(f"[WARN] Could not prepare draft {token[:8]}: {e}")
+            try:
+                await asyncio.to_thread(self.drafts.save, token, None, FAILED)
+            except Exception:
+                pass
+    
+    def _template_resume_data(self, user_data: Dict, job_description: str) -> Dict:
+        """Complete resume from the template generators (no AI)"""
         work_experience = user_data.get('work_experience', [])
         
         # Calculate years of experience
         years_exp = self.calculate_years_experience(work_experience)
         
-        # Generate skills using AI for better extraction
-        if self.use_ai:
-            print("[AI] Extracting skills using AI...")
-            suggested_skills = self.ai_generator.extract_skills_from_jd(job_description)
-            # Add user's existing skills that might not be in JD
-            user_skills = user_data.get('skills', [])
-            for skill in user_skills:
-                if skill not in suggested_skills:
-                    suggested_skills.append(skill)
-        else:
-            # Fallback to regex-based extraction
-            suggested_skills = self.ats_matcher.get_relevant_skills(job_description)
+        # Fallback to regex-based extraction
+        suggested_skills = self.ats_matcher.get_relevant_skills(job_description)
         
-        # ⚡ FASTEST: Use PARALLEL API calls (all at once, much faster!)
-        if self.use_ai:
-            print(f"⚡ PARALLEL MODE: Generating ALL content with simultaneous API calls...")
-            ai_content = self.ai_generator.generate_complete_resume_content_parallel(
-                job_description, 
-                years_exp, 
-                work_experience
-            )
+        # Non-AI fallback
+        professional_title = self._template_title(job_description)
+        professional_summary = self._template_summary(job_description, years_exp)
+        
+        detailed_experience = []
+        for idx, exp in enumerate(work_experience):
+            job_title = self._template_job_title(idx)
+            description = self._template_job_description(idx, exp.get('company', ''), job_description)
             
-            if ai_content:
-                # Successfully generated everything with parallel calls!
-                print(f"✅ SUCCESS: Generated resume using PARALLEL method!")
-                
-                # Build work experience from AI response
-                detailed_experience = []
-                for idx, ai_exp in enumerate(ai_content.get('work_experiences', [])):
-                    if idx < len(work_experience):
-                        detailed_experience.append({
-                            'title': ai_exp.get('job_title', ''),
-                            'company': work_experience[idx].get('company', ''),
-                            'location': work_experience[idx].get('location', ''),
-                            'start_date': work_experience[idx].get('start_date', ''),
-                            'end_date': work_experience[idx].get('end_date', ''),
-                            'description': ai_exp.get('description', '')
-                        })
-                
-                professional_title = ai_content.get('professional_title', '')
-                professional_summary = ai_content.get('professional_summary', '')
-            else:
-                # Fallback to sequential calls if parallel method fails
-                print(f"⚠️ Parallel method failed, using fallback (sequential API calls)...")
-                professional_title = self.generate_professional_title(job_description, years_exp)
-                professional_summary = self.generate_professional_summary(job_description, work_experience)
-                
-                # Generate detailed work experience
-                detailed_experience = []
-                for idx, exp in enumerate(work_experience):
-                    job_title = self.generate_job_title(
-                        idx, 
-                        job_description, 
-                        exp.get('company', ''),
-                        exp.get('start_date', ''),
-                        exp.get('end_date', '')
-                    )
-                    description = self.generate_job_description(
-                        idx, 
-                        exp.get('company', ''),
-                        job_description,
-                        exp.get('start_date', ''),
-                        exp.get('end_date', ''),
-                        job_title
-                    )
-                    
-                    detailed_experience.append({
-                        'title': job_title,
-                        'company': exp.get('company', ''),
-                        'location': exp.get('location', ''),
-                        'start_date': exp.get('start_date', ''),
-                        'end_date': exp.get('end_date', ''),
-                        'description': description
-                    })
+            detailed_experience.append({
+                'title': job_title,
+                'company': exp.get('company', ''),
+                'location': exp.get('location', ''),
+                'start_date': exp.get('start_date', ''),
+                'end_date': exp.get('end_date', ''),
+                'description': description
+            })
+        
+        return self._build_resume_data(user_data, job_description, professional_title, professional_summary,
+                                       suggested_skills, detailed_experience)
+    
+    async def agenerate_full_resume_data(self, user_data: Dict, job_description: str, fresh: bool = False,
+                                         emit: Callable[[str, Dict], None] = None, mode: str = None,
+                                         budget: float = None, draft_token: str = None) -> Dict:
+        """
+        generate_full_resume_data(), run as a task graph on the AI event loop
+        
+        Skills, title, summary, each position's title and description,
+        certifications and education are graph nodes that start as soon as
+        their inputs are ready, so the total time is that of the longest chain
+        (skills extraction + ranking) rather than the sum of the calls. The
+        graph's per-node timings are returned under 'generation_report'.
+        
+        The whole generation gets a latency budget. Sections still waiting on
+        the AI when it runs out, or whose calls the circuit breaker refused, are
+        written by the template generators instead and listed under
+        generation_report['degraded_sections']. While the
+        circuit breaker has DeepSeek cut off, the whole resume comes from the
+        templates right away (mode 'template').
+        
+        Pieces from a draft (see prepare_draft()) replace the JD compaction, the
+        skills extraction and, if made for the same years of experience, the
+        title call. A draft still being built is waited for (up to
+        DRAFT_WAIT_SECONDS) by those nodes only; the used pieces are listed
+        under generation_report['draft_sections'].
+        
+        Args:
+            emit: Optional event callback, emit(event, data). Completions are then
+                  streamed: 'title_delta', 'summary_delta' and 'job_delta' carry raw
+                  text fragments; 'skills', 'title', 'summary', 'job_title' and 'job'
+                  the finished sections (job events carry the position index).
+                  In batch mode only the finished sections are reported.
+            mode: 'fanout', 'batch', 'hybrid' or 'auto' (default: AI_GENERATION_MODE)
+            budget: Latency budget in seconds (default RESUME_LATENCY_BUDGET; 0 = none)
+            draft_token: Token from prepare_draft() (ignored with fresh, or for a different JD)
+        """
+        mode = mode or GENERATION_MODE
+        if mode != 'auto' and mode not in GENERATION_MODES:
+            raise ValueError(f"Unknown generation mode {mode!r}")
+        if not self.use_ai or not await asyncio.to_thread(self._ai_available):
+            resume_data = await asyncio.to_thread(self._template_resume_data, user_data, job_description)
+            if self.use_ai:
+                # DeepSeek is cut off by the circuit breaker: every section is template content
+                positions = range(len(resume_data['work_experience']))
+                resume_data['generation_report'] = {
+                    'mode': 'template',
+                    'degraded_sections': ['skills', 'title', 'summary'] +
+                                         [f'{part}_{idx}' for idx in positions
+                                          for part in ('job_title', 'job_description')],
+                }
+            if emit is not None:
+                emit('skills', {'skills': resume_data['skills']})
+                emit('title', {'text': resume_data['personal_info']['title']})
+                emit('summary', {'text': resume_data['professional_summary']})
+                for idx, exp in enumerate(resume_data['work_experience']):
+                    emit('job_title', {'index': idx, 'text': exp['title']})
+                    emit('job', {'index': idx, 'company': exp['company'], 'description': exp['description']})
+            return resume_data
+        
+        ai = self.ai_generator
+        usage = track_request_usage()
+        set_request_budget(RESUME_LATENCY_BUDGET if budget is None else budget)
+        work_experience = user_data.get('work_experience', [])
+        years_exp = self.calculate_years_experience(work_experience)
+        draft = None
+        if draft_token and not fresh:
+            draft = await asyncio.to_thread(self.drafts.get, draft_token, job_description)
+        draft_data = draft['data'] if draft and draft['status'] == READY else None
+        draft_used = []
+        # Prompts get the JD without boilerplate (once per request; it goes into every call).
+        # Skill ranking and certifications still read the full text locally.
+        compaction = (draft_data or {}).get('compaction')
+        if compaction:
+            draft_used.append('jd_compaction')
+        elif JD_COMPACTION_ENABLED:
+            compaction = await asyncio.to_thread(compact_jd, job_description)
+        prompt_jd = (compaction.pop('text') if compaction else None) or job_description
+        if compaction:
+            print(f"[AI] JD compacted: ~{compaction['original_tokens']} -> ~{compaction['compact_tokens']} tokens")
+        jobs, jd_length = len(work_experience), len(prompt_jd)
+        if mode == 'auto':
+            # Streaming clients should see text early, which batch mode can't offer
+            mode = self.strategy.choose(jobs, jd_length, modes=STREAMING_MODES if emit is not None else None)
+        waves = self.strategy.waves(mode, jobs)
+        # Every prompt starts with this, so the calls share a prefix DeepSeek can cache
+        context = ai.prompt_context(prompt_jd, years_exp, work_experience)
+        
+        def deltas(event, **fields):
+            if emit is None:
+                return None
+            return lambda text: emit(event, dict(fields, text=text))
+        
+        def announce(event, key='text', **fields):
+            if emit is None:
+                return None
+            return lambda value: emit(event, dict(fields, **{key: value}))
+        
+        # Calls refused by the circuit breaker go straight to the template fallbacks
+        graph = TaskGraph('resume', degrade_on=(CircuitOpenError,))
+        # Optionally send the shared prefix once before the fan-out (one call can't share it anyway)
+        warm = ()
+        if PREFIX_WARMUP and mode != 'batch':
+            graph.add('warm_prefix', lambda: ai.awarm_prefix(context), fallback=lambda: None)
+            warm = ('warm_prefix',)
+        # A draft still being built is waited for only by the nodes it can replace
+        draft_deps = ()
+        if draft and draft['status'] == PENDING:
+            graph.add('draft', lambda: asyncio.to_thread(self.drafts.wait, draft_token, job_description),
+                      fallback=lambda: None)
+            draft_deps = ('draft',)
+        
+        def from_draft(name, pick, call):
+            """Node function: the draft's piece if it has one, else the AI call"""
+            async def run(*results):
+                data = results[-1] if draft_deps else draft_data
+                value = pick(data) if data else None
+                if value:
+                    draft_used.append(name)
+                    return value
+                return await call()
+            return run
+        
+        graph.add('skills_raw',
+                  from_draft('skills', lambda data: data.get('skills'),
+                             lambda: ai.aextract_skills_from_jd(prompt_jd, fresh=fresh, context=context)),
+                  deps=warm + draft_deps, fallback=lambda: None)
+        
+        def rank_skills(raw):
+            if raw is None:
+                # No AI skill list: the fallback takes the skills found in the JD itself
+                raise ValueError('AI skill list unavailable')
+            return asyncio.to_thread(self.ats_matcher.rank_skills, raw + user_data.get('skills', []), job_description)
+        
+        # Add user's existing skills that might not be in JD, ordered by JD relevance (CPU work, off the loop)
+        graph.add('skills', rank_skills, deps=['skills_raw'],
+                  fallback=lambda: asyncio.to_thread(self.ats_matcher.get_relevant_skills, job_description),
+                  on_result=announce('skills', key='skills'))
+        
+        if mode == 'batch':
+            self._add_batch_sections(graph, prompt_jd, context, years_exp, work_experience, fresh, announce)
+        elif mode == 'hybrid':
+            self._add_batch_sections(graph, prompt_jd, context, years_exp, work_experience, fresh, announce,
+                                     descriptions=False, deps=warm)
+            self._add_description_nodes(graph, prompt_jd, context, work_experience, fresh, announce, deltas, warm)
         else:
-            # Non-AI fallback
-            professional_title = self.generate_professional_title(job_description, years_exp)
-            professional_summary = self.generate_professional_summary(job_description, work_experience)
-            
-            detailed_experience = []
-            for idx, exp in enumerate(work_experience):
-                job_title = self.generate_job_title(
-                    idx, 
-                    job_description, 
-                    exp.get('company', ''),
-                    exp.get('start_date', ''),
-                    exp.get('end_date', '')
-                )
-                description = self.generate_job_description(
-                    idx, 
-                    exp.get('company', ''),
-                    job_description,
-                    exp.get('start_date', ''),
-                    exp.get('end_date', ''),
-                    job_title
-                )
-                
-                detailed_experience.append({
-                    'title': job_title,
+            self._add_fanout_sections(graph, prompt_jd, context, years_exp, work_experience, fresh, announce,
+                                      deltas, warm, from_draft, draft_deps)
+        
+        graph.add('certifications', lambda: asyncio.to_thread(self.generate_certifications, job_description),
+                  fallback=list)
+        graph.add('education',
+                  lambda: asyncio.to_thread(self.generate_education_details, user_data.get('education', [])),
+                  fallback=lambda: user_data.get('education', []))
+        
+        results = await graph.run(timeout=request_time_left())
+        report = graph.report()
+        report.update(mode=mode, **usage)
+        report['degraded_sections'] = [name for name in report['degraded'] if name not in INTERNAL_NODES]
+        if report['degraded_sections']:
+            print(f"[WARN] AI out of time or unavailable, template content for: "
+                  f"{', '.join(report['degraded_sections'])}")
+        report['jd_tokens'] = compaction
+        report['prefix_warmup'] = bool(warm)
+        report['draft_sections'] = draft_used
+        if draft_used:
+            print(f"[DRAFT] Used precomputed {', '.join(draft_used)}")
+        if usage['streamed_calls']:
+            report['avg_first_token_ms'] = round(usage['first_token_ms'] / usage['streamed_calls'])
+        # Runs served from the cache or a draft, cut short by the budget, or with failed calls or
+        # fallback sections say nothing about the mode's real latency
+        fell_back = any(node['status'] in ('fallback', 'degraded') for node in report['nodes'].values())
+        if (usage['api_calls'] and not usage['cache_hits'] and not usage['failed_calls']
+                and not fell_back and not draft_used):
+            self.strategy.record(mode, jobs, jd_length, report['total_ms'] / 1000 / waves)
+        print(f"⚡ Task graph ({mode}) finished in {report['total_ms']:.0f}ms "
+              f"(critical path: {' -> '.join(report['critical_path'])})")
+        
+        ai_content = {
+            'work_experiences': [
+                {
+                    'job_title': results[f'job_title_{idx}'],
                     'company': exp.get('company', ''),
-                    'location': exp.get('location', ''),
-                    'start_date': exp.get('start_date', ''),
-                    'end_date': exp.get('end_date', ''),
-                    'description': description
+                    'description': results[f'job_description_{idx}']
+                }
+                for idx, exp in enumerate(work_experience)
+            ]
+        }
+        resume_data = self._build_resume_data(
+            user_data, job_description, results['title'], results['summary'], results['skills'],
+            self._experience_from_ai(work_experience, ai_content),
+            certifications=results['certifications'], education=results['education']
+        )
+        resume_data['generation_report'] = report
+        return resume_data
+    
+    def _add_fanout_sections(self, graph: TaskGraph, job_description: str, context: str, years_exp: int,
+                             work_experience: List[Dict], fresh: bool, announce, deltas, deps=(),
+                             from_draft=None, draft_deps=()):
+        """
+        One node (and API call) per section; deps (e.g. the prefix warm-up) gate every call
+        
+        from_draft(name, pick, call) wraps the title call so a draft's title is used
+        instead; draft_deps are the nodes it needs.
+        """
+        ai = self.ai_generator
+        title = lambda *_: ai.agenerate_professional_title(job_description, years_exp, fresh=fresh,
+                                                           on_delta=deltas('title_delta'), context=context)
+        if from_draft is not None:
+            title = from_draft('title', lambda data: data.get('titles', {}).get(context_key(context)), title)
+        graph.add('title', title, deps=tuple(deps) + tuple(draft_deps),
+                  fallback=lambda: self._template_title(job_description), on_result=announce('title'))
+        graph.add('summary',
+                  lambda *_: ai.agenerate_professional_summary(job_description, years_exp, work_experience,
+                                                               fresh=fresh, on_delta=deltas('summary_delta'),
+                                                               context=context),
+                  deps=deps, fallback=lambda: self._template_summary(job_description, years_exp),
+                  on_result=announce('summary'))
+        
+        for idx, exp in enumerate(work_experience):
+            company = exp.get('company', '')
+            graph.add(f'job_title_{idx}',
+                      lambda *_, idx=idx, company=company, exp=exp: ai.agenerate_job_title_for_position(
+                          job_description, company, idx, years_at_position(exp), fresh=fresh, context=context),
+                      deps=deps, fallback=lambda idx=idx: self._template_job_title(idx),
+                      on_result=announce('job_title', index=idx))
+        self._add_description_nodes(graph, job_description, context, work_experience, fresh, announce, deltas, deps)
+    
+    def _add_description_nodes(self, graph: TaskGraph, job_description: str, context: str,
+                               work_experience: List[Dict], fresh: bool, announce, deltas, deps=()):
+        """One job description call per position"""
+        for idx, exp in enumerate(work_experience):
+            company = exp.get('company', '')
+            # Written for the position's level rather than its title, so it doesn't wait for job_title
+            graph.add(f'job_description_{idx}',
+                      lambda *_, idx=idx, company=company, exp=exp: self.ai_generator.agenerate_job_description(
+                          job_description, company, None, exp.get('start_date', ''), exp.get('end_date', ''),
+                          idx, fresh=fresh, on_delta=deltas('job_delta', index=idx), context=context),
+                      deps=deps,
+                      fallback=lambda idx=idx, company=company: self._template_job_description(idx, company,
+                                                                                               job_description),
+                      on_result=announce('job', key='description', index=idx, company=company))
+    
+    def _add_batch_sections(self, graph: TaskGraph, job_description: str, context: str, years_exp: int,
+                            work_experience: List[Dict], fresh: bool, announce, descriptions: bool = True,
+                            deps=()):
+        """
+        One JSON call for every section; the section nodes just pick their part of it
+        
+        With descriptions=False (hybrid mode) the call covers only the short
+        sections, and the job description nodes must be added separately.
+        """
+        graph.add('sections',
+                  lambda *_: self.ai_generator.agenerate_complete_resume_content(
+                      job_description, years_exp, work_experience, fresh=fresh, descriptions=descriptions,
+                      context=context),
+                  deps=deps, fallback=lambda: None)
+        # Without the batch result (out of time) each section falls back to its template
+        graph.add('title', lambda content: content['professional_title'], deps=['sections'],
+                  fallback=lambda: self._template_title(job_description), on_result=announce('title'))
+        graph.add('summary', lambda content: content['professional_summary'], deps=['sections'],
+                  fallback=lambda: self._template_summary(job_description, years_exp),
+                  on_result=announce('summary'))
+        for idx, exp in enumerate(work_experience):
+            company = exp.get('company', '')
+            graph.add(f'job_title_{idx}', lambda content, idx=idx: content['work_experiences'][idx]['job_title'],
+                      deps=['sections'], fallback=lambda idx=idx: self._template_job_title(idx),
+                      on_result=announce('job_title', index=idx))
+            if descriptions:
+                graph.add(f'job_description_{idx}',
+                          lambda content, idx=idx: content['work_experiences'][idx]['description'],
+                          deps=['sections'],
+                          fallback=lambda idx=idx, company=company: self._template_job_description(
+                              idx, company, job_description),
+                          on_result=announce('job', key='description', index=idx, company=company))
+    
+    def _experience_from_ai(self, work_experience: List[Dict], ai_content: Dict) -> List[Dict]:
+        """Merge AI-written titles and descriptions into the user's positions"""
+        detailed_experience = []
+        for idx, ai_exp in enumerate(ai_content.get('work_experiences', [])):
+            if idx < len(work_experience):
+                detailed_experience.append({
+                    'title': ai_exp.get('job_title', ''),
+                    'company': work_experience[idx].get('company', ''),
+                    'location': work_experience[idx].get('location', ''),
+                    'start_date': work_experience[idx].get('start_date', ''),
+                    'end_date': work_experience[idx].get('end_date', ''),
+                    'description': ai_exp.get('description', '')
                 })
-        
+        return detailed_experience
+    
+    def _build_resume_data(self, user_data: Dict, job_description: str, professional_title: str,
+                           professional_summary: str, suggested_skills: List[str],
+                           detailed_experience: List[Dict], certifications: List[Dict] = None,
+                           education: List[Dict] = None) -> Dict:
+        """Assemble the final resume data from the generated sections"""
         # Generate certifications
-        certifications = self.generate_certifications(job_description)
+        if certifications is None:
+            certifications = self.generate_certifications(job_description)
         
         # Enhance education
-        education = self.generate_education_details(user_data.get('education', []))
+        if education is None:
+            education = self.generate_education_details(user_data.get('education', []))
         
         # Default languages
         languages = user_data.get('languages', ['English (Professional)'])
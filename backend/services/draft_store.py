@@ -0,0 +1,143 @@
+"""
+Resume Drafts
+Short-lived results of work that only needs the job description (compacted JD, skills,
+title), started by /api/analyze-job while the user is still filling in the form and
+picked up by the resume generation. SQLite, so any worker can read any worker's draft.
+"""
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DRAFT_DB_PATH = os.getenv('DRAFT_DB_PATH', 'data/drafts.db')
+
+# Seconds a draft can be used after it was started (time to fill in the rest of the form)
+DRAFT_TTL = int(os.getenv('DRAFT_TTL', 1800))
+
+# Seconds a generation waits for a draft that is still being built before doing the work itself
+DRAFT_WAIT_SECONDS = float(os.getenv('DRAFT_WAIT_SECONDS', 8))
+
+# How often a waiting generation looks at the draft again
+DRAFT_POLL_INTERVAL = 0.2
+
+PENDING, READY, FAILED = 'pending', 'ready', 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    token TEXT PRIMARY KEY,
+    jd_hash TEXT NOT NULL,
+    variant TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    data TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drafts_created ON drafts (created);
+CREATE INDEX IF NOT EXISTS drafts_jd ON drafts (jd_hash, variant);
+"""
+
+
+def jd_hash(job_description: str) -> str:
+    """Fingerprint of a job description; a draft is only used for the JD it was made from"""
+    return hashlib.sha256((job_description or '').strip().encode('utf-8')).hexdigest()
+
+
+def context_key(context: str) -> str:
+    """Key of a draft title: the prompt context (JD, years and work history) it was written for"""
+    return hashlib.sha256(context.encode('utf-8')).hexdigest()[:16]
+
+
+class DraftStore:
+    """
+    Draft tokens and the precomputed pieces stored under them
+
+    A draft is created 'pending', then saved 'ready' with its data (or
+    'failed'). Lookups give the token's job description, so a draft made for
+    a JD the user has since edited is never used. Expired drafts are deleted
+    when new ones are created.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None):
+        self.path = path or DRAFT_DB_PATH
+        self.ttl_seconds = ttl_seconds or DRAFT_TTL
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def create(self, job_description: str, variant: str = '') -> str:
+        """Start a pending draft for a JD and return its token (variant: what else it was made from)"""
+        token = secrets.token_urlsafe(18)
+        conn = self._connection()
+        now = time.time()
+        conn.execute('DELETE FROM drafts WHERE created < ?', (now - self.ttl_seconds,))
+        conn.execute('INSERT INTO drafts (token, jd_hash, variant, status, created) VALUES (?, ?, ?, ?, ?)',
+                     (token, jd_hash(job_description), variant, PENDING, now))
+        return token
+
+    def find(self, job_description: str, variant: str = '') -> Optional[str]:
+        """Token of a live pending or ready draft for the same JD and variant, if there is one"""
+        row = self._connection().execute(
+            'SELECT token FROM drafts WHERE jd_hash = ? AND variant = ? AND status IN (?, ?) AND created >= ? '
+            'ORDER BY created DESC LIMIT 1',
+            (jd_hash(job_description), variant, PENDING, READY, time.time() - self.ttl_seconds)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, token: str, data: Optional[Dict[str, Any]], status: str = READY):
+        """Store a draft's pieces (status FAILED: nothing usable, don't wait for it)"""
+        self._connection().execute('UPDATE drafts SET status = ?, data = ? WHERE token = ?',
+                                   (status, json.dumps(data) if data is not None else None, token))
+
+    def get(self, token: str, job_description: str) -> Optional[Dict[str, Any]]:
+        """
+        Look a draft up
+
+        Returns:
+            Dict with 'status' and, when ready, 'data'; None if the token is
+            unknown, expired or was made for a different JD
+        """
+        if not token:
+            return None
+        row = self._connection().execute(
+            'SELECT jd_hash, status, data, created FROM drafts WHERE token = ?', (token,)
+        ).fetchone()
+        if row is None or row[0] != jd_hash(job_description) or time.time() - row[3] > self.ttl_seconds:
+            return None
+        return {'status': row[1], 'data': json.loads(row[2]) if row[2] else None}
+
+    def wait(self, token: str, job_description: str, timeout: float = None) -> Optional[Dict[str, Any]]:
+        """Block until a pending draft is ready (up to timeout seconds); its data, or None"""
+        deadline = time.monotonic() + (DRAFT_WAIT_SECONDS if timeout is None else timeout)
+        while True:
+            draft = self.get(token, job_description)
+            if draft is None or draft['status'] == FAILED:
+                return None
+            if draft['status'] == READY:
+                return draft['data']
+            if time.monotonic() >= deadline:
+                print("[DRAFT] Draft still being built, generating without it")
+                return None
+            time.sleep(DRAFT_POLL_INTERVAL)
+
+    def stats(self) -> Dict[str, Any]:
+        """Live drafts per status"""
+        try:
+            counts = dict(self._connection().execute(
+                'SELECT status, COUNT(*) FROM drafts WHERE created >= ? GROUP BY status',
+                (time.time() - self.ttl_seconds,)
+            ).fetchall())
+        except sqlite3.Error as e:
+            return {'error': str(e)}
+        return {status: counts.get(status, 0) for status in (PENDING, READY, FAILED)}
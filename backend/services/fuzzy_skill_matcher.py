@@ -0,0 +1,176 @@
+"""
+Fuzzy Skill Matching with hashed character n-gram vectors
+Maps spelling variants found in a JD (e.g. 'Kubernetess', 'Mongo DB') to canonical skills
+"""
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+NGRAM_SIZE = 3
+HASH_DIM = 1024
+
+# Cosine similarity required before a candidate is accepted as a skill
+DEFAULT_THRESHOLD = float(os.getenv('FUZZY_MATCH_THRESHOLD', 0.75))
+
+# Plain lowercase words are usually English, not misspelled product names
+LOWERCASE_THRESHOLD = 0.85
+
+# Nearest spellings checked per candidate, and the shorter/longer length ratio they
+# must reach (trigram cosine alone lets 'testing' match 'A/B Testing')
+TOP_K = 3
+MIN_LENGTH_RATIO = 0.85
+
+# Trigram similarity is meaningless for very short names (C, R, Go, AWS)
+MIN_TERM_LENGTH = 5
+
+# Cap on candidates per JD so huge pastes stay cheap
+MAX_CANDIDATES = 4000
+
+# Candidates vectorized per matrix product (bounds the temporary matrices)
+MATCH_BATCH_SIZE = 512
+
+TOKEN = re.compile(r'[A-Za-z][A-Za-z0-9+#.\-]*[A-Za-z0-9+#]|[A-Za-z]')
+
+# Frequent JD words that would otherwise be scored against the vocabulary
+COMMON_WORDS = frozenset('''
+    about above across after ability able access achieve across actively additional also
+    analysis analytical application applications apply architect architecture around based
+    benefits build building business candidate candidates career challenges change clients
+    closely collaborate collaboration company competitive complex contribute create culture
+    customer customers daily data deliver delivering design designing develop developer developers
+    developing development environment equal excellent experience expertise familiarity features
+    first great growth having helping highly ideal implement improve including industry
+    innovative join knowledge large learning looking maintain management manager member
+    modern multiple new opportunities opportunity other people performance plus position
+    preferred process processes product products professional proficiency project projects
+    quality related required requirements responsibilities responsible role salary scalable
+    senior services skills software solutions solving strong success support systems team
+    teams technical technologies technology their these things tools understanding using
+    various we'll where which within work working world would years
+'''.split())
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase and drop separators so 'Node.js', 'NodeJS' and 'node js' line up"""
+    return re.sub(r'[^a-z0-9+#]', '', term.lower())
+
+
+def _ngram_buckets(normalized: str, dim: int) -> List[int]:
+    """Hash the padded character n-grams of a normalized term into vector columns"""
+    padded = f'^{normalized}$'
+    return [zlib.crc32(padded[i:i + NGRAM_SIZE].encode('utf-8')) % dim
+            for i in range(max(1, len(padded) - NGRAM_SIZE + 1))]
+
+
+class FuzzySkillMatcher:
+    """Nearest-canonical-skill lookup over a fixed-width n-gram hashing matrix"""
+
+    def __init__(self, surface_forms: Dict[str, int], dim: int = HASH_DIM,
+                 threshold: float = DEFAULT_THRESHOLD):
+        """
+        Args:
+            surface_forms: Lowercase skill spelling -> canonical skill ID
+            dim: Width of the hashed n-gram vectors
+            threshold: Minimum cosine similarity for a match
+        """
+        self.dim = dim
+        self.threshold = threshold
+        # Exact spellings are found by the keyword automaton; separator-insensitive
+        # ones ('Mongo DB' -> 'mongodb') are resolved here without a vector search
+        self._surface_forms = set(surface_forms)
+        self._normalized_ids = {normalize_term(form): skill_id for form, skill_id in surface_forms.items()}
+
+        forms = [(norm, skill_id) for norm, skill_id in self._normalized_ids.items()
+                 if len(norm) >= MIN_TERM_LENGTH]
+        self._skill_ids = np.array([skill_id for _, skill_id in forms], dtype=np.int64)
+        self._lengths = np.array([len(norm) for norm, _ in forms], dtype=np.float32)
+        self._matrix = self._vectorize([norm for norm, _ in forms])
+
+    def _vectorize(self, normalized_terms: List[str]) -> np.ndarray:
+        """Build the L2-normalized n-gram count matrix for normalized terms"""
+        rows, cols = [], []
+        for row, term in enumerate(normalized_terms):
+            buckets = _ngram_buckets(term, self.dim)
+            rows.extend([row] * len(buckets))
+            cols.extend(buckets)
+
+        matrix = np.zeros((len(normalized_terms), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def match(self, candidates: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        """
+        Map candidate terms to their nearest canonical skill
+
+        Args:
+            candidates: Tokens/phrases taken from a job description
+
+        Returns:
+            {candidate: (skill_id, confidence)} for candidates above the threshold
+        """
+        matches = {}
+        pending = {}
+        for candidate in candidates:
+            normalized = normalize_term(candidate)
+            if (len(normalized) < MIN_TERM_LENGTH or candidate in matches or candidate in pending
+                    or candidate.lower() in COMMON_WORDS or candidate.lower() in self._surface_forms):
+                continue
+            skill_id = self._normalized_ids.get(normalized)
+            if skill_id is not None:
+                matches[candidate] = (skill_id, 1.0)
+                continue
+            pending[candidate] = normalized
+            if len(pending) >= MAX_CANDIDATES:
+                break
+
+        if not pending or not len(self._skill_ids):
+            return matches
+
+        terms = list(pending.items())
+        for offset in range(0, len(terms), MATCH_BATCH_SIZE):
+            matches.update(self._nearest(terms[offset:offset + MATCH_BATCH_SIZE]))
+        return matches
+
+    def _nearest(self, terms: List[Tuple[str, str]]) -> Dict[str, Tuple[int, float]]:
+        """Vector search for (candidate, normalized) pairs"""
+        # One matrix product scores every candidate against every skill spelling
+        similarity = self._vectorize([normalized for _, normalized in terms]) @ self._matrix.T
+        k = min(TOP_K, similarity.shape[1])
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+
+        # Discard neighbours of very different length, then keep the best survivor
+        candidate_lengths = np.array([len(normalized) for _, normalized in terms], dtype=np.float32)[:, None]
+        top_lengths = self._lengths[top]
+        length_ratio = np.minimum(candidate_lengths, top_lengths) / np.maximum(candidate_lengths, top_lengths)
+        thresholds = np.array([max(self.threshold, LOWERCASE_THRESHOLD) if candidate.isalpha() and candidate.islower()
+                               else self.threshold for candidate, _ in terms], dtype=np.float32)[:, None]
+        top_scores = np.where((length_ratio >= MIN_LENGTH_RATIO) & (top_scores >= thresholds), top_scores, 0.0)
+        best = top_scores.argmax(axis=1)
+
+        matches = {}
+        for row, (candidate, _) in enumerate(terms):
+            score = top_scores[row, best[row]]
+            if score > 0:
+                matches[candidate] = (int(self._skill_ids[top[row, best[row]]]), round(float(score), 3))
+        return matches
+
+    @staticmethod
+    def candidates(text: str) -> Iterable[Tuple[str, int]]:
+        """
+        Yield (candidate, offset) pairs: single tokens and adjacent capitalized token pairs
+
+        Pairs catch split spellings such as 'Mongo DB' or 'Spring-Boot'.
+        """
+        previous = None
+        for match in TOKEN.finditer(text):
+            token = match.group()
+            yield token, match.start()
+            if (previous is not None and token[0].isupper() and previous.group()[0].isupper()
+                    and text[previous.end():match.start()] in (' ', '-')):
+                yield text[previous.start():match.end()], previous.start()
+            previous = match
@@ -0,0 +1,132 @@
+"""
+Request Hedging
+Latency percentiles per call shape, used to time hedge requests and call deadlines,
+plus a budget that keeps hedges to a small share of traffic
+"""
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional
+
+# Hedges may add at most this share of calls (unused allowance carries over, up to HEDGE_BURST hedges)
+AI_HEDGE_BUDGET = float(os.getenv('AI_HEDGE_BUDGET', 0.05))
+HEDGE_BURST = 3.0
+
+# A call with no answer by this percentile of its shape's time to first answer gets a hedge
+HEDGE_PERCENTILE = float(os.getenv('AI_HEDGE_PERCENTILE', 95))
+MIN_HEDGE_DELAY = 0.5
+
+# Deadline: DEADLINE_FACTOR x p99 of the shape's total time, within [MIN_CALL_DEADLINE, AI_CALL_TIMEOUT]
+AI_CALL_TIMEOUT = float(os.getenv('AI_CALL_TIMEOUT', 120))
+DEADLINE_FACTOR = 2.0
+MIN_CALL_DEADLINE = 10.0
+
+# Samples kept per shape, and needed before percentiles are trusted
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class Hedger:
+    """
+    Rolling latencies per call shape and the hedge budget of one worker process
+
+    A shape is whatever key the caller uses to group comparable calls (e.g.
+    streaming or not, and the completion token limit). Two latencies are
+    kept per shape: time to the first answer (first streamed text, or the
+    whole response) decides when to hedge; total time decides the deadline.
+    Until a shape has MIN_SAMPLES it is never hedged and gets AI_CALL_TIMEOUT.
+    """
+
+    def __init__(self, budget: float = None, timeout: float = None):
+        self.budget = AI_HEDGE_BUDGET if budget is None else budget
+        self.timeout = timeout or AI_CALL_TIMEOUT
+        self._first: Dict[Hashable, Deque[float]] = {}
+        self._total: Dict[Hashable, Deque[float]] = {}
+        self._allowance = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.denied = 0
+        self.timeouts = 0
+
+    def _samples(self, table: Dict[Hashable, Deque[float]], key: Hashable) -> Deque[float]:
+        samples = table.get(key)
+        if samples is None:
+            samples = table[key] = deque(maxlen=LATENCY_WINDOW)
+        return samples
+
+    def record(self, key: Hashable, first_seconds: float, total_seconds: float = None):
+        """
+        Record a call's latencies
+
+        Args:
+            key: Call shape
+            first_seconds: Time to the first answer
+            total_seconds: Time to the complete answer (None: record only the first)
+        """
+        with self._lock:
+            self._samples(self._first, key).append(first_seconds)
+            if total_seconds is not None:
+                self._samples(self._total, key).append(total_seconds)
+
+    def hedge_delay(self, key: Hashable) -> Optional[float]:
+        """Seconds without an answer after which a call gets a hedge, or None if too few samples"""
+        with self._lock:
+            samples = list(self._first.get(key, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return max(MIN_HEDGE_DELAY, percentile(samples, HEDGE_PERCENTILE))
+
+    def deadline(self, key: Hashable) -> float:
+        """Seconds a call (hedges included) may take before it is abandoned"""
+        with self._lock:
+            samples = list(self._total.get(key, ()))
+        if len(samples) < MIN_SAMPLES:
+            return self.timeout
+        return min(self.timeout, max(MIN_CALL_DEADLINE, DEADLINE_FACTOR * percentile(samples, 99)))
+
+    def start_call(self):
+        """Count a primary call; each one earns `budget` of a hedge"""
+        with self._lock:
+            self.calls += 1
+            self._allowance = min(HEDGE_BURST, self._allowance + self.budget)
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge from the budget; False if it is used up"""
+        with self._lock:
+            if self._allowance >= 1:
+                self._allowance -= 1
+                self.hedges += 1
+                return True
+            self.denied += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedge counts and per-shape latency percentiles (seconds)"""
+        with self._lock:
+            shapes = {
+                str(key): {
+                    'samples': len(samples),
+                    'p50': round(percentile(list(samples), 50), 2),
+                    'p95': round(percentile(list(samples), 95), 2),
+                    'p99': round(percentile(list(samples), 99), 2),
+                }
+                for key, samples in self._total.items() if samples
+            }
+            return {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'hedges_denied': self.denied,
+                'timeouts': self.timeouts,
+                'budget': self.budget,
+                'latency': shapes,
+            }
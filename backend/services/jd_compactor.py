@@ -0,0 +1,126 @@
+"""
+Job Description Compactor
+Shrinks a JD before it is pasted into AI prompts: drops boilerplate sections,
+page navigation and repeated lines, and can trim to a token budget
+"""
+import os
+import re
+from typing import Any, Dict, List
+
+from services.jd_sections import TITLE, REQUIREMENTS, BOILERPLATE, split_sections
+
+JD_COMPACTION_ENABLED = os.getenv('JD_COMPACTION', 'true').lower() == 'true'
+
+# Token budget for the compacted JD (0 = no trimming beyond boilerplate removal)
+JD_PROMPT_TOKEN_BUDGET = int(os.getenv('JD_PROMPT_TOKEN_BUDGET', 1500))
+
+# Rough size of a token in English text; good enough for budgeting and reporting
+CHARS_PER_TOKEN = 4
+
+# Lines copied along with a posting from job boards
+NAVIGATION_LINE = re.compile(
+    r'^(apply( now| for this job)?|easy apply|share( this job)?|save( this)?( job)?|'
+    r'back to (jobs|search|results)|sign in|log ?in|report (this )?job|view all jobs|similar jobs|'
+    r'show (more|less)|see more|read more|(posted|reposted)? ?\d+\+? (minutes?|hours?|days?|weeks?) ago|'
+    r'\d+ applicants?|promoted|actively recruiting|skip to (main )?content)$',
+    re.IGNORECASE
+)
+
+INLINE_SPACE = re.compile(r'[ \t ]+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clean_lines(text: str) -> List[str]:
+    """Collapse inline whitespace and drop navigation lines and lines without any letters or digits"""
+    lines = []
+    for line in text.splitlines():
+        line = INLINE_SPACE.sub(' ', line).strip()
+        if line and (NAVIGATION_LINE.match(line) or not any(ch.isalnum() for ch in line)):
+            continue
+        lines.append(line)
+    return lines
+
+
+def compact_jd(text: str, token_budget: int = None) -> Dict[str, Any]:
+    """
+    Compact a job description for use in prompts
+
+    Boilerplate sections (benefits, EEO, salary, about us...) are dropped,
+    repeated lines are kept once and blank runs collapse to one line. If the
+    result is still over token_budget, the title and requirement sections are
+    kept first and the rest of the body fills what is left, in original order.
+
+    Args:
+        text: Raw job description
+        token_budget: Token budget (default JD_PROMPT_TOKEN_BUDGET; 0 disables trimming)
+
+    Returns:
+        Dict with the compacted 'text' plus 'original_tokens', 'compact_tokens',
+        'boilerplate_lines', 'duplicate_lines' and 'trimmed_lines'
+    """
+    token_budget = JD_PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    cleaned = '\n'.join(_clean_lines(text))
+
+    kept = []  # (section, line)
+    seen = set()
+    boilerplate = duplicates = 0
+    for start, end, section in split_sections(cleaned):
+        line = cleaned[start:end].strip()
+        if section == BOILERPLATE:
+            boilerplate += 1 if line else 0
+            continue
+        if not line:
+            if kept and kept[-1][1]:
+                kept.append((section, ''))
+            continue
+        key = line.lower()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        kept.append((section, line))
+
+    trimmed = 0
+    if token_budget and estimate_tokens('\n'.join(line for _, line in kept)) > token_budget:
+        kept, trimmed = _fit_budget(kept, token_budget)
+
+    compact = '\n'.join(line for _, line in kept).strip()
+    return {
+        'text': compact,
+        'original_tokens': estimate_tokens(text),
+        'compact_tokens': estimate_tokens(compact),
+        'boilerplate_lines': boilerplate,
+        'duplicate_lines': duplicates,
+        'trimmed_lines': trimmed,
+    }
+
+
+def _fit_budget(lines: List[tuple], token_budget: int):
+    """Keep title/requirement lines first, then body lines, within the budget (original order kept)"""
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    keep = set()
+    used = 0
+    for priority in ((TITLE, REQUIREMENTS), None):
+        for index, (section, line) in enumerate(lines):
+            if index in keep or not line:
+                continue
+            if priority is not None and section not in priority:
+                continue
+            if used + len(line) + 1 > budget_chars:
+                continue
+            keep.add(index)
+            used += len(line) + 1
+
+    result, trimmed = [], 0
+    for index, (section, line) in enumerate(lines):
+        if index in keep:
+            result.append((section, line))
+        elif line:
+            trimmed += 1
+        elif result and result[-1][1]:
+            result.append((section, ''))
+    return result, trimmed
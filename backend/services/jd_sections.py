@@ -0,0 +1,97 @@
+"""
+Job Description Section Detection
+Classifies JD lines as title, requirements, regular body or boilerplate
+"""
+import re
+from typing import List, Optional, Tuple
+
+TITLE = 'title'
+REQUIREMENTS = 'requirements'
+BODY = 'body'
+BOILERPLATE = 'boilerplate'
+
+# Headings that introduce the high-signal part of a posting
+REQUIREMENTS_HEADING = re.compile(
+    r'(requirement|qualification|responsibilit|must[- ]have|nice[- ]to[- ]have|preferred|'
+    r'skills|tech(nology|nical)? stack|what you.{0,10}(do|bring|need|have)|'
+    r'who you are|your role|the role|key duties|experience)',
+    re.IGNORECASE
+)
+
+# Headings that introduce sections with no skill signal
+BOILERPLATE_HEADING = re.compile(
+    r'(benefit|perks|about (us|the company|the team)|who we are|equal (employment )?opportunit|'
+    r'\beeo\b|diversity|salary|compensation|pay range|how to apply|application process|'
+    r'why (join|work)|what we offer|we offer|privacy|disclaimer|recruit(ment|ing) process)',
+    re.IGNORECASE
+)
+
+MAX_HEADING_LENGTH = 60
+MAX_HEADING_WORDS = 5
+BULLET_CHARS = '-*\u2022\u00b7\u25aa\u2013'
+
+
+def classify_heading(line: str) -> Optional[str]:
+    """
+    Classify a line if it looks like a section heading
+
+    Returns:
+        REQUIREMENTS, BOILERPLATE or None if the line is not a heading
+    """
+    raw = line.strip()
+    if not raw or (raw[0] in BULLET_CHARS and raw[1:2].isspace()):
+        return None
+    stripped = raw.strip('#*=:_ ').strip()
+    if not stripped or len(stripped) > MAX_HEADING_LENGTH:
+        return None
+    # Headings are short labels; longer lines only count when they end with ':'
+    if len(stripped.split()) > MAX_HEADING_WORDS and not raw.endswith(':'):
+        return None
+    if BOILERPLATE_HEADING.search(stripped):
+        return BOILERPLATE
+    if REQUIREMENTS_HEADING.search(stripped):
+        return REQUIREMENTS
+    return None
+
+
+class SectionTracker:
+    """Tracks the current JD section while lines are fed in order"""
+
+    def __init__(self):
+        self.section = None
+
+    def section_for(self, line: str) -> str:
+        """Return the section a line belongs to, updating the tracker state"""
+        if not line.strip():
+            return self.section or BODY
+
+        heading = classify_heading(line)
+        if heading:
+            self.section = heading
+            return heading
+
+        if self.section is None:
+            # The first non-empty line of a posting is (almost always) the title
+            self.section = BODY
+            return TITLE
+        return self.section
+
+
+def split_sections(text: str, tracker: Optional[SectionTracker] = None) -> List[Tuple[int, int, str]]:
+    """
+    Split text into line spans labelled with their section
+
+    Args:
+        text: JD text
+        tracker: Tracker to continue from when text is one block of a longer JD
+
+    Returns:
+        List of (start_offset, end_offset, section) covering the whole text
+    """
+    tracker = tracker or SectionTracker()
+    spans = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        spans.append((offset, offset + len(line), tracker.section_for(line)))
+        offset += len(line)
+    return spans
@@ -0,0 +1,115 @@
+"""
+Streaming Job Description Reader
+Reassembles a chunked JD (e.g. a streamed request body) into normalized blocks of whole lines
+"""
+import codecs
+import hashlib
+import os
+from typing import Iterable, Iterator, List, Union
+
+# Input beyond this many bytes is ignored and the analysis is marked truncated
+STREAM_MAX_BYTES = int(os.getenv('JD_STREAM_MAX_BYTES', 4 * 1024 * 1024))
+
+# Approximate size of the text blocks handed to the analyzer
+STREAM_BLOCK_CHARS = 64 * 1024
+
+# Lines longer than this (minified HTML, pasted tables) are split at whitespace
+MAX_LINE_CHARS = 16 * 1024
+
+
+class JDStreamReader:
+    """
+    Reads JD chunks and yields blocks of normalized lines
+
+    Every analysis pattern is confined to one line, so holding back the
+    partial last line of a chunk until the next chunk arrives is enough to
+    catch matches that straddle chunk boundaries. Only that partial line
+    and the current block are held in memory.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], max_bytes: int = None,
+                 block_chars: int = STREAM_BLOCK_CHARS):
+        self.chunks = chunks
+        self.max_bytes = max_bytes or STREAM_MAX_BYTES
+        self.block_chars = block_chars
+        self.bytes_read = 0
+        self.truncated = False
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        # Hash of the normalized text; matches jd_cache_key(normalize_jd(full_text))
+        self._digest = hashlib.sha256()
+        self._lines_emitted = 0
+
+    @property
+    def digest(self) -> str:
+        return self._digest.hexdigest()
+
+    def _decode(self, chunk: Union[bytes, str], final: bool = False) -> str:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        remaining = self.max_bytes - self.bytes_read
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self.truncated = True
+        self.bytes_read += len(chunk)
+        return self._decoder.decode(chunk, final=final or self.truncated)
+
+    def _normalized(self, line: str) -> str:
+        """Normalize one line (see normalize_jd) and feed it to the running hash"""
+        line = ' '.join(line.split())
+        if line:
+            if self._lines_emitted:
+                self._digest.update(b'\n')
+            self._digest.update(line.encode('utf-8'))
+            self._lines_emitted += 1
+        return line
+
+    def blocks(self) -> Iterator[str]:
+        """Yield normalized text blocks made of whole lines"""
+        carry = ''
+        block: List[str] = []
+        block_size = 0
+
+        for chunk in self.chunks:
+            if self.truncated:
+                break
+            lines = (carry + self._decode(chunk)).splitlines(keepends=True)
+            carry = ''
+            if lines and not lines[-1].endswith(('\n', '\r')):
+                carry = lines.pop()
+
+            # Break runaway lines at whitespace so the carry stays bounded
+            if len(carry) > MAX_LINE_CHARS:
+                pos = 0
+                while len(carry) - pos > MAX_LINE_CHARS:
+                    cut = carry.rfind(' ', pos, pos + MAX_LINE_CHARS)
+                    cut = cut if cut > pos else pos + MAX_LINE_CHARS
+                    lines.append(carry[pos:cut])
+                    pos = cut
+                carry = carry[pos:]
+
+            for line in lines:
+                line = self._normalized(line)
+                if line:
+                    block.append(line)
+                    block_size += len(line) + 1
+                    if block_size >= self.block_chars:
+                        yield '\n'.join(block)
+                        block, block_size = [], 0
+
+        if self.truncated:
+            # The last partial line may be cut mid-word; drop it
+            carry = ''
+        else:
+            carry += self._decoder.decode(b'', final=True)
+        for line in carry.splitlines():
+            line = self._normalized(line)
+            if line:
+                block.append(line)
+        if block:
+            yield '\n'.join(block)
+
+
+def iter_string_chunks(text: str, chunk_chars: int = STREAM_BLOCK_CHARS) -> Iterator[str]:
+    """Slice an in-memory JD into chunks for JDStreamReader"""
+    for start in range(0, len(text), chunk_chars):
+        yield text[start:start + chunk_chars]
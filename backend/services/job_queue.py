@@ -0,0 +1,289 @@
+"""
+Resume Job Queue
+Durable SQLite queue of resume generations. The API enqueues jobs and answers status
+requests; separate worker processes claim and run them. Jobs survive restarts of both.
+"""
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+JOB_QUEUE_DB_PATH = os.getenv('JOB_QUEUE_DB_PATH', 'data/job_queue.db')
+
+# A running job whose worker has not checked in for this long is handed to another worker
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', 60))
+
+# Claims per job before it is failed (a job that keeps killing its worker stops here)
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+# Finished jobs (and their events) are kept this long for status requests, like the PDF links
+JOB_TTL = int(os.getenv('JOB_TTL', os.getenv('PDF_DOWNLOAD_TTL', 3600)))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq);
+"""
+
+
+def worker_name(suffix: Any = None) -> str:
+    """Identifier of a worker (thread) for job leases: host, process and suffix"""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{suffix}" if suffix is not None else name
+
+
+class JobQueue:
+    """
+    Resume generation jobs in SQLite, shared by the API and worker processes
+
+    A worker claims the oldest queued job and holds a lease on it, renewed by
+    heartbeat(). If the worker dies, the lease runs out and the job is queued
+    again (up to JOB_MAX_ATTEMPTS claims). Updates from a worker that no longer
+    holds the lease (the job was cancelled or handed to another worker) are
+    ignored. Section events recorded while a job runs can be read back by
+    sequence number, so status subscribers can follow along.
+    """
+
+    def __init__(self, path: str = None, lease_seconds: float = None, max_attempts: int = None,
+                 on_failed: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Args:
+            path: SQLite file (default JOB_QUEUE_DB_PATH)
+            lease_seconds: Lease length (default JOB_LEASE_SECONDS)
+            max_attempts: Claims per job (default JOB_MAX_ATTEMPTS)
+            on_failed: on_failed(payload) is called, in whichever process ended it, for each
+                job that was failed or cancelled (e.g. to give back what it reserved)
+        """
+        self.path = path or JOB_QUEUE_DB_PATH
+        self.lease_seconds = lease_seconds or JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or JOB_MAX_ATTEMPTS
+        self.on_failed = on_failed
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection, float], Any]) -> Any:
+        """Run fn(conn, now) in a write transaction, then report the jobs it failed or cancelled"""
+        conn = self._connection()
+        failed = self._local.failed = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn, time.time())
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        for job_id, payload in failed:
+            try:
+                self.on_failed(payload)
+            except Exception as e:
+                print(f"[WARN] on_failed for job {job_id} failed: {e}")
+        return result
+
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        """Queue a job and return its id (also removes expired finished jobs)"""
+        job_id = secrets.token_urlsafe(18)
+
+        def insert(conn, now):
+            self._cleanup(conn, now)
+            conn.execute('INSERT INTO jobs (id, status, payload, created) VALUES (?, ?, ?, ?)',
+                         (job_id, QUEUED, json.dumps(payload), now))
+
+        self._transaction(insert)
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest runnable job to a worker
+
+        Runnable: queued, or running under a lease that has run out. Jobs out
+        of attempts are failed instead of claimed.
+
+        Returns:
+            Dict with 'id', 'payload' and 'attempt', or None if nothing is waiting
+        """
+        def take(conn, now):
+            expired = conn.execute(
+                'SELECT id, attempts FROM jobs WHERE status = ? AND lease_until < ?', (RUNNING, now)
+            ).fetchall()
+            for job_id, attempts in expired:
+                if attempts >= self.max_attempts:
+                    print(f"[JOBS] Job {job_id} failed: worker lost {attempts} times")
+                    self._finish(conn, now, job_id, FAILED, error='The resume could not be generated, please try again')
+                else:
+                    print(f"[JOBS] Lease on job {job_id} expired, queueing it again")
+                    conn.execute('UPDATE jobs SET status = ?, worker = NULL WHERE id = ?', (QUEUED, job_id))
+
+            row = conn.execute(
+                'SELECT id, payload, attempts FROM jobs WHERE status = ? ORDER BY created LIMIT 1', (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, payload, attempts = row
+            conn.execute(
+                'UPDATE jobs SET status = ?, worker = ?, attempts = ?, lease_until = ?, started = ? WHERE id = ?',
+                (RUNNING, worker, attempts + 1, now + self.lease_seconds, now, job_id)
+            )
+            return {'id': job_id, 'payload': json.loads(payload), 'attempt': attempts + 1}
+
+        return self._transaction(take)
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """Renew a worker's lease; False if the job was cancelled or is no longer the worker's"""
+        def renew(conn, now):
+            return conn.execute(
+                'UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND worker = ?',
+                (now + self.lease_seconds, job_id, RUNNING, worker)
+            ).rowcount == 1
+
+        return self._transaction(renew)
+
+    def add_events(self, job_id: str, worker: str, events: Iterable[Tuple[str, Any]]) -> bool:
+        """Record section events of a running job; False (nothing recorded) if the lease is gone"""
+        events = list(events)
+
+        def insert(conn, now):
+            if not self._owns(conn, job_id, worker):
+                return False
+            conn.executemany('INSERT INTO job_events (job_id, event, data) VALUES (?, ?, ?)',
+                             [(job_id, event, json.dumps(data)) for event, data in events])
+            return True
+
+        return self._transaction(insert) if events else True
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> bool:
+        """Mark a job done with its result; False if the worker had lost the lease"""
+        return self._transaction(
+            lambda conn, now: self._owns(conn, job_id, worker) and self._finish(conn, now, job_id, DONE, result=result)
+        )
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Mark a job failed; False if the worker had lost the lease"""
+        return self._transaction(
+            lambda conn, now: self._owns(conn, job_id, worker) and self._finish(conn, now, job_id, FAILED, error=error)
+        )
+
+    def release(self, job_id: str, worker: str) -> bool:
+        """Put a job back in the queue (worker shutting down); the claim does not count as an attempt"""
+        def requeue(conn, now):
+            return conn.execute(
+                'UPDATE jobs SET status = ?, worker = NULL, lease_until = 0, attempts = attempts - 1 '
+                'WHERE id = ? AND status = ? AND worker = ?', (QUEUED, job_id, RUNNING, worker)
+            ).rowcount == 1
+
+        return self._transaction(requeue)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job (its worker stops at the next heartbeat); False if already finished"""
+        def stop(conn, now):
+            row = conn.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None or row[0] in FINISHED:
+                return False
+            return self._finish(conn, now, job_id, CANCELLED, error='Cancelled')
+
+        return self._transaction(stop)
+
+    def _owns(self, conn: sqlite3.Connection, job_id: str, worker: str) -> bool:
+        return conn.execute('SELECT 1 FROM jobs WHERE id = ? AND status = ? AND worker = ?',
+                            (job_id, RUNNING, worker)).fetchone() is not None
+
+    def _finish(self, conn: sqlite3.Connection, now: float, job_id: str, status: str,
+                result: Dict[str, Any] = None, error: str = None) -> bool:
+        if status != DONE and self.on_failed is not None:
+            row = conn.execute('SELECT payload FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row and row[0]:
+                self._local.failed.append((job_id, json.loads(row[0])))
+        # The payload holds the user's resume data; it is not needed once the job is over
+        conn.execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, lease_until = 0, finished = ? '
+            'WHERE id = ?', (status, json.dumps(result) if result is not None else None, error, now, job_id)
+        )
+        return True
+
+    def _cleanup(self, conn: sqlite3.Connection, now: float):
+        """Delete finished jobs and their events once they are older than JOB_TTL"""
+        expired = [row[0] for row in conn.execute(
+            'SELECT id FROM jobs WHERE finished IS NOT NULL AND finished < ?', (now - JOB_TTL,)
+        )]
+        if expired:
+            marks = ','.join('?' * len(expired))
+            conn.execute(f'DELETE FROM job_events WHERE job_id IN ({marks})', expired)
+            conn.execute(f'DELETE FROM jobs WHERE id IN ({marks})', expired)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Status of a job, or None if unknown (or expired)
+
+        Returns:
+            Dict with 'id', 'status', 'position' (jobs ahead of it while queued),
+            'attempts', 'created', 'started', 'finished', 'result' and 'error'
+        """
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT id, status, result, error, attempts, created, started, finished FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(('id', 'status', 'result', 'error', 'attempts', 'created', 'started', 'finished'), row))
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['position'] = None
+        if job['status'] == QUEUED:
+            job['position'] = conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status = ? AND created < ?', (QUEUED, job['created'])
+            ).fetchone()[0]
+        return job
+
+    def events(self, job_id: str, after: int = 0) -> List[Tuple[int, str, Any]]:
+        """Section events of a job recorded after sequence number `after`, as (seq, event, data)"""
+        rows = self._connection().execute(
+            'SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq', (job_id, after)
+        ).fetchall()
+        return [(seq, event, json.loads(data)) for seq, event, data in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Jobs per status and the age of the oldest queued job (seconds)"""
+        try:
+            conn = self._connection()
+            counts = dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+            oldest = conn.execute('SELECT MIN(created) FROM jobs WHERE status = ?', (QUEUED,)).fetchone()[0]
+        except sqlite3.Error as e:
+            return {'error': str(e)}
+        return {
+            **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)},
+            'oldest_queued_seconds': round(time.time() - oldest, 1) if oldest else 0,
+        }
@@ -0,0 +1,145 @@
+"""
+Multi-pattern keyword automaton (Aho-Corasick) for skill matching
+Finds every known skill in a single linear pass over the text
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Characters that continue a token. A match is only accepted when the
+# characters on either side of it are NOT token characters, so 'C' does not
+# match inside "Cloud" and 'Go' does not match inside "Google".
+TOKEN_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789+#')
+
+
+def is_token_char(ch: str) -> bool:
+    """Return True if the (lowercased) character continues a token"""
+    return ch in TOKEN_CHARS or ch.isalnum()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercased keyword patterns"""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the automaton
+
+        Args:
+            patterns: Keywords to match (matching is case-insensitive)
+        """
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        seen = {}
+        for pattern in patterns:
+            key = pattern.lower().strip()
+            if not key or key in seen:
+                continue
+            seen[key] = len(self.patterns)
+            self.patterns.append(key)
+            self._add(key, seen[key])
+
+        self._build_failure_links()
+        self._build_boundaries()
+
+    @classmethod
+    def from_compiled(cls, data: Dict) -> 'KeywordAutomaton':
+        """Restore an automaton from the tables produced by to_compiled()"""
+        automaton = cls.__new__(cls)
+        automaton.patterns = data['patterns']
+        automaton._goto = data['goto']
+        automaton._fail = data['fail']
+        automaton._output = [tuple(ids) for ids in data['output']]
+        automaton._bounds = [tuple(bounds) for bounds in data['bounds']]
+        return automaton
+
+    def to_compiled(self) -> Dict:
+        """Export the automaton tables as JSON-serializable data"""
+        return {
+            'patterns': self.patterns,
+            'goto': self._goto,
+            'fail': self._fail,
+            'output': [list(ids) for ids in self._output],
+            'bounds': [list(bounds) for bounds in self._bounds],
+        }
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _add(self, key: str, pattern_id: int):
+        """Insert one pattern into the trie"""
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = nxt
+        self._output[state] = self._output[state] + (pattern_id,)
+
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and merged outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._output[self._fail[nxt]]:
+                    self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def _build_boundaries(self):
+        """Precompute which ends of each pattern need a token-boundary check"""
+        # Only enforce boundaries where the pattern itself starts/ends with a
+        # token character: '.NET' may follow 'ASP', but 'Go' may not follow 'Al'
+        self._bounds = [(is_token_char(p[0]), is_token_char(p[-1])) for p in self.patterns]
+
+    def iter_matches(self, text_lower: str) -> Iterator[Tuple[int, int]]:
+        """
+        Scan lowercased text once and yield token-bounded matches
+
+        Args:
+            text_lower: Text that has already been lowercased
+
+        Yields:
+            (start_offset, pattern_id) for every match
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+        bounds = self._bounds
+        length = len(text_lower)
+        state = 0
+
+        for pos, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+
+            end = pos + 1
+            for pattern_id in output[state]:
+                start = end - len(patterns[pattern_id])
+                check_left, check_right = bounds[pattern_id]
+                if check_left and start > 0 and is_token_char(text_lower[start - 1]):
+                    continue
+                if check_right and end < length and is_token_char(text_lower[end]):
+                    continue
+                yield start, pattern_id
+
+    def find_all(self, text: str) -> List[str]:
+        """Return the distinct patterns found in text, in order of first occurrence"""
+        found = {}
+        for _, pattern_id in self.iter_matches(text.lower()):
+            found.setdefault(pattern_id, None)
+        return [self.patterns[pattern_id] for pattern_id in found]
@@ -0,0 +1,94 @@
+"""
+Resume-to-Job Match Scoring
+Turns resumes and job descriptions into TF-IDF skill vectors and scores every pair at once
+"""
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+ResumeInput = Union[str, Dict[str, Any]]
+
+
+class MatchScorer:
+    """Computes N x M resume/JD match matrices over the canonical skill vocabulary"""
+
+    def __init__(self, ats_matcher):
+        self.ats_matcher = ats_matcher
+
+    def score_matrix(self, resumes: List[ResumeInput], job_descriptions: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Score every resume against every job description
+
+        Args:
+            resumes: Resume texts or resume data dictionaries
+            job_descriptions: Job description texts
+
+        Returns:
+            {
+                'cosine': (n_resumes, n_jobs) cosine similarity of TF-IDF skill vectors,
+                'coverage': (n_resumes, n_jobs) share of each JD's skill weight the resume covers
+            }
+        """
+        resume_counts = [self.ats_matcher.count_skill_ids(self.resume_text(r)) for r in resumes]
+        job_counts = [self.ats_matcher.count_skill_ids(jd) for jd in job_descriptions]
+
+        resume_tf, job_tf = self._term_frequencies(resume_counts, job_counts)
+
+        # Smoothed IDF over the whole corpus: skills every document mentions carry little signal
+        n_docs = resume_tf.shape[0] + job_tf.shape[0]
+        doc_freq = np.count_nonzero(resume_tf, axis=0) + np.count_nonzero(job_tf, axis=0)
+        idf = np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+
+        resume_weights = resume_tf * idf
+        job_weights = job_tf * idf
+
+        cosine = self._l2_normalize(resume_weights) @ self._l2_normalize(job_weights).T
+
+        job_totals = job_weights.sum(axis=1)
+        covered = (resume_weights > 0).astype(np.float32) @ job_weights.T
+        coverage = np.divide(covered, job_totals, out=np.zeros_like(covered), where=job_totals > 0)
+
+        return {'cosine': cosine, 'coverage': coverage}
+
+    @staticmethod
+    def _term_frequencies(resume_counts: List[Dict[int, int]],
+                          job_counts: List[Dict[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Build sublinear TF matrices restricted to the skills that actually occur"""
+        rows, cols, vals = [], [], []
+        for row, counts in enumerate(resume_counts + job_counts):
+            rows.extend([row] * len(counts))
+            cols.extend(counts.keys())
+            vals.extend(counts.values())
+
+        # Compress the vocabulary to the columns in use (a few dozen out of hundreds)
+        used_skill_ids, col_index = np.unique(np.asarray(cols, dtype=np.int64), return_inverse=True)
+        tf = np.zeros((len(resume_counts) + len(job_counts), len(used_skill_ids)), dtype=np.float32)
+        if vals:
+            tf[np.asarray(rows), col_index] = 1.0 + np.log(np.asarray(vals, dtype=np.float32))
+
+        return tf[:len(resume_counts)], tf[len(resume_counts):]
+
+    @staticmethod
+    def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+        """Scale each row to unit length (all-zero rows stay zero)"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    @staticmethod
+    def resume_text(resume: ResumeInput) -> str:
+        """Flatten resume data (as sent to /api/generate-resume) into plain text"""
+        if isinstance(resume, str):
+            return resume
+
+        parts = [
+            resume.get('personal_info', {}).get('title', ''),
+            resume.get('professional_summary', ''),
+            ', '.join(resume.get('skills', [])),
+        ]
+        for exp in resume.get('work_experience', []):
+            parts.append(exp.get('title', ''))
+            parts.append(exp.get('description', ''))
+        for project in resume.get('projects', []):
+            parts.append(project.get('description', ''))
+            parts.append(project.get('technologies', ''))
+        return '\n'.join(part for part in parts if part)
@@ -0,0 +1,74 @@
+"""
+PDF Download Tokens
+Hands out short-lived, unguessable download links for generated resumes.
+Tokens are directories on disk, so any worker can serve a token another worker issued.
+"""
+import os
+import re
+import secrets
+import shutil
+import time
+from typing import Optional
+
+PDF_DOWNLOAD_TTL = int(os.getenv('PDF_DOWNLOAD_TTL', 3600))
+
+TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{24}$')
+
+
+class PDFDownloads:
+    """Maps download tokens to generated PDF files"""
+
+    def __init__(self, directory: str, ttl_seconds: int = None):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds or PDF_DOWNLOAD_TTL
+        os.makedirs(self.directory, exist_ok=True)
+
+    def issue(self, pdf_path: str) -> str:
+        """
+        Register a generated PDF and return its download token
+
+        The file is hard-linked (or copied) under the token, so the original
+        output folder is left as it is.
+        """
+        self.cleanup()
+        token = secrets.token_urlsafe(18)
+        token_dir = os.path.join(self.directory, token)
+        os.makedirs(token_dir)
+        target = os.path.join(token_dir, os.path.basename(pdf_path))
+        try:
+            os.link(pdf_path, target)
+        except OSError:
+            shutil.copy2(pdf_path, target)
+        return token
+
+    def resolve(self, token: str) -> Optional[str]:
+        """Return the PDF path for a token, or None if unknown or expired"""
+        if not TOKEN_PATTERN.match(token or ''):
+            return None
+        token_dir = os.path.join(self.directory, token)
+        try:
+            if time.time() - os.path.getmtime(token_dir) > self.ttl_seconds:
+                shutil.rmtree(token_dir, ignore_errors=True)
+                return None
+            names = [name for name in os.listdir(token_dir) if name.endswith('.pdf')]
+        except OSError:
+            return None
+        return os.path.join(token_dir, names[0]) if names else None
+
+    def cleanup(self) -> int:
+        """Delete expired tokens; returns how many were removed"""
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        try:
+            entries = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in entries:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
@@ -0,0 +1,269 @@
+"""
+AI Rate Governor
+Cross-worker token buckets (requests/min, tokens/min) plus adaptive (AIMD) concurrency
+for DeepSeek calls. Bucket state lives in SQLite so every gunicorn worker shares it.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+GOVERNOR_DB_PATH = os.getenv('AI_GOVERNOR_DB_PATH', 'data/ai_governor.db')
+
+# Provider limits shared by all workers
+AI_REQUESTS_PER_MINUTE = float(os.getenv('AI_REQUESTS_PER_MINUTE', 600))
+AI_TOKENS_PER_MINUTE = float(os.getenv('AI_TOKENS_PER_MINUTE', 2_000_000))
+
+# Longest a call may queue for a slot before giving up
+AI_MAX_QUEUE_WAIT = float(os.getenv('AI_MAX_QUEUE_WAIT', 30))
+
+# AIMD: start here, add ~1 per window of successes, back off on 429s or latency spikes
+INITIAL_CONCURRENCY = 16
+MIN_CONCURRENCY = 1
+RATE_LIMIT_DECREASE = 0.5
+LATENCY_DECREASE = 0.8
+LATENCY_FACTOR = 3.0
+DECREASE_COOLDOWN = 2.0
+
+# Longest single sleep while polling the shared buckets
+MAX_POLL_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS governor_state (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class GovernorTimeout(Exception):
+    """Raised when a call could not get a slot within the queue wait limit"""
+
+
+class Lease:
+    """One granted API call"""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.started = time.monotonic()
+
+
+class RateGovernor:
+    """
+    Gates every chat completion call
+
+    acquire() waits for a local concurrency slot and then for the shared
+    request and token buckets; release() settles the token estimate with
+    actual usage and feeds the latency/429 signal into the AIMD limit.
+    A 429 pauses every worker until the provider's retry-after passes.
+    SQLite failures are logged and the governor fails open.
+    """
+
+    def __init__(self, path: str = None, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 max_wait: float = None, max_concurrency: int = None):
+        self.path = path or GOVERNOR_DB_PATH
+        self.rpm = requests_per_minute or AI_REQUESTS_PER_MINUTE
+        self.tpm = tokens_per_minute or AI_TOKENS_PER_MINUTE
+        self.max_wait = max_wait or AI_MAX_QUEUE_WAIT
+        self.max_concurrency = max_concurrency or int(os.getenv('AI_MAX_CONCURRENCY', 100))
+        self.limit = float(min(INITIAL_CONCURRENCY, self.max_concurrency))
+        self.inflight = 0
+        self._baselines: Dict[Any, float] = {}
+        self._last_decrease = 0.0
+        self._condition = None
+        self._pid = None
+        self._local = threading.local()
+        self.stats_counters = {'granted': 0, 'queued_seconds': 0.0, 'rate_limited': 0, 'timeouts': 0}
+
+    # -- shared buckets (run in worker threads, never on the event loop) --
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _buckets(self):
+        """(name, capacity, refill per second) of each shared bucket"""
+        return (('requests', self.rpm, self.rpm / 60.0), ('tokens', self.tpm, self.tpm / 60.0))
+
+    def _try_take(self, tokens: int) -> float:
+        """Take one request and tokens from the buckets; return 0, or seconds to wait before retrying"""
+        needs = {'requests': 1.0, 'tokens': float(min(tokens, self.tpm))}
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                row = conn.execute("SELECT value FROM governor_state WHERE key = 'paused_until'").fetchone()
+                paused_for = (row[0] - now) if row else 0.0
+
+                levels = {}
+                wait = max(paused_for, 0.0)
+                for name, capacity, rate in self._buckets():
+                    row = conn.execute('SELECT level, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+                    level = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                    levels[name] = level
+                    if level < needs[name]:
+                        wait = max(wait, (needs[name] - level) / rate)
+
+                for name, level in levels.items():
+                    if wait == 0:
+                        level -= needs[name]
+                    conn.execute('INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)',
+                                 (name, level, now))
+                conn.execute('COMMIT')
+                return wait
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            print(f"[WARN] AI governor unavailable, not rate limiting: {e}")
+            return 0.0
+
+    def _adjust_tokens(self, delta: float):
+        """Return (or charge) tokens after the real usage is known"""
+        try:
+            conn = self._connection()
+            conn.execute('UPDATE buckets SET level = MIN(?, level + ?) WHERE name = ?',
+                         (self.tpm, delta, 'tokens'))
+        except sqlite3.Error as e:
+            print(f"[WARN] AI governor could not settle tokens: {e}")
+
+    def _pause_all(self, seconds: float):
+        """Make every worker hold off new calls for the given time"""
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO governor_state (key, value) VALUES ('paused_until', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (time.time() + seconds,)
+            )
+        except sqlite3.Error as e:
+            print(f"[WARN] AI governor could not record 429 pause: {e}")
+
+    # -- per-process adaptive concurrency (runs on the event loop) --
+
+    def _local_condition(self) -> asyncio.Condition:
+        if self._condition is None or self._pid != os.getpid():
+            self._condition = asyncio.Condition()
+            self.inflight = 0
+            self._pid = os.getpid()
+        return self._condition
+
+    async def acquire(self, estimated_tokens: int) -> Lease:
+        """
+        Wait for a concurrency slot and rate budget
+
+        Raises:
+            GovernorTimeout: if no slot was granted within max_wait seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        condition = self._local_condition()
+
+        async with condition:
+            while self.inflight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats_counters['timeouts'] += 1
+                    raise GovernorTimeout(f'No AI call slot within {self.max_wait:.0f}s')
+                try:
+                    await asyncio.wait_for(condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self.inflight += 1
+
+        try:
+            while True:
+                wait = await asyncio.to_thread(self._try_take, estimated_tokens)
+                if wait <= 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    self.stats_counters['timeouts'] += 1
+                    raise GovernorTimeout(f'AI rate limit budget exhausted for the next {wait:.0f}s')
+                await asyncio.sleep(min(wait, MAX_POLL_INTERVAL))
+        except BaseException:
+            await self._free_slot()
+            raise
+
+        self.stats_counters['granted'] += 1
+        self.stats_counters['queued_seconds'] += time.monotonic() - started
+        return Lease(estimated_tokens)
+
+    async def _free_slot(self):
+        condition = self._local_condition()
+        async with condition:
+            self.inflight = max(0, self.inflight - 1)
+            condition.notify_all()
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_COOLDOWN:
+            self.limit = max(MIN_CONCURRENCY, self.limit * factor)
+            self._last_decrease = now
+
+    async def release(self, lease: Lease, tokens_used: Optional[int] = None, latency_key: Any = None,
+                      rate_limited: bool = False, retry_after: Optional[float] = None):
+        """
+        Finish a call
+
+        Args:
+            lease: The lease returned by acquire()
+            tokens_used: Actual total tokens (the estimate is refunded/charged accordingly)
+            latency_key: Calls comparable in latency (e.g. same max_tokens) share a baseline
+            rate_limited: The provider answered 429
+            retry_after: Provider's retry-after hint in seconds
+        """
+        latency = time.monotonic() - lease.started
+
+        if rate_limited:
+            self.stats_counters['rate_limited'] += 1
+            self._decrease(RATE_LIMIT_DECREASE)
+            await asyncio.to_thread(self._pause_all, retry_after or 1.0)
+        elif tokens_used is not None:
+            await asyncio.to_thread(self._adjust_tokens, lease.estimated_tokens - tokens_used)
+            baseline = self._baselines.get(latency_key)
+            if baseline is not None and latency > LATENCY_FACTOR * baseline:
+                self._decrease(LATENCY_DECREASE)
+            else:
+                # Additive increase: about +1 per `limit` successful calls
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            # Slow-moving floor of the observed latency
+            self._baselines[latency_key] = latency if baseline is None else min(latency, 0.9 * baseline + 0.1 * latency)
+
+        await self._free_slot()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return this worker's governor state and counters"""
+        return {
+            'requests_per_minute': self.rpm,
+            'tokens_per_minute': self.tpm,
+            'concurrency_limit': round(self.limit, 2),
+            'inflight': self.inflight,
+            **{key: round(value, 3) if isinstance(value, float) else value
+               for key, value in self.stats_counters.items()},
+        }
+
+
+_governor = None
+
+
+def get_governor() -> RateGovernor:
+    """The process-wide governor shared by all AI generators"""
+    global _governor
+    if _governor is None:
+        _governor = RateGovernor()
+    return _governor
@@ -0,0 +1,100 @@
+"""
+Singleflight
+Coalesces concurrent identical async calls in a process onto one in-flight task
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class _Flight:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self, streaming: bool):
+        self.task = None
+        self.streaming = streaming
+        self.parts: List[str] = []
+        self.listeners: List[Callable[[str], None]] = []
+        self.waiters = 0
+
+    def broadcast(self, text: str):
+        self.parts.append(text)
+        for listener in list(self.listeners):
+            listener(text)
+
+
+class Singleflight:
+    """
+    Runs at most one call per key at a time; later callers share its result
+
+    Must be used from a single event loop. The call runs as its own task, so
+    one caller giving up (timeout or cancellation) does not affect the others;
+    the call is cancelled only when every caller has left.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._pid = None
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[Optional[Callable[[str], None]]], Awaitable[Any]],
+                 on_delta: Callable[[str], None] = None, timeout: float = None) -> Any:
+        """
+        Run fn (or join the call already running for key) and return its result
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine function taking a delta callback (None when not streaming)
+            on_delta: Receives streamed text; joiners first get what was already
+                      streamed, and a non-streaming call's result arrives as one piece
+            timeout: Seconds this caller waits before raising asyncio.TimeoutError
+
+        Returns:
+            The result of fn
+        """
+        if self._pid != os.getpid():
+            # Flights from before a fork belong to the parent's event loop
+            self._flights = {}
+            self._pid = os.getpid()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(streaming=on_delta is not None)
+            flight.task = asyncio.ensure_future(fn(flight.broadcast if flight.streaming else None))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            if on_delta is not None and flight.parts:
+                on_delta(''.join(flight.parts))
+
+        listening = on_delta is not None and flight.streaming
+        if listening:
+            flight.listeners.append(on_delta)
+        flight.waiters += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        finally:
+            flight.waiters -= 1
+            if listening:
+                flight.listeners.remove(on_delta)
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+        if on_delta is not None and not flight.streaming and result:
+            on_delta(result)
+        return result
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return upstream calls made and callers that joined an existing call"""
+        return {
+            'in_flight': len(self._flights),
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,164 @@
+"""
+Skill Index - compiles the versioned skills database into ATSMatcher's lookup format
+The compiled artifact is written atomically and loaded read-only through mmap
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from services.fuzzy_skill_matcher import FuzzySkillMatcher
+from services.keyword_automaton import KeywordAutomaton
+from services.skill_taxonomy import SkillTaxonomy
+
+SKILLS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.json')
+
+# Bump the format number whenever the compiled layout changes
+INDEX_MAGIC = b'RMSKIDX1\n'
+
+
+class SkillIndex:
+    """Compiled, read-only skill lookup structures used by ATSMatcher"""
+
+    def __init__(self, version: int, checksum: str, vocabulary: List[str],
+                 taxonomy: SkillTaxonomy, automaton: KeywordAutomaton, pattern_skill_ids: List[int]):
+        self.version = version
+        self.checksum = checksum
+        self.vocabulary = vocabulary
+        self.taxonomy = taxonomy
+        self.automaton = automaton
+        self.pattern_skill_ids = pattern_skill_ids
+        # The n-gram matrix is cheap to rebuild, so it is not stored in the artifact
+        self.fuzzy_matcher = FuzzySkillMatcher(taxonomy.surface_forms())
+
+    @property
+    def index_id(self) -> str:
+        """Identifies this exact build (data version plus source checksum)"""
+        return f"v{self.version}-{self.checksum[:12]}"
+
+    @classmethod
+    def from_source(cls, data: Dict[str, Any], checksum: str) -> 'SkillIndex':
+        """Build the index from the parsed skills.json document"""
+        vocabulary = _validated_vocabulary(data)
+        taxonomy = SkillTaxonomy(vocabulary, data.get('aliases', {}), data.get('implies', {}),
+                                 data.get('ecosystems', {}))
+        # Every spelling (canonical names and aliases) becomes an automaton pattern
+        surface_forms = taxonomy.surface_forms()
+        automaton = KeywordAutomaton(surface_forms)
+        pattern_skill_ids = [surface_forms[pattern] for pattern in automaton.patterns]
+        return cls(data['version'], checksum, vocabulary, taxonomy, automaton, pattern_skill_ids)
+
+    @classmethod
+    def from_compiled(cls, data: Dict[str, Any]) -> 'SkillIndex':
+        """Restore the index from a compiled artifact"""
+        return cls(data['version'], data['checksum'], data['vocabulary'],
+                   SkillTaxonomy.from_compiled(data['taxonomy']),
+                   KeywordAutomaton.from_compiled(data['automaton']),
+                   data['pattern_skill_ids'])
+
+    def to_compiled(self) -> Dict[str, Any]:
+        """Export the index as JSON-serializable data"""
+        return {
+            'version': self.version,
+            'checksum': self.checksum,
+            'vocabulary': self.vocabulary,
+            'taxonomy': self.taxonomy.to_compiled(),
+            'automaton': self.automaton.to_compiled(),
+            'pattern_skill_ids': self.pattern_skill_ids,
+        }
+
+
+def _validated_vocabulary(data: Dict[str, Any]) -> List[str]:
+    """Flatten the categorized skills list, rejecting duplicates"""
+    if not isinstance(data.get('version'), int):
+        raise ValueError("skills database must have an integer 'version'")
+
+    vocabulary = []
+    seen = {}
+    duplicates = []
+    for category, skills in data.get('skills', {}).items():
+        for skill in skills:
+            key = skill.lower()
+            if key in seen:
+                duplicates.append(f"{skill} ({category}; already in {seen[key]})")
+                continue
+            seen[key] = category
+            vocabulary.append(skill)
+
+    if duplicates:
+        raise ValueError(f"Duplicate skills in database: {', '.join(duplicates)}")
+    return vocabulary
+
+
+def default_index_path(source_path: str) -> str:
+    """The compiled artifact lives next to its source (skills.json -> skills.idx)"""
+    return os.path.splitext(source_path)[0] + '.idx'
+
+
+def _file_checksum(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compile_skill_index(source_path: str = SKILLS_SOURCE, index_path: Optional[str] = None) -> SkillIndex:
+    """
+    Compile skills.json into the index artifact
+
+    The artifact is written to a temporary file and renamed into place, so
+    readers never observe a half-written index.
+
+    Returns:
+        The compiled SkillIndex
+    """
+    index_path = index_path or default_index_path(source_path)
+    with open(source_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    index = SkillIndex.from_source(data, _file_checksum(source_path))
+
+    payload = json.dumps(index.to_compiled(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(payload)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return index
+
+
+def read_skill_index(index_path: str) -> SkillIndex:
+    """Load a compiled artifact through a read-only memory map"""
+    with open(index_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                raise ValueError(f"{index_path} is not a compiled skills index")
+            data = json.loads(mapped[len(INDEX_MAGIC):])
+    return SkillIndex.from_compiled(data)
+
+
+def load_skill_index(source_path: str = SKILLS_SOURCE, index_path: Optional[str] = None) -> SkillIndex:
+    """
+    Load the compiled index, recompiling it if it is missing or older than its source
+
+    Args:
+        source_path: Path to skills.json
+        index_path: Path to the compiled artifact (defaults to skills.idx next to the source)
+    """
+    index_path = index_path or default_index_path(source_path)
+    source_exists = os.path.exists(source_path)
+
+    if os.path.exists(index_path):
+        try:
+            index = read_skill_index(index_path)
+            if not source_exists or index.checksum == _file_checksum(source_path):
+                return index
+        except (ValueError, KeyError, OSError) as e:
+            print(f"[WARN] Ignoring unreadable skills index {index_path}: {e}")
+
+    return compile_skill_index(source_path, index_path)
@@ -0,0 +1,56 @@
+"""
+Skill Ranking Engine
+Scores job description terms by frequency, position in the posting and match source
+"""
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from services.jd_sections import TITLE, REQUIREMENTS, BODY, BOILERPLATE
+
+# Weight of one occurrence by the section of the JD it appears in
+SECTION_WEIGHTS = {
+    TITLE: 3.0,
+    REQUIREMENTS: 2.0,
+    BODY: 1.0,
+    BOILERPLATE: 0.25,
+}
+
+# Canonical skills from the database outrank capitalized-phrase guesses
+CANONICAL_WEIGHT = 1.0
+PHRASE_WEIGHT = 0.35
+
+
+class SkillRanker:
+    """Accumulates weighted term occurrences for one job description"""
+
+    def __init__(self):
+        self.scores = Counter()
+        self.counts = Counter()
+
+    def add(self, term: str, section: str, canonical: bool = True, confidence: float = 1.0):
+        """Record one occurrence of term in the given JD section (fuzzy matches pass their confidence)"""
+        source_weight = CANONICAL_WEIGHT if canonical else PHRASE_WEIGHT
+        self.scores[term] += SECTION_WEIGHTS.get(section, SECTION_WEIGHTS[BODY]) * source_weight * confidence
+        self.counts[term] += 1
+
+
+def rank_terms(scores: Dict[str, float], terms: Optional[Iterable[str]] = None,
+               k: Optional[int] = None) -> List[str]:
+    """
+    Order terms by score (ties keep the order in which terms were first scored)
+
+    Args:
+        scores: Term -> score mapping (insertion order is the tie-breaker)
+        terms: Subset of terms to rank (defaults to every scored term)
+        k: Return only the top-k terms, selected with a heap
+
+    Returns:
+        Terms in descending score order
+    """
+    order = {term: idx for idx, term in enumerate(scores)}
+    candidates = scores if terms is None else terms
+    key = lambda term: (scores.get(term, 0.0), -order.get(term, len(order)))
+    if k is not None:
+        return heapq.nlargest(k, candidates, key=key)
+    return sorted(candidates, key=key, reverse=True)
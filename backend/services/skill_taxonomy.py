@@ -0,0 +1,146 @@
+"""
+Skill Taxonomy - canonical skill IDs, aliases and related-skill closures
+Related-skill expansion is precomputed into bitsets when the taxonomy is built.
+The aliases, implications and ecosystems live in services/data/skills.json.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+class SkillTaxonomy:
+    """Canonical skill vocabulary with alias resolution and related-skill lookups"""
+
+    def __init__(self, skills: Iterable[str], aliases: Dict[str, str],
+                 implies: Dict[str, List[str]], ecosystems: Dict[str, Dict]):
+        """
+        Build the taxonomy
+
+        Args:
+            skills: Skill vocabulary (may contain aliases and duplicates)
+            aliases: Alias -> canonical name table
+            implies: Skill -> implied skills (followed transitively)
+            ecosystems: Ecosystem name -> {'triggers': [...], 'related': [...]}
+        """
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._alias_ids: Dict[str, int] = {}
+
+        # Ecosystem members get the lowest IDs so decoded suggestions keep
+        # their curated order; the rest of the vocabulary follows alphabetically
+        for ecosystem in ecosystems.values():
+            for name in ecosystem['related']:
+                self._intern(aliases.get(name, name))
+        for name in sorted(skills, key=str.lower):
+            self._intern(aliases.get(name, name))
+        for name in list(implies) + [n for targets in implies.values() for n in targets]:
+            self._intern(aliases.get(name, name))
+
+        for alias, canonical in aliases.items():
+            self._alias_ids[alias.lower()] = self._intern(canonical)
+
+        self._related_masks = self._build_related_masks(aliases, implies, ecosystems)
+
+    @classmethod
+    def from_compiled(cls, data: Dict) -> 'SkillTaxonomy':
+        """Restore a taxonomy from the tables produced by to_compiled()"""
+        taxonomy = cls.__new__(cls)
+        taxonomy.names = data['names']
+        taxonomy._ids = {name.lower(): skill_id for skill_id, name in enumerate(taxonomy.names)}
+        taxonomy._alias_ids = data['alias_ids']
+        taxonomy._related_masks = [int(mask, 16) for mask in data['related_masks']]
+        return taxonomy
+
+    def to_compiled(self) -> Dict:
+        """Export the taxonomy tables as JSON-serializable data"""
+        return {
+            'names': self.names,
+            'alias_ids': self._alias_ids,
+            'related_masks': [format(mask, 'x') for mask in self._related_masks],
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _intern(self, name: str) -> int:
+        """Return the canonical ID for name, assigning a new one if needed"""
+        key = name.lower()
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            skill_id = len(self.names)
+            self._ids[key] = skill_id
+            self.names.append(name)
+        return skill_id
+
+    def _build_related_masks(self, aliases: Dict[str, str], implies: Dict[str, List[str]],
+                             ecosystems: Dict[str, Dict]) -> List[int]:
+        """Precompute, for every skill, the bitset of related skills it unlocks"""
+        resolve = lambda name: self._ids[aliases.get(name, name).lower()]
+
+        implied_edges: Dict[int, List[int]] = {}
+        for name, targets in implies.items():
+            implied_edges.setdefault(resolve(name), []).extend(resolve(t) for t in targets)
+
+        trigger_masks: Dict[int, int] = {}
+        for ecosystem in ecosystems.values():
+            members = 0
+            for name in ecosystem['related']:
+                members |= 1 << resolve(name)
+            for name in ecosystem['triggers']:
+                trigger_id = resolve(name)
+                trigger_masks[trigger_id] = trigger_masks.get(trigger_id, 0) | members
+
+        masks = []
+        for skill_id in range(len(self.names)):
+            # Transitive closure over "implies" edges, then union of ecosystems
+            closure = {skill_id}
+            stack = [skill_id]
+            while stack:
+                for nxt in implied_edges.get(stack.pop(), ()):
+                    if nxt not in closure:
+                        closure.add(nxt)
+                        stack.append(nxt)
+            mask = 0
+            for implied_id in closure:
+                mask |= trigger_masks.get(implied_id, 0)
+            masks.append(mask)
+        return masks
+
+    def surface_forms(self) -> Dict[str, int]:
+        """Return every lowercase spelling (canonical names and aliases) mapped to its ID"""
+        forms = dict(self._ids)
+        forms.update(self._alias_ids)
+        return forms
+
+    def canonical_id(self, name: str) -> Optional[int]:
+        """Resolve a skill name or alias to its canonical ID"""
+        key = name.lower()
+        skill_id = self._alias_ids.get(key)
+        return skill_id if skill_id is not None else self._ids.get(key)
+
+    def canonical_name(self, name: str) -> str:
+        """Return the canonical spelling of a skill, or name unchanged if unknown"""
+        skill_id = self.canonical_id(name)
+        return name if skill_id is None else self.names[skill_id]
+
+    def related_mask(self, skill_ids: Iterable[int]) -> int:
+        """Union of the related-skill bitsets for the given skills"""
+        mask = 0
+        for skill_id in skill_ids:
+            mask |= self._related_masks[skill_id]
+        return mask
+
+    def names_from_mask(self, mask: int) -> List[str]:
+        """Decode a skill bitset into canonical names (ascending ID order)"""
+        names = []
+        while mask:
+            low_bit = mask & -mask
+            names.append(self.names[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return names
+
+    def related_skills(self, skill_ids: Iterable[int]) -> List[str]:
+        """Return related skills for the given skills, excluding the skills themselves"""
+        skill_ids = list(skill_ids)
+        mask = self.related_mask(skill_ids)
+        for skill_id in skill_ids:
+            mask &= ~(1 << skill_id)
+        return self.names_from_mask(mask)
@@ -0,0 +1,124 @@
+"""
+Generation Strategy Selector
+Picks the generation mode (fan-out, batch, hybrid) expected to finish a resume fastest
+"""
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Sequence
+
+# Share of requests that try a mode other than the current best, to keep its estimate fresh
+STRATEGY_EXPLORATION = float(os.getenv('AI_STRATEGY_EXPLORATION', 0.05))
+
+# Weight of the newest sample in the moving average
+EWMA_ALPHA = 0.2
+
+# Seconds assumed for a mode before it has been measured for a request shape
+PRIOR_SECONDS = {'fanout': 20.0, 'hybrid': 25.0, 'batch': 60.0}
+
+JOB_BUCKETS = ((1, '1'), (3, '2-3'), (6, '4-6'))
+JD_BUCKETS = ((3000, 'short'), (10000, 'medium'))
+
+
+def api_calls(mode: str, jobs: int) -> int:
+    """Upstream calls a mode makes for a resume with this many positions (skills extraction included)"""
+    if mode == 'batch':
+        return 2
+    if mode == 'hybrid':
+        return 2 + jobs
+    return 3 + 2 * jobs
+
+
+class StrategySelector:
+    """
+    Rolling per-mode latency estimates, keyed by request shape
+
+    Each (mode, job-count bucket, JD-length bucket) keeps an exponentially
+    weighted average of measured generation time. The expected time of a mode
+    is that average, stretched by the number of waves its calls need when the
+    rate governor has fewer free slots than the mode has calls. The mode with
+    the lowest expectation wins, except for an exploration share of requests.
+    Estimates are per worker process.
+    """
+
+    def __init__(self, governor=None, exploration: float = None, rng: random.Random = None):
+        self.governor = governor
+        self.exploration = STRATEGY_EXPLORATION if exploration is None else exploration
+        self._rng = rng or random.Random()
+        self._estimates: Dict[tuple, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.choices = {mode: 0 for mode in PRIOR_SECONDS}
+        self.explored = 0
+
+    def bucket(self, jobs: int, jd_length: int) -> str:
+        """Request shape key, e.g. '2-3:medium'"""
+        job_bucket = next((name for limit, name in JOB_BUCKETS if jobs <= limit), '7+')
+        jd_bucket = next((name for limit, name in JD_BUCKETS if jd_length <= limit), 'long')
+        return f'{job_bucket}:{jd_bucket}'
+
+    def waves(self, mode: str, jobs: int) -> int:
+        """Rounds of calls the mode needs given the governor's free concurrency slots right now"""
+        if self.governor is None:
+            return 1
+        free = max(1, int(self.governor.limit) - self.governor.inflight)
+        return math.ceil(api_calls(mode, jobs) / free)
+
+    def expected_seconds(self, mode: str, jobs: int, jd_length: int) -> float:
+        """Estimated generation time for a mode under the current rate-limit headroom"""
+        with self._lock:
+            estimate = self._estimates.get((mode, self.bucket(jobs, jd_length)))
+        seconds = estimate['seconds'] if estimate else PRIOR_SECONDS[mode]
+        return seconds * self.waves(mode, jobs)
+
+    def choose(self, jobs: int, jd_length: int, modes: Sequence[str] = None) -> str:
+        """
+        Pick the mode for a request
+
+        Args:
+            jobs: Number of positions in the work history
+            jd_length: Job description length in characters
+            modes: Modes allowed for this request (default: all)
+        """
+        modes = list(modes or PRIOR_SECONDS)
+        expected = {mode: self.expected_seconds(mode, jobs, jd_length) for mode in modes}
+        mode = min(modes, key=expected.get)
+        if len(modes) > 1 and self._rng.random() < self.exploration:
+            mode = self._rng.choice([other for other in modes if other != mode])
+            with self._lock:
+                self.explored += 1
+        with self._lock:
+            self.choices[mode] += 1
+        print(f"[AI] Generation mode: {mode} "
+              f"(expected {', '.join(f'{m} {s:.1f}s' for m, s in sorted(expected.items()))})")
+        return mode
+
+    def record(self, mode: str, jobs: int, jd_length: int, seconds: float):
+        """
+        Feed a measured generation time into the mode's estimate for this request shape
+
+        Pass the time per wave (measured time / waves() at the start) so that
+        estimates stay comparable as rate-limit headroom changes.
+        """
+        key = (mode, self.bucket(jobs, jd_length))
+        with self._lock:
+            estimate = self._estimates.get(key)
+            if estimate is None:
+                self._estimates[key] = {'seconds': seconds, 'samples': 1, 'updated': time.time()}
+            else:
+                estimate['seconds'] += EWMA_ALPHA * (seconds - estimate['seconds'])
+                estimate['samples'] += 1
+                estimate['updated'] = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return this worker's estimates and how often each mode was chosen"""
+        with self._lock:
+            return {
+                'choices': dict(self.choices),
+                'explored': self.explored,
+                'estimates': {
+                    f'{mode}@{bucket}': {'seconds': round(value['seconds'], 2), 'samples': value['samples']}
+                    for (mode, bucket), value in sorted(self._estimates.items())
+                },
+            }
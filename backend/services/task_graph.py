@@ -0,0 +1,227 @@
+"""
+Task Graph
+Runs async tasks with declared dependencies: each starts as soon as its inputs are ready
+"""
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class TaskGraphError(Exception):
+    """Raised for an invalid graph (unknown dependency or cycle)"""
+
+
+class _Node:
+    def __init__(self, name: str, fn: Callable, deps: Sequence[str], retries: int,
+                 fallback: Optional[Callable], on_result: Optional[Callable[[Any], None]]):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.retries = retries
+        self.fallback = fallback
+        self.on_result = on_result
+        self.status = 'pending'
+        self.attempts = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+
+async def _call(fn: Callable, *args) -> Any:
+    """Call fn and await the result if it is awaitable (so nodes may be sync or async)"""
+    result = fn(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class TaskGraph:
+    """
+    A small DAG scheduler for one request
+
+    Nodes are added with add() and receive their dependencies' results as
+    positional arguments, in the order the dependencies were declared. run()
+    starts every node whose dependencies are done, so the total time is that
+    of the longest chain. A failing node is retried, then replaced by its
+    fallback; without a fallback the failure propagates to its dependents and
+    out of run().
+
+    With a timeout, a node still running at the deadline is cancelled and a
+    node reached after it does not start; both take their fallback at once
+    and are reported as 'degraded'. An asyncio.TimeoutError raised by the node
+    itself, or one of the degrade_on exceptions, is treated the same way (no
+    retries). A node that falls back because it could not use the result of a
+    degraded dependency is reported as 'degraded' too.
+    """
+
+    def __init__(self, name: str = 'graph', degrade_on: Tuple[type, ...] = ()):
+        self.name = name
+        self.degrade_on = tuple(degrade_on)
+        self._nodes: Dict[str, _Node] = {}
+        self._started_at = None
+        self._finished_at = None
+        self._deadline = None
+
+    def add(self, name: str, fn: Callable, deps: Sequence[str] = (), retries: int = 0,
+            fallback: Callable[[], Any] = None, on_result: Callable[[Any], None] = None):
+        """
+        Add a node
+
+        Args:
+            name: Unique node name (results are keyed by it)
+            fn: Called with the dependency results; may return a value or an awaitable
+                (wrap blocking work in asyncio.to_thread)
+            deps: Names of the nodes whose results fn needs
+            retries: Extra attempts after an exception
+            fallback: Called with no arguments for the result if every attempt failed
+            on_result: Called with the node's result (or fallback) as soon as it is known
+        """
+        if name in self._nodes:
+            raise TaskGraphError(f'Duplicate task {name!r}')
+        self._nodes[name] = _Node(name, fn, deps, retries, fallback, on_result)
+
+    def _order(self) -> List[str]:
+        """Topological order of the nodes; raises TaskGraphError on unknown deps or cycles"""
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise TaskGraphError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            if name not in self._nodes:
+                raise TaskGraphError(f"Unknown dependency {name!r} of {path[-1]!r}")
+            state[name] = 'visiting'
+            for dep in self._nodes[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self._nodes:
+            visit(name, [])
+        return order
+
+    def _time_left(self) -> Optional[float]:
+        return None if self._deadline is None else self._deadline - time.perf_counter()
+
+    async def _run_node(self, node: _Node, tasks: Dict[str, asyncio.Task]) -> Any:
+        try:
+            args = [await tasks[dep] for dep in node.deps]
+        except Exception:
+            node.status = 'skipped'
+            raise
+        node.status = 'running'
+
+        timed_out = False
+        for attempt in range(node.retries + 1):
+            remaining = self._time_left()
+            if remaining is not None and remaining <= 0:
+                timed_out = True
+                node.error = node.error or 'deadline passed before the task started'
+                break
+            node.attempts = attempt + 1
+            if node.started_at is None:
+                node.started_at = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(_call(node.fn, *args), remaining)
+                node.status = 'ok'
+                break
+            except asyncio.TimeoutError as e:
+                timed_out = True
+                node.error = str(e) or 'deadline exceeded'
+                print(f"[WARN] Task {node.name} timed out")
+                break
+            except self.degrade_on as e:
+                timed_out = True
+                node.error = str(e)
+                print(f"[WARN] Task {node.name} unavailable: {e}")
+                break
+            except Exception as e:
+                node.error = str(e)
+                print(f"[WARN] Task {node.name} failed (attempt {attempt + 1}/{node.retries + 1}): {e}")
+
+        if node.status != 'ok':
+            if node.fallback is None:
+                node.status = 'failed'
+                node.finished_at = time.perf_counter()
+                raise RuntimeError(f'Task {node.name} failed: {node.error}')
+            result = await _call(node.fallback)
+            degraded_input = any(self._nodes[dep].status == 'degraded' for dep in node.deps)
+            node.status = 'degraded' if timed_out or degraded_input else 'fallback'
+
+        node.finished_at = time.perf_counter()
+        if node.on_result is not None:
+            node.on_result(result)
+        return result
+
+    async def run(self, timeout: float = None) -> Dict[str, Any]:
+        """
+        Run every node and return {name: result}
+
+        Args:
+            timeout: Seconds until the deadline (see the class docstring); give
+                     every node a fallback when using one
+
+        Raises:
+            TaskGraphError: if the graph is invalid
+            RuntimeError: if a node without a fallback failed
+        """
+        order = self._order()
+        self._started_at = time.perf_counter()
+        self._deadline = self._started_at + timeout if timeout is not None else None
+        tasks: Dict[str, asyncio.Task] = {}
+        # Dependencies come first in topological order, so their tasks exist when awaited
+        for name in order:
+            tasks[name] = asyncio.ensure_future(self._run_node(self._nodes[name], tasks))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # Collect the cancelled tasks so none is left pending with an unread exception
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            self._finished_at = time.perf_counter()
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def _critical_path(self) -> List[str]:
+        """Chain of nodes ending at the last one to finish, each preceded by its latest dependency"""
+        finished = [node for node in self._nodes.values() if node.finished_at is not None]
+        if not finished:
+            return []
+        node = max(finished, key=lambda n: n.finished_at)
+        path = [node.name]
+        while node.deps:
+            node = max((self._nodes[dep] for dep in node.deps), key=lambda n: n.finished_at or 0)
+            path.append(node.name)
+        return list(reversed(path))
+
+    def report(self) -> Dict[str, Any]:
+        """Per-node status and timings (milliseconds from the start of run())"""
+        def ms(value):
+            return round((value - self._started_at) * 1000, 1) if value is not None else None
+
+        nodes = {}
+        for name, node in self._nodes.items():
+            nodes[name] = {
+                'status': node.status,
+                'attempts': node.attempts,
+                'started_ms': ms(node.started_at),
+                'finished_ms': ms(node.finished_at),
+                'duration_ms': (round((node.finished_at - node.started_at) * 1000, 1)
+                                if node.started_at is not None and node.finished_at is not None else None),
+            }
+            if node.error and node.status != 'ok':
+                nodes[name]['error'] = node.error
+
+        return {
+            'graph': self.name,
+            'total_ms': ms(self._finished_at) if self._started_at is not None else None,
+            'critical_path': self._critical_path(),
+            'degraded': [name for name, node in self._nodes.items() if node.status == 'degraded'],
+            'nodes': nodes,
+        }
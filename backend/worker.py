@@ -0,0 +1,201 @@
+"""
+Resume generation worker
+Claims jobs queued by POST /api/generate-resume and runs them: AI content, then the PDF.
+Run one or more of these next to the API (see ecosystem.config.js); each process works
+on JOB_WORKER_THREADS jobs at a time, so throughput is set by the number of workers.
+"""
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from services.async_runtime import get_runtime
+from services.job_queue import JobQueue, worker_name
+
+# Jobs one worker process runs at once (the AI calls are async, the threads mostly wait)
+JOB_WORKER_THREADS = int(os.getenv('JOB_WORKER_THREADS', 4))
+
+# Seconds between looks at an empty queue
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 0.5))
+
+# Seconds between lease renewals (well inside JOB_LEASE_SECONDS)
+JOB_HEARTBEAT_INTERVAL = 10.0
+
+# Streamed section text is written to the queue at most this often, merged
+JOB_EVENT_FLUSH_INTERVAL = 0.25
+
+
+def _coalesce(events: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Merge runs of *_delta events for the same section into one event"""
+    merged = []
+    for event, data in events:
+        if merged and event.endswith('_delta') and merged[-1][0] == event:
+            last = merged[-1][1]
+            if {k: v for k, v in last.items() if k != 'text'} == {k: v for k, v in data.items() if k != 'text'}:
+                last['text'] += data['text']
+                continue
+        merged.append((event, dict(data)))
+    return merged
+
+
+class JobWorker:
+    """
+    Runs queued resume jobs on a pool of threads
+
+    Each job is generated with ContentGenerator on the shared async runtime;
+    its section events are recorded in the queue for status subscribers, the
+    lease is renewed while it runs, and a cancelled job's AI calls are
+    stopped. On stop() running jobs go back to the queue for the next worker.
+    """
+
+    def __init__(self, job_queue: JobQueue, content_generator, pdf_generator, pdf_downloads,
+                 record_usage: Callable[[str, bool], None], download_name: Callable[[Dict], str],
+                 threads: int = None):
+        """
+        Args:
+            job_queue: Queue to take jobs from
+            content_generator: ContentGenerator for the resume content
+            pdf_generator: PDFGenerator for the PDF
+            pdf_downloads: PDFDownloads that issues the download token
+            record_usage: record_usage(email, free_reserved) counts a finished generation against
+                the user (access was checked, and a free generation reserved, when it was queued)
+            download_name: download_name(resume_data) -> file name offered for the PDF
+            threads: Jobs run at once (default JOB_WORKER_THREADS)
+        """
+        self.queue = job_queue
+        self.content_generator = content_generator
+        self.pdf_generator = pdf_generator
+        self.pdf_downloads = pdf_downloads
+        self.record_usage = record_usage
+        self.download_name = download_name
+        self.threads = threads or JOB_WORKER_THREADS
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start the worker threads (returns immediately)"""
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._loop, args=(worker_name(index),),
+                                      name=f'resume-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[JOBS] Worker {worker_name()} running {self.threads} job threads")
+
+    def stop(self, timeout: float = None):
+        """Stop claiming jobs, hand running ones back to the queue and wait for the threads"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _loop(self, worker: str):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(worker)
+            except Exception as e:
+                print(f"[WARN] Could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(JOB_POLL_INTERVAL)
+                continue
+            try:
+                self._run(job, worker)
+            except Exception as e:
+                print(f"\n❌ Job {job['id']} failed: {str(e)}")
+                try:
+                    self.queue.fail(job['id'], worker, str(e))
+                except Exception as fail_error:
+                    # The lease runs out and the job is retried
+                    print(f"[WARN] Could not mark job {job['id']} failed: {fail_error}")
+
+    def _run(self, job: Dict[str, Any], worker: str):
+        job_id, payload = job['id'], job['payload']
+        user_email = payload.get('email', '')
+        user_data = payload.get('user_data', {})
+        started = time.time()
+        print(f"\n🔄 Job {job_id} for {user_email} (attempt {job['attempt']})")
+
+        self.queue.add_events(job_id, worker, [
+            ('started', {'positions': len(user_data.get('work_experience', [])), 'attempt': job['attempt']})
+        ])
+
+        # Sections arrive on the AI event loop thread; this thread writes them to the queue
+        events = queue.Queue()
+        future = get_runtime().submit(self.content_generator.agenerate_full_resume_data(
+            user_data, payload.get('job_description', ''), fresh=payload.get('fresh', False),
+            draft_token=payload.get('draft_token'), emit=lambda event, data: events.put((event, data))
+        ))
+        future.add_done_callback(lambda _: events.put(None))
+
+        try:
+            pending = []
+            next_flush = time.time() + JOB_EVENT_FLUSH_INTERVAL
+            next_heartbeat = time.time() + JOB_HEARTBEAT_INTERVAL
+            while True:
+                try:
+                    item = events.get(timeout=JOB_EVENT_FLUSH_INTERVAL)
+                except queue.Empty:
+                    item = False
+                if item is None:
+                    break
+                if item:
+                    pending.append(item)
+
+                now = time.time()
+                if pending and now >= next_flush:
+                    self.queue.add_events(job_id, worker, _coalesce(pending))
+                    pending, next_flush = [], now + JOB_EVENT_FLUSH_INTERVAL
+                if self._stop.is_set():
+                    future.cancel()
+                    self.queue.release(job_id, worker)
+                    print(f"[JOBS] Worker stopping, job {job_id} queued again")
+                    return
+                if now >= next_heartbeat:
+                    if not self.queue.heartbeat(job_id, worker):
+                        future.cancel()
+                        print(f"[JOBS] Job {job_id} was cancelled, stopped its generation")
+                        return
+                    next_heartbeat = now + JOB_HEARTBEAT_INTERVAL
+            self.queue.add_events(job_id, worker, _coalesce(pending))
+
+            complete_resume_data = future.result()
+            pdf_path = self.pdf_generator.generate_pdf(complete_resume_data)
+            token = self.pdf_downloads.issue(pdf_path)
+            result = {
+                'token': token,
+                'download_url': f'/api/download/{token}',
+                'filename': self.download_name(complete_resume_data),
+                'generation_report': complete_resume_data.get('generation_report')
+            }
+            # Only count the generation if the job was still ours (not cancelled meanwhile)
+            if self.queue.complete(job_id, worker, result):
+                self.record_usage(user_email, payload.get('free_reserved', False))
+                print(f"✅ Job {job_id} done in {time.time() - started:.1f}s: {pdf_path}")
+        except BaseException:
+            future.cancel()
+            raise
+
+
+def main():
+    # Same services and user database as the API
+    from app import (app, job_queue, content_generator, pdf_generator, pdf_downloads,
+                     record_job_generation, _download_name)
+
+    os.makedirs('data', exist_ok=True)
+    os.makedirs('output', exist_ok=True)
+
+    worker = JobWorker(job_queue, content_generator, pdf_generator, pdf_downloads,
+                       record_usage=record_job_generation, download_name=_download_name)
+    stopping = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stopping.set())
+
+    worker.start()
+    stopping.wait()
+    print("[JOBS] Shutting down, returning running jobs to the queue...")
+    worker.stop(timeout=JOB_POLL_INTERVAL + JOB_EVENT_FLUSH_INTERVAL + 2)
+
+
+if __name__ == '__main__':
+    main()
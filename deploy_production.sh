@@ -140,7 +140,7 @@ module.exports = {
     name: 'resumemaker',
     cwd: '$BACKEND_DIR',
     script: 'venv/bin/gunicorn',
-    args: '-w 4 -b 127.0.0.1:5000 --timeout 300 app:app',
+    args: '-w 4 -k gthread --threads 8 -b 127.0.0.1:5000 --timeout 300 app:app',
     interpreter: 'none',
     autorestart: true,
     watch: false,
@@ -151,12 +151,30 @@ module.exports = {
     error_file: '/var/log/resumemaker/error.log',
     out_file: '/var/log/resumemaker/access.log',
     time: true
+  }, {
+    name: 'resumemaker-worker',
+    cwd: '$BACKEND_DIR',
+    script: 'worker.py',
+    interpreter: 'venv/bin/python',
+    instances: 2,
+    exec_mode: 'fork',
+    autorestart: true,
+    watch: false,
+    max_memory_restart: '500M',
+    env: {
+      FLASK_ENV: 'production'
+    },
+    error_file: '/var/log/resumemaker/worker-error.log',
+    out_file: '/var/log/resumemaker/worker.log',
+    time: true,
+    kill_timeout: 5000
   }]
 };
 EOF
 
 # Stop PM2 if running
 pm2 delete resumemaker 2>/dev/null || true
+pm2 delete resumemaker-worker 2>/dev/null || true
 
 # Start application
 cd $APP_DIR
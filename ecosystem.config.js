@@ -6,6 +6,10 @@
  *   pm2 restart resumemaker
  *   pm2 logs resumemaker
  *   pm2 stop resumemaker
+ *
+ * 'resumemaker' serves the API; 'resumemaker-worker' runs the queued resume
+ * generations. Scale generation throughput with the worker instances
+ * (and JOB_WORKER_THREADS, the jobs each worker runs at once).
  */
 
 module.exports = {
@@ -13,7 +17,8 @@ module.exports = {
     name: 'resumemaker',
     cwd: './backend',
     script: 'venv/bin/gunicorn',
-    args: '-w 4 -b 127.0.0.1:5000 --timeout 300 --access-logfile - --error-logfile - app:app',
+    // Threaded workers: job status subscriptions are long-lived but idle requests
+    args: '-w 4 -k gthread --threads 8 -b 127.0.0.1:5000 --timeout 300 --access-logfile - --error-logfile - app:app',
     interpreter: 'none',
     autorestart: true,
     watch: false,
@@ -29,6 +34,26 @@ module.exports = {
     kill_timeout: 5000,
     wait_ready: true,
     listen_timeout: 10000
+  }, {
+    name: 'resumemaker-worker',
+    cwd: './backend',
+    script: 'worker.py',
+    interpreter: 'venv/bin/python',
+    instances: 2,
+    exec_mode: 'fork',
+    autorestart: true,
+    watch: false,
+    max_memory_restart: '500M',
+    env: {
+      FLASK_ENV: 'production',
+      FLASK_DEBUG: 'False',
+      JOB_WORKER_THREADS: 4
+    },
+    error_file: './logs/worker-error.log',
+    out_file: './logs/worker.log',
+    time: true,
+    // Running jobs are handed back to the queue on SIGTERM
+    kill_timeout: 5000
   }]
 };
 
@@ -5,6 +5,15 @@ const API_BASE_URL = window.location.hostname === 'localhost' || window.location
     ? 'http://localhost:5000/api'
     : '/api';
 
+// Job descriptions longer than this are posted as a raw text stream
+const STREAMED_JD_LENGTH = 64 * 1024;
+
+// How often a resume job is polled when its event stream is unavailable
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Token for the skills/title the server starts preparing when the job description is analyzed
+let draftToken = null;
+
 // Version check
 console.log('🚀 App.js loaded - Version 20251202 (with payments)');
 
@@ -634,17 +643,30 @@ async function analyzeJobDescription() {
     btn.disabled = true;
     
     try {
+        // Very large pastes are sent raw so the server can analyze them as a stream
+        const streamed = jobDescription.length > STREAMED_JD_LENGTH;
         const response = await fetch(`${API_BASE_URL}/analyze-job`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ job_description: jobDescription })
+            headers: { 'Content-Type': streamed ? 'text/plain; charset=utf-8' : 'application/json' },
+            body: streamed ? jobDescription : JSON.stringify({
+                job_description: jobDescription,
+                // Signed-in users will likely generate next: let the server start on it meanwhile
+                prepare: Boolean(currentUser.email),
+                email: currentUser.email,  // Drafts are only started for users who may generate
+                work_experience: collectFormData().work_experience
+            })
         });
         
         const result = await response.json();
         
         if (result.success) {
+            draftToken = result.draft_token || null;
             displayAnalysisResults(result);
-            showMessage('Job description analyzed successfully!', 'success');
+            if (result.truncated) {
+                showMessage('Job description is very long - only the first part was analyzed', 'info');
+            } else {
+                showMessage('Job description analyzed successfully!', 'success');
+            }
             trackEvent('job_analyzed');
         } else {
             showMessage('Error analyzing job description: ' + result.error, 'error');
@@ -795,6 +817,20 @@ async function handleFormSubmit(e) {
     }
     loadingOverlay.style.display = 'flex';
     
+    // The resume is generated by a background job; sections stream in as the AI writes them.
+    // Cancel stops the job on the server as well
+    const controller = new AbortController();
+    const cancelBtn = document.getElementById('cancelGenerationBtn');
+    let jobId = null;
+    cancelBtn.onclick = () => {
+        controller.abort();
+        if (jobId) {
+            fetch(`${API_BASE_URL}/jobs/${jobId}/cancel`, { method: 'POST' }).catch(() => {});
+        }
+    };
+    cancelBtn.style.display = 'inline-block';
+    resetGenerationPreview();
+    
     try {
         const userData = collectFormData();
         
@@ -804,22 +840,35 @@ async function handleFormSubmit(e) {
             body: JSON.stringify({
                 user_data: userData,
                 job_description: userData.job_description,
-                email: currentUser.email  // Include user email for access control
-            })
+                email: currentUser.email,  // Include user email for access control
+                draft_token: draftToken  // Ignored by the server if the job description changed
+            }),
+            signal: controller.signal
         });
         
         if (response.ok) {
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
+            jobId = (await response.json()).job_id;
+            const result = await followGenerationJob(jobId, controller.signal);
+            
+            if (result.event === 'error') {
+                showMessage('Error generating resume: ' + (result.data.error || 'Unknown error'), 'error');
+                return;
+            }
+            
             const a = document.createElement('a');
-            a.href = url;
-            a.download = `Resume_${userData.personal_info.name.replace(/\s+/g, '_')}_${new Date().toISOString().slice(0,10)}.pdf`;
+            a.href = `${API_BASE_URL}/jobs/${jobId}/download`;
+            a.download = result.data.filename;
             document.body.appendChild(a);
             a.click();
-            window.URL.revokeObjectURL(url);
             document.body.removeChild(a);
             
-            showMessage('Resume generated successfully! Check your downloads.', 'success');
+            // Sections the AI could not finish within the time limit use standard wording
+            const degraded = (result.data.generation_report || {}).degraded_sections || [];
+            if (degraded.length) {
+                showMessage('Resume generated! Some sections use standard wording because the AI was slow - regenerate to try again.', 'info');
+            } else {
+                showMessage('Resume generated successfully! Check your downloads.', 'success');
+            }
             
             // Track successful generation
             trackEvent('resume_generated');
@@ -845,9 +894,14 @@ async function handleFormSubmit(e) {
             showMessage('Error generating resume: ' + (error.error || 'Unknown error'), 'error');
         }
     } catch (error) {
-        showMessage('Error: ' + error.message, 'error');
+        if (error.name === 'AbortError') {
+            showMessage('Resume generation cancelled.', 'info');
+        } else {
+            showMessage('Error: ' + error.message, 'error');
+        }
     } finally {
         loadingOverlay.style.display = 'none';
+        cancelBtn.style.display = 'none';
         if (submitBtn) {
             submitBtn.disabled = false;
             submitBtn.textContent = originalText;
@@ -855,6 +909,140 @@ async function handleFormSubmit(e) {
     }
 }
 
+// Follow a resume job until it finishes; resolves to { event: 'done' | 'error', data }
+async function followGenerationJob(jobId, signal) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/events`, { signal });
+        if (response.ok) {
+            let result = null;
+            await readEventStream(response, (event, data) => {
+                if (event === 'done' || event === 'error') {
+                    result = { event, data };
+                } else {
+                    updateGenerationPreview(event, data);
+                }
+            });
+            if (result) return result;
+        }
+    } catch (error) {
+        if (error.name === 'AbortError') throw error;
+    }
+    
+    // The event stream dropped (proxy timeout, network blip): poll the job status instead
+    document.getElementById('loadingStatus').textContent = 'Still generating your resume...';
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        if (signal.aborted) throw new DOMException('Generation cancelled', 'AbortError');
+        
+        let status;
+        try {
+            const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, { signal });
+            status = await response.json();
+        } catch (error) {
+            if (error.name === 'AbortError') throw error;
+            continue;
+        }
+        
+        if (status.status === 'done') {
+            return { event: 'done', data: status };
+        }
+        if (!status.success || ['failed', 'cancelled'].includes(status.status)) {
+            return { event: 'error', data: status };
+        }
+    }
+}
+
+// Read a text/event-stream response, calling onEvent(event, data) for each event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            // Lines starting with ':' are keep-alives and carry no data
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
+// Live preview of the resume while it is being generated
+const generationState = { title: '', summary: '', positions: 0, jobsDone: 0, skills: 0 };
+
+function resetGenerationPreview() {
+    Object.assign(generationState, { title: '', summary: '', positions: 0, jobsDone: 0, skills: 0 });
+    document.getElementById('loadingStatus').textContent = 'Generating your ATS-optimized resume with professional content...';
+    document.getElementById('generationPreview').style.display = 'none';
+    document.getElementById('previewTitle').textContent = '';
+    document.getElementById('previewSummary').textContent = '';
+    document.getElementById('previewJobs').textContent = '';
+}
+
+function updateGenerationPreview(event, data) {
+    const state = generationState;
+    
+    switch (event) {
+        case 'queued':
+            document.getElementById('loadingStatus').textContent = data.position
+                ? `Waiting in line (${data.position} ahead of you)...`
+                : 'Starting your resume...';
+            return;
+        case 'started':
+            // A job restarted on another worker begins again from scratch
+            if (data.attempt > 1) resetGenerationPreview();
+            document.getElementById('loadingStatus').textContent = 'Generating your ATS-optimized resume with professional content...';
+            state.positions = data.positions;
+            break;
+        case 'skills':
+            state.skills = data.skills.length;
+            break;
+        case 'title_delta':
+            state.title += data.text;
+            break;
+        case 'title':
+            state.title = data.text;
+            break;
+        case 'summary_delta':
+            state.summary += data.text;
+            break;
+        case 'summary':
+            state.summary = data.text;
+            break;
+        case 'job':
+            state.jobsDone += 1;
+            break;
+        default:
+            return;
+    }
+    
+    document.getElementById('generationPreview').style.display = 'block';
+    document.getElementById('previewTitle').textContent = state.title;
+    document.getElementById('previewSummary').textContent = state.summary;
+    
+    const progress = [];
+    if (state.skills) progress.push(`${state.skills} skills matched`);
+    if (state.positions) progress.push(`${state.jobsDone}/${state.positions} positions written`);
+    document.getElementById('previewJobs').textContent = progress.join(' · ');
+    
+    if (state.positions && state.jobsDone === state.positions && state.skills && state.summary) {
+        document.getElementById('loadingStatus').textContent = 'Building your PDF...';
+    }
+}
+
 // Save Data
 async function saveData() {
     try {
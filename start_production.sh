@@ -120,14 +120,23 @@ echo -e "${GREEN}Starting Resume Maker with gunicorn...${NC}"
 echo -e "${YELLOW}Press Ctrl+C to stop${NC}"
 echo ""
 
+# Resume generation runs in a separate job worker; stop it along with gunicorn
+python3 worker.py &
+WORKER_PID=$!
+trap 'kill $WORKER_PID 2>/dev/null' EXIT
+print_success "Resume job worker started (PID $WORKER_PID)"
+
 # Run gunicorn with optimized settings for production
 # -w 4: 4 worker processes
+# -k gthread --threads 8: threaded workers, so job status streams do not block the API
 # -b 0.0.0.0:5000: bind to all interfaces on port 5000
 # --timeout 300: allow 5 minutes for AI generation
 # --access-logfile -: log to stdout
 # --error-logfile -: log errors to stderr
 gunicorn \
     -w 4 \
+    -k gthread \
+    --threads 8 \
     -b 0.0.0.0:5000 \
     --timeout 300 \
     --access-logfile - \
@@ -139,6 +139,28 @@ def test_ats_resume_generator():
     print(f"  Sample skills: {', '.join(relevant_skills[:15])}")
     print()
     
+    # 'vue' inside 'Vue.js' is not a second mention: one dotted name scores like one plain name
+    dotted = ats_matcher.analyze_job_description('Vue.js')['scores']
+    plain = ats_matcher.analyze_job_description('Python')['scores']
+    if dotted.get('Vue.js') != plain.get('Python') or '.NET' in ats_matcher.analyze_job_description('ASP.NET Core')['scores']:
+        print(f"[FAIL] Nested skill matches counted: {dotted}")
+        return False
+    print("[OK] A skill mention is scored once, as its longest match")
+    
+    # Match scoring counts mentions the same way
+    if list(ats_matcher.count_skill_ids('Vue.js').values()) != [1]:
+        print(f"[FAIL] 'Vue.js' counted as {ats_matcher.count_skill_ids('Vue.js')}")
+        return False
+    print("[OK] A skill mention is counted once for match scores")
+    
+    # A misspelled skill resolved by fuzzy matching is not listed again as an unknown keyword
+    analysis = ats_matcher.analyze_job_description('Need Kubernetess experience')
+    if any('Kubernetess' in phrase for phrase in analysis['extra_keywords']):
+        print(f"[FAIL] Fuzzy-matched skill repeated in extra keywords: {analysis['extra_keywords']}")
+        return False
+    print("[OK] Fuzzy-matched skills are left out of the extra keywords")
+    print()
+    
     # Test 2: Content Optimization
     print("Test 2: Testing Resume Content Optimization")
     print("-" * 60)